@@ -7,6 +7,7 @@ from ui.state import init_session_state
 # --- UI Components ---
 from ui.sidebar import render_sidebar
 from ui.table_mapping import render_mapping_ui
+from ui.diagnostics import render_diagnostics
 
 # --- Database Connection ---
 from database.connectors import db_connection_ui, get_all_db_tables
@@ -24,7 +25,7 @@ render_sidebar()
 db = db_connection_ui()
 
 if db:
-    all_tables = get_all_db_tables(_db=db)
+    all_tables = get_all_db_tables(_db=db, db_key=db.key)
     if not all_tables.empty:
         st.session_state.db = db
         st.session_state.all_db_tables_info = all_tables
@@ -33,3 +34,5 @@ if db:
         st.warning("No tables available in database.")
 else:
     st.info("Please connect to a database from the sidebar to get started.")
+
+render_diagnostics()
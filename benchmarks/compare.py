@@ -0,0 +1,57 @@
+"""
+Compares two benchmark result files and flags regressions.
+
+    python -m benchmarks.compare results/before.json results/after.json --threshold 1.2
+
+Exits with status 1 when any case got slower (median time) or hungrier
+(peak memory) than the threshold ratio, so it can gate a CI job.
+"""
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def compare(before, after, threshold, min_seconds=0.0):
+    """
+    Yields (case, time ratio, memory ratio, regressed) for cases present in
+    both runs. Time differences below min_seconds are treated as noise.
+    """
+    for case, new in after["results"].items():
+        old = before["results"].get(case)
+        if old is None:
+            continue
+        time_ratio = new["median_s"] / old["median_s"] if old["median_s"] else float("inf")
+        mem_ratio = new["peak_kib"] / old["peak_kib"] if old["peak_kib"] else float("inf")
+        slower = time_ratio > threshold and new["median_s"] - old["median_s"] > min_seconds
+        yield case, time_ratio, mem_ratio, slower or mem_ratio > threshold
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=1.2, help="ratio above which a case counts as regressed")
+    parser.add_argument("--min-seconds", type=float, default=0.002,
+                        help="ignore time differences smaller than this (timer noise on tiny cases)")
+    args = parser.parse_args(argv)
+
+    before, after = load(args.before), load(args.after)
+    if before.get("params") != after.get("params"):
+        print("warning: the runs used different benchmark parameters", file=sys.stderr)
+    print(f"{(before.get('commit') or '?')[:10]} -> {(after.get('commit') or '?')[:10]}")
+    print(f"{'case':<28} {'time':>8} {'memory':>8}")
+    regressed = []
+    for case, time_ratio, mem_ratio, worse in compare(before, after, args.threshold, args.min_seconds):
+        print(f"{case:<28} {time_ratio:>7.2f}x {mem_ratio:>7.2f}x{'  REGRESSED' if worse else ''}")
+        if worse:
+            regressed.append(case)
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""
+Times the hot paths of the mapper on synthetic data and records their
+memory peaks, writing the results as JSON for comparison between commits.
+
+Run from the repository root (offline, no database server needed):
+    python -m benchmarks.run_benchmarks --profile small --output results/small.json
+    python -m benchmarks.compare results/before.json results/after.json
+
+Each case is timed `--repeat` times without tracing; the peak Python heap
+allocation is measured in one extra run under tracemalloc, so tracing
+overhead never shows up in the timings.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks import synthetic
+
+PROFILES = {
+    # Quick enough for every commit
+    "small": {"tables": 50, "columns": 20, "classes": 1_000, "mappings": 100, "modules": 20},
+    # Release-sized inputs
+    "full": {"tables": 1_000, "columns": 50, "classes": 100_000, "mappings": 10_000, "modules": 200},
+}
+
+
+def measure(func, repeat):
+    """Runs func() repeat times, then once more under tracemalloc."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "min_s": round(min(timings), 6),
+        "median_s": round(statistics.median(timings), 6),
+        "peak_kib": round(peak / 1024, 1),
+        "repeat": repeat,
+    }
+
+
+def bench_ontology(workdir, params, repeat):
+    from logic.hierarchy import ClassHierarchy
+    from logic.ontology_index import get_ontology_index
+
+    path = synthetic.make_ontology(os.path.join(workdir, "ontology.ttl"), params["classes"])
+    index_dir = os.path.join(workdir, "index")
+
+    def cold():
+        # What load_ontology_terms does on a new ontology: parse, compile, save
+        for name in os.listdir(index_dir) if os.path.isdir(index_dir) else []:
+            os.remove(os.path.join(index_dir, name))
+        index = get_ontology_index(path, index_dir=index_dir)
+        index.term_list(), index.namespace_list()
+
+    def warm():
+        # ... and on every later process start: map the compiled index
+        index = get_ontology_index(path, index_dir=index_dir)
+        index.term_list(), index.namespace_list()
+
+    def hierarchy():
+        # Labelling the subClassOf tree, then one subtree filter
+        index = get_ontology_index(path, index_dir=index_dir)
+        ClassHierarchy(len(index), index.subclass_edges).subtree_mask(0)
+
+    return {
+        "load_ontology_terms.cold": measure(cold, max(1, repeat // 3)),
+        "load_ontology_terms.warm": measure(warm, repeat),
+        "class_hierarchy": measure(hierarchy, repeat),
+    }
+
+
+def bench_database(workdir, params, repeat):
+    from database.catalog import DatabaseConnector
+
+    path = synthetic.make_sqlite_db(os.path.join(workdir, "db.sqlite"), params["tables"], params["columns"])
+    db = DatabaseConnector("sqlite", db_path=path)
+    db.connect()
+    last_table = f"table_{params['tables'] - 1}"
+
+    def columns_cold():
+        db.invalidate_catalog()
+        db.get_table_columns(last_table)
+
+    results = {
+        "get_all_tables": measure(db.get_all_tables, repeat),
+        "get_table_columns.cold": measure(columns_cold, repeat),
+        "get_table_columns.warm": measure(lambda: db.get_table_columns(last_table), repeat),
+    }
+    db.engine.dispose()
+    return results
+
+
+def bench_shacl(workdir, params, repeat):
+    from logic.shacl_generator import generate_shacl_file
+
+    mappings = synthetic.make_mappings(params["mappings"])
+    return {"generate_shacl_file": measure(lambda: generate_shacl_file(mappings, "bench_table"), repeat)}
+
+
+def bench_el_pairs(workdir, params, repeat):
+    isc_df, el_df = synthetic.make_el_data(params["modules"])
+    db = synthetic.SyntheticELDB(isc_df, el_df)
+    modules = isc_df["module_id"].tolist()
+
+    def per_module():
+        for module_id in modules:
+            db.get_el_pairs(module_id)
+
+    return {
+        "get_el_pairs": measure(per_module, repeat),
+        "get_el_pairs_batch": measure(lambda: db.get_el_pairs_batch(modules, pushdown=False), repeat),
+    }
+
+
+BENCHMARKS = {
+    "ontology": bench_ontology,
+    "database": bench_database,
+    "shacl": bench_shacl,
+    "el_pairs": bench_el_pairs,
+}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--profile", choices=PROFILES, default="small")
+    parser.add_argument("--only", choices=BENCHMARKS, action="append", help="run only these groups")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write the JSON results here (default: stdout)")
+    args = parser.parse_args(argv)
+
+    params = PROFILES[args.profile]
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="fairmapper-bench-") as workdir:
+        for group in args.only or BENCHMARKS:
+            print(f"running {group} ...", file=sys.stderr)
+            for name, stats in BENCHMARKS[group](workdir, params, args.repeat).items():
+                results[name] = stats
+                print(f"  {name:<28} {stats['median_s']:>10.4f}s  {stats['peak_kib']:>12,.1f} KiB", file=sys.stderr)
+
+    report = {
+        "commit": git_commit(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "profile": args.profile,
+        "params": params,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
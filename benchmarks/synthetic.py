@@ -0,0 +1,134 @@
+"""
+Deterministic synthetic inputs for the benchmarks and tests: SQLite
+databases of N tables x M columns, Turtle ontologies of any number of
+classes, mapping dicts, and EL measurement frames with a PostgresDB that
+serves them from memory. Everything is generated locally from a seed, so
+runs on different machines and commits see identical data.
+"""
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from database.postgres import PostgresDB
+
+MDS = "https://cwrusdle.bitbucket.io/mds/"
+
+_WORDS = [
+    "current", "voltage", "power", "module", "cell", "irradiance", "temperature",
+    "short", "circuit", "open", "maximum", "nameplate", "series", "resistance",
+    "efficiency", "fill", "factor", "date", "time", "sample", "string", "inverter",
+]
+
+
+def _name(rng, n_words, sep):
+    return sep.join(rng.choice(_WORDS, n_words))
+
+
+def make_sqlite_db(path, n_tables, n_columns, rows=0, seed=0):
+    """Creates a SQLite database of n_tables tables with n_columns REAL/TEXT columns each."""
+    rng = np.random.default_rng(seed)
+    conn = sqlite3.connect(path)
+    try:
+        for t in range(n_tables):
+            columns = [f"{_name(rng, 2, '_')}_{c}" for c in range(n_columns)]
+            types = ["REAL" if c % 3 else "TEXT" for c in range(n_columns)]
+            table = f"table_{t}"
+            conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+            conn.execute(f'CREATE TABLE "{table}" (id INTEGER PRIMARY KEY, '
+                         + ", ".join(f'"{c}" {ty}' for c, ty in zip(columns, types)) + ")")
+            if rows:
+                values = [
+                    tuple([i] + [float(i) if ty == "REAL" else f"v{i}" for ty in types])
+                    for i in range(rows)
+                ]
+                conn.executemany(f'INSERT INTO "{table}" VALUES ({", ".join("?" * (n_columns + 1))})', values)
+        conn.commit()
+    finally:
+        conn.close()
+    return path
+
+
+def make_ontology(path, n_classes, seed=0):
+    """Writes a Turtle ontology of n_classes labelled, defined classes in a shallow hierarchy."""
+    rng = np.random.default_rng(seed)
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write(
+            "@prefix mds: <%s> .\n"
+            "@prefix owl: <http://www.w3.org/2002/07/owl#> .\n"
+            "@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .\n"
+            "@prefix skos: <http://www.w3.org/2004/02/skos/core#> .\n\n" % MDS
+        )
+        names = []
+        for i in range(n_classes):
+            words = [w.capitalize() for w in rng.choice(_WORDS, 3)]
+            names.append("".join(words) + str(i))
+            parent = f"mds:{names[i // 10]}" if i >= 10 else "owl:Thing"
+            fh.write(
+                f"mds:{names[i]} a owl:Class ;\n"
+                f"    rdfs:subClassOf {parent} ;\n"
+                f'    rdfs:label "{" ".join(words).lower()} {i}" ;\n'
+                f'    skos:definition "The {" ".join(words).lower()} of a photovoltaic module." .\n'
+            )
+    return path
+
+
+def make_mappings(n):
+    """{column: term} mappings of n columns."""
+    return {f"column_{i}": f"{MDS}Term{i}" for i in range(n)}
+
+
+def make_el_data(n_modules, days=30, per_day=8, isc=9.0, seed=0, random_levels=False):
+    """
+    Nameplate Isc per module and EL measurements as get_el_pairs reads them:
+    every day has readings near Isc, near 0.1*Isc, and in between. With
+    random_levels each reading's level is drawn at random instead, so some
+    days lack one of the two levels (or have several readings of one).
+    """
+    rng = np.random.default_rng(seed)
+    modules = [f"M{m:05d}" for m in range(n_modules)]
+    n = n_modules * days * per_day
+    if random_levels:
+        levels = rng.choice([1.0, 0.1, 0.5, 0.8], n)
+    else:
+        levels = np.tile(np.array([1.0, 0.1, 0.5, 0.8] * (per_day // 4 + 1))[:per_day], n_modules * days)
+    el = pd.DataFrame({
+        "ID": np.arange(n),
+        "module-id": np.repeat(modules, days * per_day),
+        "date": np.tile(np.repeat(pd.date_range("2024-01-01", periods=days).strftime("%Y-%m-%d"), per_day), n_modules),
+        "time": np.tile([f"{h:02d}:00:00" for h in range(per_day)], n_modules * days),
+        "current": isc * levels * (1 + rng.normal(0, 0.01, n)),
+    })
+    isc_df = pd.DataFrame({"module_id": modules, "nameplate_isc": isc})
+    return isc_df, el
+
+
+class SyntheticELDB(PostgresDB):
+    """
+    PostgresDB whose reads are served from in-memory frames, so the pandas
+    side of get_el_pairs / get_el_pairs_batch runs without a server.
+    """
+
+    def __init__(self, isc_df, el_df):
+        self.isc = isc_df.set_index("module_id")
+        self.el = {m: g.reset_index(drop=True) for m, g in el_df.groupby("module-id")}
+        joined = el_df.merge(isc_df, left_on="module-id", right_on="module_id")
+        self.joined = pd.DataFrame({
+            "module_id": joined["module_id"],
+            "isc": joined["nameplate_isc"].astype(float),
+            "ID": joined["ID"],
+            "date": pd.to_datetime(joined["date"]).dt.date,
+            "time": joined["time"],
+            "current": joined["current"],
+        })
+
+    def read_records_from_postgres(self, query, params=None, chunksize=None):
+        if isinstance(params, dict):
+            # get_el_pairs_batch without pushdown: module_metadata JOIN el_metadata
+            return self.joined[self.joined["module_id"].isin(params["ids"])].reset_index(drop=True)
+        if "module_metadata" in query:
+            return self.isc.loc[[params[0]]].reset_index()
+        return self.el[params[0]].copy()
+
+    def handle_error(self, error, context):
+        raise error
@@ -0,0 +1,304 @@
+"""
+Headless FAIRmapper: introspect a database, auto-map its columns, and write
+SHACL without starting Streamlit.
+
+    python cli.py introspect --db db.json
+    python cli.py profile --db db.json --table el_metadata
+    python cli.py automap --db db.json --table el_metadata --output mappings.json
+    python cli.py shacl --mappings mappings.json --output-dir shapes/
+    python cli.py validate --db db.json --mappings mappings.json
+    python cli.py run --config job.json
+
+Heavy libraries (pandas, rdflib, SQLAlchemy, numpy) are only imported by
+the command that needs them, so `python cli.py --help` starts instantly.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+
+def log(message):
+    print(message, file=sys.stderr)
+
+
+def load_json(path):
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def write_json(data, path=None):
+    text = json.dumps(data, indent=2, ensure_ascii=False)
+    if path:
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+
+
+def connect(config):
+    """
+    Opens a DatabaseConnector from a connection config dict, e.g.
+    {"db_type": "sqlite", "db_path": "data.db"} or {"db_type": "postgres",
+    "user": ..., "host": ..., "port": 5432, "database": ...}. The password
+    can come from FAIRMAPPER_DB_PASSWORD instead of the file.
+    """
+    from database.catalog import DatabaseConnector
+
+    config = dict(config)
+    db_type = config.pop("db_type")
+    if db_type != "sqlite" and "password" not in config:
+        config["password"] = os.environ.get("FAIRMAPPER_DB_PASSWORD", "")
+    db = DatabaseConnector(db_type, **config)
+    if not db.connect():
+        raise SystemExit(f"Could not connect to {db.key}")
+    return db
+
+
+def load_catalogs(paths):
+    """Merges {table: {column: term}} mapping files; later files win per column."""
+    catalog = {}
+    for path in paths or []:
+        for table, mappings in load_json(path).items():
+            catalog.setdefault(table, {}).update(mappings)
+    return catalog
+
+
+def introspect(db, tables=None):
+    """{table: [{column, data_type, nullable, comment}]} from the database catalog."""
+    catalog = db.load_catalog()
+    if tables:
+        catalog = catalog[catalog["table_name"].isin(tables)]
+    result = {}
+    for row in catalog.itertuples(index=False):
+        result.setdefault(row.table_name, []).append({
+            "column": row.column_name,
+            "data_type": row.data_type,
+            "nullable": bool(row.is_nullable),
+            "comment": row.column_comment,
+        })
+    return result
+
+
+def validate_catalog(catalog, columns_by_table):
+    """Drops mappings whose table or column is not in the database, reporting each one."""
+    valid = {}
+    for table, mappings in catalog.items():
+        known = {c["column"] for c in columns_by_table.get(table, [])}
+        if not known:
+            log(f"Skipping unknown table {table}")
+            continue
+        for column in mappings:
+            if column not in known:
+                log(f"Skipping unknown column {table}.{column}")
+        valid[table] = {c: t for c, t in mappings.items() if c in known}
+    return valid
+
+
+def auto_map(catalog, columns_by_table, ontologies, min_score):
+    """Fills in unmapped columns with their best one-to-one match among the merged ontologies' terms."""
+    from logic.auto_mapper import TermMatrix, assign_one_to_one, propose_mappings
+    from logic.term_table import get_term_table
+
+    started = time.perf_counter()
+    term_matrix = TermMatrix.from_index(get_term_table(ontologies))
+    log(f"Prepared {len(term_matrix)} ontology terms in {time.perf_counter() - started:.2f}s")
+    for table, columns in columns_by_table.items():
+        mappings = catalog.setdefault(table, {})
+        unmapped = [c["column"] for c in columns if c["column"] not in mappings]
+        if not unmapped:
+            continue
+        proposals = propose_mappings(unmapped, term_matrix, top_k=3, min_score=min_score,
+                                     exclude_terms=set(mappings.values()))
+        proposed = assign_one_to_one(proposals)
+        mappings.update(proposed)
+        log(f"{table}: auto-mapped {len(proposed)} of {len(unmapped)} unmapped column(s)")
+    return catalog
+
+
+def write_shacl(catalog, output_dir=None, merged=None, workers=None):
+    from logic.shacl_generator import generate_shacl_catalog
+
+    started = time.perf_counter()
+    report = generate_shacl_catalog(catalog, output_dir=output_dir, merged_path=merged, max_workers=workers)
+    log(f"Wrote SHACL for {len(report)} table(s) in {time.perf_counter() - started:.2f}s")
+    return report
+
+
+def save_to_store(db, catalog):
+    from logic.mapping_store import MappingStore
+
+    store = MappingStore()
+    for table, mappings in catalog.items():
+        store.set_mappings(db.key, table, mappings)
+    log(f"Saved mappings of {len(catalog)} table(s) to {store.path}")
+
+
+def cmd_introspect(args):
+    db = connect(load_json(args.db))
+    write_json(introspect(db, args.table), args.output)
+
+
+def cmd_profile(args):
+    from database.profiling import PROFILE_SAMPLE_ROWS
+
+    db = connect(load_json(args.db))
+    tables = args.table or db.get_all_tables()
+    result = {}
+    for table in tables:
+        started = time.perf_counter()
+        profiled = db.profile_table(table, sample_rows=args.sample_rows or PROFILE_SAMPLE_ROWS, max_workers=args.workers)
+        if profiled is None:
+            continue
+        profile = profiled["profile"].astype(object).where(profiled["profile"].notna(), None)
+        result[table] = profile.to_dict(orient="records")
+        log(f"{table}: profiled {len(profile)} column(s) in {time.perf_counter() - started:.2f}s")
+    write_json(result, args.output)
+
+
+def cmd_automap(args):
+    from logic.ontology_index import ontology_path
+
+    db = connect(load_json(args.db))
+    columns_by_table = introspect(db, args.table)
+    catalog = validate_catalog(load_catalogs(args.mappings), columns_by_table)
+    catalog = auto_map(catalog, columns_by_table, args.ontology or [ontology_path()], args.min_score)
+    write_json(catalog, args.output)
+
+
+def cmd_shacl(args):
+    catalog = load_catalogs(args.mappings)
+    if args.db:
+        catalog = validate_catalog(catalog, introspect(connect(load_json(args.db)), list(catalog)))
+    if args.output_dir or args.merged:
+        write_shacl(catalog, args.output_dir, args.merged, args.workers)
+        return
+    # Nowhere to write to: print the shapes instead
+    from logic.shacl_generator import generate_shacl_file
+    for table, mappings in catalog.items():
+        if mappings:
+            sys.stdout.write(generate_shacl_file(mappings, db_table_name=table))
+
+
+def cmd_validate(args):
+    from logic.shacl_generator import constraints_from_catalog, generate_shacl_file
+    from logic.shacl_validator import load_shapes, validate_chunks
+
+    db = connect(load_json(args.db))
+    catalog = load_catalogs(args.mappings)
+    if args.table:
+        catalog = {t: m for t, m in catalog.items() if t in args.table}
+    catalog = validate_catalog(catalog, introspect(db, list(catalog)))
+    result = {}
+    for table, mappings in catalog.items():
+        if not mappings:
+            continue
+        constraints = constraints_from_catalog(db.get_column_info(table), columns=mappings)
+        shapes = load_shapes(generate_shacl_file(mappings, db_table_name=table, constraints=constraints))
+        validated = validate_chunks(db.stream_table(table, list(mappings), chunksize=args.chunksize), shapes)
+        report = validated["report"]
+        result[table] = {
+            "rows": validated["rows"],
+            "seconds": validated["seconds"],
+            "constraints": report.astype(object).where(report.notna(), None).to_dict(orient="records"),
+        }
+        log(f"{table}: checked {validated['rows']:,} row(s) in {validated['seconds']:.2f}s, "
+            f"{int(report['violations'].sum()):,} violation(s)")
+    write_json(result, args.output)
+    if args.strict and any(c["violations"] for r in result.values() for c in r["constraints"]):
+        sys.exit(1)
+
+
+def cmd_run(args):
+    """
+    Runs a whole job from a config file:
+    {"database": {...}, "ontology": ["a.ttl", "b.owl"], "mappings": ["a.json"],
+     "tables": [...], "auto_map": {"min_score": 0.5}, "store": true,
+     "output_dir": "shapes/", "merged": "all.ttl", "catalog_output": "mappings.json"}
+    """
+    from logic.ontology_index import ontology_path
+
+    config = load_json(args.config)
+    db = connect(config["database"])
+    columns_by_table = introspect(db, config.get("tables"))
+    log(f"Introspected {len(columns_by_table)} table(s) in {db.key}")
+    catalog = validate_catalog(load_catalogs(config.get("mappings")), columns_by_table)
+    if config.get("auto_map"):
+        options = config["auto_map"] if isinstance(config["auto_map"], dict) else {}
+        ontologies = config.get("ontology") or [ontology_path()]
+        if isinstance(ontologies, str):
+            ontologies = [ontologies]
+        catalog = auto_map(catalog, columns_by_table, ontologies,
+                           options.get("min_score", 0.5))
+    if config.get("catalog_output"):
+        write_json(catalog, config["catalog_output"])
+    if config.get("store"):
+        save_to_store(db, catalog)
+    if config.get("output_dir") or config.get("merged"):
+        write_shacl(catalog, config.get("output_dir"), config.get("merged"), config.get("workers"))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="fairmapper", description=__doc__.split("\n\n")[0].strip())
+    commands = parser.add_subparsers(dest="command")
+
+    p = commands.add_parser("introspect", help="List the tables and columns of a database as JSON")
+    p.add_argument("--db", required=True, help="Connection config JSON file")
+    p.add_argument("--table", action="append", help="Only this table (repeatable)")
+    p.add_argument("--output", help="Write to this file instead of stdout")
+    p.set_defaults(func=cmd_introspect)
+
+    p = commands.add_parser("profile", help="Per-column statistics computed in the database, as JSON")
+    p.add_argument("--db", required=True, help="Connection config JSON file")
+    p.add_argument("--table", action="append", help="Only this table (repeatable, default: all)")
+    p.add_argument("--sample-rows", type=int, help="Rows sampled per column (TABLESAMPLE on Postgres, LIMIT otherwise)")
+    p.add_argument("--workers", type=int, default=4, help="Concurrent column queries")
+    p.add_argument("--output", help="Write to this file instead of stdout")
+    p.set_defaults(func=cmd_profile)
+
+    p = commands.add_parser("automap", help="Propose ontology terms for unmapped columns")
+    p.add_argument("--db", required=True, help="Connection config JSON file")
+    p.add_argument("--table", action="append", help="Only this table (repeatable)")
+    p.add_argument("--ontology", action="append",
+                   help="Ontology file, repeatable to merge several (defaults to the bundled MDS ontology)")
+    p.add_argument("--mappings", action="append", help="Existing {table: {column: term}} JSON to keep")
+    p.add_argument("--min-score", type=float, default=0.5, help="Minimum confidence of a proposal")
+    p.add_argument("--output", help="Write the mapping catalog here instead of stdout")
+    p.set_defaults(func=cmd_automap)
+
+    p = commands.add_parser("shacl", help="Write SHACL shapes for mapping files")
+    p.add_argument("--mappings", action="append", required=True, help="{table: {column: term}} JSON (repeatable)")
+    p.add_argument("--db", help="Connection config JSON; drops mappings of columns the database lacks")
+    p.add_argument("--output-dir", help="One Turtle file per table in this directory")
+    p.add_argument("--merged", help="All shapes in one Turtle file")
+    p.add_argument("--workers", type=int, help="Worker processes (1 renders in-process)")
+    p.set_defaults(func=cmd_shacl)
+
+    p = commands.add_parser("validate", help="Check table data against SHACL shapes built from the mappings and catalog")
+    p.add_argument("--db", required=True, help="Connection config JSON file")
+    p.add_argument("--mappings", action="append", required=True, help="{table: {column: term}} JSON (repeatable)")
+    p.add_argument("--table", action="append", help="Only this table (repeatable)")
+    p.add_argument("--chunksize", type=int, default=100_000, help="Rows read per chunk")
+    p.add_argument("--strict", action="store_true", help="Exit with status 1 when any constraint is violated")
+    p.add_argument("--output", help="Write the report to this file instead of stdout")
+    p.set_defaults(func=cmd_validate)
+
+    p = commands.add_parser("run", help="Introspect, apply and auto-map mappings, and write SHACL from a job file")
+    p.add_argument("--config", required=True, help="Job config JSON file")
+    p.set_defaults(func=cmd_run)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not args.command:
+        parser.print_help()
+        return 0
+    args.func(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
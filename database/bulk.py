@@ -0,0 +1,85 @@
+# database/bulk.py
+import csv
+import time
+from io import StringIO
+
+import pandas as pd
+
+def _quote_identifier(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+class _CopyNull(int):
+    # Numbers are left unquoted by QUOTE_NONNUMERIC, so this writes a bare \N
+    def __str__(self):
+        return r"\N"
+
+_COPY_NULL = _CopyNull()
+
+def _copy_from_stdin(table, conn, keys, data_iter):
+    """
+    pandas.to_sql insert method that streams one batch through
+    COPY ... FROM STDIN (CSV) instead of a multi-row INSERT.
+    """
+    buffer = StringIO()
+    # Text is always quoted and only the unquoted \N marks NULL, so neither
+    # an empty string nor the text \N is loaded as NULL
+    writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+    writer.writerows(tuple(_COPY_NULL if value is None else value for value in row) for row in data_iter)
+    buffer.seek(0)
+    columns = ", ".join(_quote_identifier(k) for k in keys)
+    target = _quote_identifier(table.name)
+    if table.schema:
+        target = f"{_quote_identifier(table.schema)}.{target}"
+    with conn.connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY {target} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer)
+
+def _iter_chunks(data, chunksize):
+    """Yields DataFrame slices of at most chunksize rows from a DataFrame or an iterable of DataFrames."""
+    frames = [data] if isinstance(data, pd.DataFrame) else data
+    for frame in frames:
+        for start in range(0, len(frame), chunksize):
+            yield frame.iloc[start:start + chunksize]
+
+def bulk_load(engine, table_name, data, if_exists='append', chunksize=100_000, schema=None):
+    """
+    Bulk-loads a DataFrame, or an iterator of DataFrame chunks, into a table
+    in one transaction. On Postgres every batch is streamed through COPY FROM
+    STDIN; MySQL and SQLite get chunked executemany inserts. Only one batch
+    is held in memory at a time. Database errors are raised (pandas wraps
+    those of an insert in pandas.errors.DatabaseError).
+
+    Parameters:
+        engine (Engine) - Target database
+        table_name (str) - Target table name
+        data (DataFrame or iterable of DataFrames) - Rows to load
+        if_exists (str) - 'fail', 'replace' or 'append', applied before the first batch
+        chunksize (int) - Rows per COPY (or executemany) batch
+        schema (str) - Target schema, defaults to the search path
+
+    Returns:
+        dict with rows, batches, batch_size, seconds and rows_per_sec
+    """
+    method = _copy_from_stdin if engine.dialect.name == "postgresql" else None
+    rows = batches = 0
+    start = time.perf_counter()
+    with engine.begin() as connection:
+        for chunk in _iter_chunks(data, chunksize):
+            chunk.to_sql(
+                name=table_name,
+                con=connection,
+                schema=schema,
+                if_exists=if_exists if batches == 0 else 'append',
+                index=False,
+                method=method,
+                chunksize=chunksize
+            )
+            rows += len(chunk)
+            batches += 1
+    seconds = time.perf_counter() - start
+    return {
+        "rows": rows,
+        "batches": batches,
+        "batch_size": chunksize,
+        "seconds": round(seconds, 3),
+        "rows_per_sec": round(rows / seconds, 1) if seconds else None,
+    }
@@ -0,0 +1,215 @@
+# database/catalog.py
+import logging
+import threading
+import time
+
+import pandas as pd
+from sqlalchemy import text
+
+from database.engines import build_url, get_engine, pool_status
+from database.profiling import PROFILE_SAMPLE_ROWS, PROFILE_WORKERS, profile_table
+from logic.timing import annotate, span, timed
+
+logger = logging.getLogger(__name__)
+
+# How long a catalog sweep is trusted before it is refreshed automatically
+CATALOG_TTL_SECONDS = 300
+
+# One query per dialect that returns every column of every table in the
+# schema the app browses, so the interactive loop never has to ask again.
+CATALOG_QUERIES = {
+    "postgres": """
+        SELECT cl.relname AS table_name, a.attname AS column_name,
+               format_type(a.atttypid, a.atttypmod) AS data_type,
+               NOT a.attnotnull AS is_nullable,
+               col_description(cl.oid, a.attnum) AS column_comment,
+               a.attnum AS ordinal_position
+        FROM pg_catalog.pg_attribute a
+        JOIN pg_catalog.pg_class cl ON cl.oid = a.attrelid
+        JOIN pg_catalog.pg_namespace n ON n.oid = cl.relnamespace
+        WHERE n.nspname = 'public' AND cl.relkind IN ('r', 'p')
+          AND a.attnum > 0 AND NOT a.attisdropped
+        ORDER BY cl.relname, a.attnum;
+    """,
+    "mysql": """
+        SELECT table_name AS table_name, column_name AS column_name,
+               column_type AS data_type, is_nullable = 'YES' AS is_nullable,
+               column_comment AS column_comment, ordinal_position AS ordinal_position
+        FROM information_schema.columns
+        WHERE table_schema = DATABASE()
+        ORDER BY table_name, ordinal_position;
+    """,
+    "sqlite": """
+        SELECT m.name AS table_name, p.name AS column_name, p.type AS data_type,
+               p."notnull" = 0 AS is_nullable, NULL AS column_comment,
+               p.cid + 1 AS ordinal_position
+        FROM sqlite_master m JOIN pragma_table_info(m.name) p
+        WHERE m.type = 'table'
+        ORDER BY m.name, p.cid;
+    """,
+}
+CATALOG_COLUMNS = ["table_name", "column_name", "data_type", "is_nullable", "column_comment", "ordinal_position"]
+
+class DatabaseConnector:
+    def __init__(self, db_type, catalog_ttl=CATALOG_TTL_SECONDS, pool_options=None, **kwargs):
+        self.db_type = db_type
+        self.kwargs = kwargs
+        self.engine = None
+        self.pool_options = pool_options or {}
+        self.catalog_ttl = catalog_ttl
+        self._catalog = None
+        self._catalog_by_table = {}
+        self._catalog_loaded_at = 0.0
+        self._catalog_lock = threading.Lock()
+        self._profiles = {}
+
+    def handle_error(self, message):
+        # The Streamlit app shows these with st.error instead
+        logger.error(message)
+        annotate(error=message)
+
+    @timed("db.connect")
+    def connect(self):
+        try:
+            if self.db_type not in ("postgres", "mysql", "sqlite"):
+                self.handle_error(f"Unsupported database type: {self.db_type}")
+                return False
+            # Engines come from the shared registry, so every session using the
+            # same database borrows connections from one pool
+            self.engine = get_engine(build_url(self.db_type, **self.kwargs), **self.pool_options)
+
+            # Test connection by connecting once
+            with self.engine.connect() as conn:
+                pass
+            return True
+        except Exception as e:
+            self.handle_error(f"Failed to connect: {e}")
+            return False
+
+    @property
+    def key(self):
+        """Identifies the database this connector points at (without the password)."""
+        if self.db_type == "sqlite":
+            return f"sqlite:///{self.kwargs.get('db_path')}"
+        k = self.kwargs
+        return f"{self.db_type}://{k.get('user')}@{k.get('host')}:{k.get('port')}/{k.get('database')}"
+
+    def pool_status(self):
+        """Connection pool usage of this connector's shared engine."""
+        return pool_status(self.engine) if self.engine is not None else {}
+
+    @timed("db.get_all_tables", rows=len)
+    def get_all_tables(self):
+        try:
+            if self.db_type == "postgres":
+                query = """
+                    SELECT table_name FROM information_schema.tables 
+                    WHERE table_schema = 'public' AND table_type = 'BASE TABLE';
+                """
+            elif self.db_type == "mysql":
+                query = "SHOW TABLES"
+            elif self.db_type == "sqlite":
+                query = "SELECT name FROM sqlite_master WHERE type='table';"
+            else:
+                return []
+
+            with self.engine.connect() as conn:
+                result = conn.execute(text(query))
+                tables = [row[0] for row in result]
+                return tables
+        except Exception as e:
+            self.handle_error(f"Failed to fetch tables: {e}")
+            return []
+
+    def load_catalog(self, force=False):
+        """
+        Returns name, type, nullability and comment of every column of every
+        table as one DataFrame, fetched with a single catalog query and then
+        served from memory until the TTL expires or invalidate_catalog() is called.
+        """
+        with self._catalog_lock, span("db.load_catalog", db=self.db_type) as s:
+            fresh = time.monotonic() - self._catalog_loaded_at < self.catalog_ttl
+            if self._catalog is not None and fresh and not force:
+                s["cache"], s["rows"] = "hit", len(self._catalog)
+                return self._catalog
+            s["cache"] = "miss"
+            query = CATALOG_QUERIES.get(self.db_type)
+            if query is None or self.engine is None:
+                return pd.DataFrame(columns=CATALOG_COLUMNS)
+            try:
+                with self.engine.connect() as conn:
+                    catalog = pd.DataFrame(conn.execute(text(query)).fetchall(), columns=CATALOG_COLUMNS)
+            except Exception as e:
+                self.handle_error(f"Failed to load the database catalog: {e}")
+                return pd.DataFrame(columns=CATALOG_COLUMNS)
+            catalog["is_nullable"] = catalog["is_nullable"].astype(bool)
+            self._catalog = catalog
+            self._catalog_by_table = {table: rows for table, rows in catalog.groupby("table_name", sort=False)}
+            self._catalog_loaded_at = time.monotonic()
+            s["rows"] = len(catalog)
+            return catalog
+
+    def invalidate_catalog(self):
+        """Drops the cached catalog so the next lookup sweeps the database again."""
+        with self._catalog_lock:
+            self._catalog = None
+            self._catalog_by_table = {}
+            self._catalog_loaded_at = 0.0
+            self._profiles = {}
+
+    def get_column_info(self, table_name):
+        """Catalog rows (name, type, nullability, comment) for one table, in column order."""
+        self.load_catalog()
+        rows = self._catalog_by_table.get(table_name)
+        if rows is None:
+            return pd.DataFrame(columns=CATALOG_COLUMNS)
+        return rows
+
+    @timed("db.get_table_columns", rows=len)
+    def get_table_columns(self, table_name):
+        return self.get_column_info(table_name)["column_name"].tolist()
+
+    def profile_table(self, table_name, sample_rows=PROFILE_SAMPLE_ROWS, max_workers=PROFILE_WORKERS, force=False):
+        """
+        Per-column statistics of a table (type, null ratio, distinct count,
+        min/max, top values), computed by aggregate queries inside the
+        database over a bounded sample and run concurrently across columns.
+        Results are cached per table and sample size until the catalog is
+        invalidated. Returns a dict with the profile DataFrame, the sampled
+        percent (None without TABLESAMPLE), sample_rows and profiled_at.
+        """
+        key = (table_name, sample_rows)
+        cached = self._profiles.get(key)
+        if cached is not None and not force:
+            return cached
+        column_info = self.get_column_info(table_name)
+        with span("db.profile_table", db=self.db_type, rows=len(column_info)):
+            try:
+                profile, percent = profile_table(self.engine, self.db_type, table_name, column_info,
+                                                 sample_rows=sample_rows, max_workers=max_workers)
+            except Exception as e:
+                self.handle_error(f"Failed to profile {table_name}: {e}")
+                return None
+        cached = self._profiles[key] = {
+            "profile": profile,
+            "sample_percent": percent,
+            "sample_rows": sample_rows,
+            "profiled_at": time.time(),
+        }
+        return cached
+
+    def cached_profile(self, table_name):
+        """The most recent profile of a table, or None if it has not been profiled."""
+        profiles = [p for (table, _), p in self._profiles.items() if table == table_name]
+        return max(profiles, key=lambda p: p["profiled_at"]) if profiles else None
+
+    def stream_table(self, table_name, columns=None, chunksize=50_000):
+        """
+        Yields a table as DataFrame chunks over a server-side cursor, so even
+        a multi-million-row table is never held in memory at once.
+        """
+        quote = self.engine.dialect.identifier_preparer.quote
+        selected = ", ".join(quote(c) for c in columns) if columns else "*"
+        query = text(f"SELECT {selected} FROM {quote(table_name)}")
+        with self.engine.connect().execution_options(stream_results=True) as conn:
+            yield from pd.read_sql(query, conn, chunksize=chunksize)
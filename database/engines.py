@@ -0,0 +1,95 @@
+# database/engines.py
+import os
+import threading
+
+from sqlalchemy import URL, create_engine, make_url
+
+# Pool settings, overridable per deployment through the environment
+DEFAULT_POOL_OPTIONS = {
+    "pool_size": int(os.environ.get("FAIRMAPPER_POOL_SIZE", 5)),
+    "max_overflow": int(os.environ.get("FAIRMAPPER_POOL_MAX_OVERFLOW", 10)),
+    "pool_recycle": int(os.environ.get("FAIRMAPPER_POOL_RECYCLE", 1800)),
+    "pool_timeout": int(os.environ.get("FAIRMAPPER_POOL_TIMEOUT", 30)),
+    "pool_pre_ping": os.environ.get("FAIRMAPPER_POOL_PRE_PING", "1") != "0",
+}
+
+# Only these options make sense for SQLite's in-memory single-connection pool
+_MEMORY_SQLITE_OPTIONS = ("pool_recycle", "pool_pre_ping")
+
+DRIVERS = {
+    "postgres": "postgresql+psycopg2",
+    "mysql": "mysql+mysqlconnector",
+    "sqlite": "sqlite",
+}
+
+# One engine (and so one connection pool) per URL + pool options, shared by
+# every session and every database class in this process.
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def build_url(db_type, user=None, password=None, host=None, port=None, database=None, db_path=None):
+    """Builds a SQLAlchemy URL; credentials are escaped, unlike an f-string URL."""
+    if db_type not in DRIVERS:
+        raise ValueError(f"Unsupported database type: {db_type}")
+    if db_type == "sqlite":
+        return URL.create(DRIVERS[db_type], database=db_path)
+    return URL.create(
+        DRIVERS[db_type],
+        username=user,
+        password=password,
+        host=host,
+        port=int(port) if port else None,
+        database=database,
+    )
+
+
+def get_engine(url, **pool_options):
+    """
+    Returns the shared engine for a URL, creating it on first use.
+
+    Keyword arguments override DEFAULT_POOL_OPTIONS (pool_size, max_overflow,
+    pool_recycle, pool_timeout, pool_pre_ping); engines with different
+    options are kept apart.
+    """
+    url = make_url(url)
+    options = {**DEFAULT_POOL_OPTIONS, **pool_options}
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        options = {k: v for k, v in options.items() if k in _MEMORY_SQLITE_OPTIONS}
+    key = (url.render_as_string(hide_password=False), tuple(sorted(options.items())))
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = _engines[key] = create_engine(url, **options)
+        return engine
+
+
+def pool_status(engine):
+    """Size and usage of an engine's connection pool as a dict."""
+    pool = engine.pool
+    stats = {"url": engine.url.render_as_string(hide_password=True), "pool": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        # SingletonThreadPool (in-memory SQLite) has a plain `size` attribute
+        if callable(method):
+            stats[name] = method()
+    if "overflow" in stats:
+        # QueuePool counts overflow up from -size: negative until the pool is full
+        stats["overflow"] = max(0, stats["overflow"])
+    return stats
+
+
+def pool_stats():
+    """Pool status of every shared engine in this process."""
+    with _engines_lock:
+        engines = list(_engines.values())
+    return [pool_status(engine) for engine in engines]
+
+
+def dispose_engines():
+    """Closes every pooled connection and forgets the shared engines."""
+    with _engines_lock:
+        engines = list(_engines.values())
+        _engines.clear()
+    for engine in engines:
+        engine.dispose()
@@ -1,22 +1,184 @@
 # database/mysql.py
-import mysql.connector
+import logging
+import re
+
 import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from database.bulk import bulk_load
+from database.engines import build_url, get_engine
+from logic.timing import annotate, timed
+
+logger = logging.getLogger(__name__)
+
+def _ddl(fragment):
+    # Percent signs are doubled as the statements are sent with %s parameters
+    return str(fragment).replace('%', '%%')
+
+def _quote_identifier(name):
+    return '`' + _ddl(str(name).replace('`', '``')) + '`'
+
+# Timestamp defaults as MySQL 5.7 (CURRENT_TIMESTAMP(3)) and MariaDB
+# (current_timestamp()) report them: expressions, but not flagged DEFAULT_GENERATED
+_TIMESTAMP_DEFAULT_RE = re.compile(
+    r"(current_timestamp|localtimestamp|localtime)(\(\d?\))?|now\(\d?\)", re.IGNORECASE
+)
+
+def _default_kind(info):
+    """'expression', 'timestamp', 'literal' or None for a column's catalog default."""
+    default = info["column_default"]
+    if default is None:
+        return None
+    if "DEFAULT_GENERATED" in (info["extra"] or ""):
+        return "expression"
+    # Only temporal columns can default to the current time, so a text
+    # column whose literal default reads CURRENT_TIMESTAMP stays a literal
+    is_temporal = info["column_type"].lower().startswith(("timestamp", "datetime"))
+    if is_temporal and _TIMESTAMP_DEFAULT_RE.fullmatch(default.strip()):
+        return "timestamp"
+    return "literal"
 
 class MySQLDB:
-    def __init__(self, user, database, host='localhost', password='', port=3306):
-        self.conn = mysql.connector.connect(
-            user=user,
-            password=password,
-            host=host,
-            port=port,
-            database=database
+    def __init__(self, user, database, host='localhost', password='', port=3306, **pool_options):
+        self.engine = get_engine(
+            build_url("mysql", user=user, password=password, host=host, port=port, database=database),
+            **pool_options
         )
 
+    def handle_error(self, error, context):
+        logger.error("Error in %s: %s", context, error)
+        # Marks the enclosing timing span as failed
+        annotate(error=type(error).__name__)
+
     def get_table_names_and_comments(self):
-        cursor = self.conn.cursor()
-        cursor.execute("SHOW TABLES")
-        tables = cursor.fetchall()
+        with self.engine.connect() as conn:
+            tables = conn.exec_driver_sql("SHOW TABLES").fetchall()
         return pd.DataFrame(tables, columns=['table_name'])
 
     def read_records(self, query):
-        return pd.read_sql(query, self.conn)
\ No newline at end of file
+        return pd.read_sql(query, self.engine)
+
+    @timed("db.bulk_load_records", rows=lambda stats: stats["rows"])
+    def bulk_load_records(self, table_name, data, if_exists='append', chunksize=100_000):
+        """
+        Bulk-load a DataFrame, or an iterator of DataFrame chunks, into a table
+        with chunked executemany inserts (see database.bulk.bulk_load).
+
+        Returns:
+            dict with rows, batches, batch_size, seconds and rows_per_sec, or None on error
+        """
+        try:
+            return bulk_load(self.engine, table_name, data, if_exists=if_exists, chunksize=chunksize)
+        except (SQLAlchemyError, pd.errors.DatabaseError) as e:
+            self.handle_error(e, "bulk loading dataframe records")
+            return None
+
+    @timed("db.add_comments", rows=lambda stats: stats["written"])
+    def add_comments(self, comments, table=None):
+        """
+        MySQL counterpart of PostgresDB.add_comments.
+
+        MySQL only sets a column comment through MODIFY COLUMN with the full
+        column definition, so each table gets a single ALTER TABLE that
+        re-states the definition read from information_schema for every
+        changed column. Unchanged comments are skipped. Every statement is
+        built before the first one runs, so an unknown or generated column
+        writes nothing; DDL commits implicitly in MySQL, so a database error
+        is atomic per table, not across tables.
+
+        Parameters:
+            comments (dict) - {column: comment} for one table when `table` is given,
+                otherwise {table: {column: comment}}; the column None comments on
+                the table itself
+            table (str) - Table the comments belong to
+
+        Returns:
+            dict - Number of comments written and skipped, or None on error
+        """
+        by_table = {table: comments} if table is not None else comments
+        try:
+            with self.engine.connect() as conn:
+                columns_info = conn.execute(text("""
+                    SELECT table_name, column_name, column_type, is_nullable, column_default,
+                           extra, collation_name, column_comment
+                    FROM information_schema.columns
+                    WHERE table_schema = DATABASE()
+                """)).mappings().all()
+                table_comments = dict(conn.execute(text("""
+                    SELECT table_name, table_comment FROM information_schema.tables
+                    WHERE table_schema = DATABASE()
+                """)).fetchall())
+        except SQLAlchemyError as e:
+            self.handle_error(e, "reading existing comments")
+            return None
+        definitions = {(row["table_name"], row["column_name"]): row for row in columns_info}
+
+        statements = []
+        skipped = 0
+        for table_name, columns in by_table.items():
+            clauses, params = [], []
+            for column, comment in columns.items():
+                if column is None:
+                    if table_comments.get(table_name) == comment:
+                        skipped += 1
+                        continue
+                    clauses.append("COMMENT = %s")
+                    params.append(comment)
+                    continue
+                info = definitions.get((table_name, column))
+                if info is None:
+                    self.handle_error(KeyError(f"Unknown column {table_name}.{column}"), "adding comments")
+                    return None
+                if info["column_comment"] == comment:
+                    skipped += 1
+                    continue
+                try:
+                    clauses.append(self._modify_column_clause(info))
+                except ValueError as e:
+                    self.handle_error(e, "adding comments")
+                    return None
+                params.extend(self._modify_column_params(info) + [comment])
+            if clauses:
+                statements.append((f"ALTER TABLE {_quote_identifier(table_name)} " + ", ".join(clauses),
+                                   tuple(params), len(clauses)))
+
+        written = 0
+        query = None
+        try:
+            for query, params, count in statements:
+                with self.engine.begin() as conn:
+                    conn.exec_driver_sql(query, params)
+                written += count
+        except SQLAlchemyError as e:
+            self.handle_error(e, query)
+            return None
+        return {"written": written, "skipped": skipped}
+
+    @staticmethod
+    def _modify_column_clause(info):
+        """MODIFY COLUMN clause that keeps a column's definition and only sets its comment."""
+        # Text read from the catalog (enum members, default expressions) may hold % signs
+        clause = f"MODIFY COLUMN {_quote_identifier(info['column_name'])} {_ddl(info['column_type'])}"
+        if info["collation_name"]:
+            clause += f" COLLATE {_ddl(info['collation_name'])}"
+        clause += " NULL" if info["is_nullable"] == "YES" else " NOT NULL"
+        kind = _default_kind(info)
+        if kind == "expression":
+            # MySQL 8 flags expression defaults DEFAULT_GENERATED
+            clause += f" DEFAULT ({_ddl(info['column_default'])})"
+        elif kind == "timestamp":
+            # Written bare, the only form MySQL 5.7 accepts
+            clause += f" DEFAULT {_ddl(info['column_default'].strip())}"
+        elif kind == "literal":
+            clause += " DEFAULT %s"
+        extra = (info["extra"] or "").replace("DEFAULT_GENERATED", "").strip()
+        if "GENERATED" in extra:
+            raise ValueError(f"Cannot comment generated column {info['column_name']} without its expression")
+        if extra:
+            clause += f" {_ddl(extra)}"
+        return clause + " COMMENT %s"
+
+    @staticmethod
+    def _modify_column_params(info):
+        return [info["column_default"]] if _default_kind(info) == "literal" else []
@@ -7,48 +7,239 @@ PostgreSQL operations module.
 Author: Brent
 """
 
+import contextvars
+import datetime
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
 
+from database.bulk import _quote_identifier, bulk_load
+from database.engines import build_url, get_engine
+from logic.timing import annotate, timed
+
+logger = logging.getLogger(__name__)
+
+class IncompleteReadError(RuntimeError):
+    """A streamed or windowed read failed partway, so the rows already returned are not the whole result."""
+
+def _frame_rows(result):
+    # Row count of a returned DataFrame; streamed (generator) results count as 0
+    return len(result) if isinstance(result, pd.DataFrame) else 0
+
+def _date_windows(start_date, end_date, window):
+    """
+    Splits [start_date, end_date] into consecutive (lo, hi, last) windows of
+    the given pandas frequency ('30D', '1MS', ...). Every window is half-open
+    except the last one, which includes end_date like BETWEEN does.
+    """
+    start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+    bounds = [b for b in pd.date_range(start, end, freq=window) if b > start]
+    bounds = [start] + bounds + ([end] if not bounds or bounds[-1] != end else [])
+    has_time = any(b != b.normalize() for b in (start, end))
+    convert = (lambda b: b.to_pydatetime()) if has_time or isinstance(start_date, datetime.datetime) else (lambda b: b.date())
+    windows = [(convert(lo), convert(hi), False) for lo, hi in zip(bounds[:-1], bounds[1:])]
+    if windows:
+        windows[-1] = (windows[-1][0], windows[-1][1], True)
+    else:
+        windows = [(convert(start), convert(end), True)]
+    return windows
+
+# Width of the EL current windows around Isc and 0.1*Isc, as a fraction of Isc
+EL_TOLERANCE = 0.05
+
+EL_PAIR_COLUMNS = [
+    "module_id", "date", "isc",
+    "tenth_isc_id", "tenth_isc_time", "tenth_isc_current",
+    "one_isc_id", "one_isc_time", "one_isc_current",
+]
+
+def pair_el_measurements(el_df, tolerance=EL_TOLERANCE):
+    """
+    Vectorized EL pair finder over many modules at once.
+
+    el_df needs module_id, ID, date, time, current and isc columns. Each row
+    is classified as near Isc or near 0.1*Isc (within tolerance*Isc), the
+    first row of each class per module and date is kept, and dates that
+    have both become one row of the returned pairs table.
+    """
+    if el_df.empty:
+        return pd.DataFrame(columns=EL_PAIR_COLUMNS)
+    el_df = el_df.assign(
+        current=el_df["current"].astype(float),
+        isc=el_df["isc"].astype(float),
+        date=pd.to_datetime(el_df["date"]).dt.date,
+    )
+    window = tolerance * el_df["isc"]
+    level = np.select(
+        [
+            (el_df["current"] - el_df["isc"]).abs() <= window,
+            (el_df["current"] - 0.1 * el_df["isc"]).abs() <= window,
+        ],
+        ["one_isc", "tenth_isc"],
+        default="",
+    )
+    matches = (
+        el_df[level != ""]
+        .assign(level=level[level != ""])
+        .sort_values(["module_id", "date", "time"], kind="stable")
+        .drop_duplicates(["module_id", "date", "level"])
+    )
+    sides = {}
+    for name in ("tenth_isc", "one_isc"):
+        side = matches[matches["level"] == name][["module_id", "date", "isc", "ID", "time", "current"]]
+        sides[name] = side.rename(columns={"ID": f"{name}_id", "time": f"{name}_time", "current": f"{name}_current"})
+    pairs = sides["tenth_isc"].merge(sides["one_isc"].drop(columns="isc"), on=["module_id", "date"])
+    return pairs[EL_PAIR_COLUMNS].sort_values(["module_id", "date"]).reset_index(drop=True)
+
 class PostgresDB:
-    def __init__(self, username, password, host="34.73.180.136", port=5432, database="fsecdatabase"):
+    def __init__(self, username, password, host="34.73.180.136", port=5432, database="fsecdatabase", **pool_options):
         self.username = username
         self.password = password
         self.host = host
         self.port = port
         self.database = database
-        self.engine = create_engine(f"postgresql://{username}:{password}@{host}:{port}/{database}")
+        # Shared, pooled engine: every PostgresDB for the same server reuses one pool
+        self.engine = get_engine(
+            build_url("postgres", user=username, password=password, host=host, port=port, database=database),
+            **pool_options
+        )
 
     def handle_error(self, error, context):
-        print(f"Error in {context}: {str(error)}")  # Replace with logger if needed
+        logger.error("Error in %s: %s", context, error)
+        # Marks the enclosing timing span as failed
+        annotate(error=type(error).__name__)
 
     def create_postgres_records_from_dataframe(self, table_name, dataframe, if_exists='replace'):
+        # COPY-based, so large frames no longer go through multi-row INSERTs
+        return self.bulk_load_records(table_name, dataframe, if_exists=if_exists)
+
+    @timed("db.bulk_load_records", rows=lambda stats: stats["rows"])
+    def bulk_load_records(self, table_name, data, if_exists='append', chunksize=100_000, schema=None):
+        """
+        Bulk-load a DataFrame, or an iterator of DataFrame chunks, into a table
+        with one COPY FROM STDIN per batch (see database.bulk.bulk_load).
+
+        Returns:
+            dict with rows, batches, batch_size, seconds and rows_per_sec, or None on error
+        """
         try:
-            dataframe.to_sql(
-                name=table_name,
-                con=self.engine,
-                if_exists=if_exists,
-                index=False,
-                method='multi'
-            )
-        except SQLAlchemyError as e:
-            self.handle_error(e, "inserting dataframe records")
+            return bulk_load(self.engine, table_name, data, if_exists=if_exists, chunksize=chunksize, schema=schema)
+        except (SQLAlchemyError, pd.errors.DatabaseError) as e:
+            self.handle_error(e, "bulk loading dataframe records")
+            return None
 
-    def read_records_from_postgres(self, query, params=None):
+    @timed("db.read_records", rows=_frame_rows)
+    def read_records_from_postgres(self, query, params=None, chunksize=None):
+        if chunksize:
+            return self.stream_records_from_postgres(query, params, chunksize=chunksize)
         try:
             return pd.read_sql(query, self.engine, params=params)
         except SQLAlchemyError as e:
             self.handle_error(e, "fetching data with SQLAlchemy")
             return None
 
-    def fetch_data_by_date(self, table_name, start_date, end_date):
-        query = f"""
-        SELECT * FROM {table_name} 
-        WHERE date BETWEEN %s AND %s;
+    def stream_records_from_postgres(self, query, params=None, chunksize=50_000, as_arrow=False):
         """
-        return self.read_records_from_postgres(query, (start_date, end_date))
+        Yield the result of a query in chunks instead of materializing it.
+        The query runs on a server-side (named) cursor, so neither the
+        driver nor pandas holds more than one chunk of rows at a time.
+
+        Parameters:
+            query (str) - SQL query, with %s placeholders for params
+            params (tuple) - Query parameters
+            chunksize (int) - Rows per yielded chunk
+            as_arrow (bool) - Yield pyarrow RecordBatches instead of DataFrames
+        """
+        if as_arrow:
+            import pyarrow as pa  # optional, only needed for Arrow output
+        try:
+            with self.engine.connect() as connection:
+                connection = connection.execution_options(stream_results=True, max_row_buffer=chunksize)
+                for chunk in pd.read_sql(query, connection, params=params, chunksize=chunksize):
+                    yield pa.RecordBatch.from_pandas(chunk, preserve_index=False) if as_arrow else chunk
+        except (SQLAlchemyError, pd.errors.DatabaseError) as e:
+            self.handle_error(e, "streaming data with SQLAlchemy")
+            # Chunks may already have been consumed: a silent end would pass as the full result
+            raise IncompleteReadError(f"Streaming query failed partway: {e}") from e
+
+    def quote_table_name(self, table_name):
+        """Quotes each part of a (schema-qualified) table name where the dialect requires it."""
+        preparer = self.engine.dialect.identifier_preparer
+        return ".".join(preparer.quote(part) for part in table_name.split("."))
+
+    @timed("db.fetch_data_by_date", rows=_frame_rows)
+    def fetch_data_by_date(self, table_name, start_date, end_date, chunksize=None, window=None, max_workers=4, concat=True):
+        """
+        Fetch the rows of a table whose date lies between start_date and end_date.
+
+        With window (a pandas frequency such as '30D' or '1MS') the range is
+        split into date windows that are read concurrently on a thread pool,
+        each on its own pooled connection. Per-window timings are left in
+        self.last_fetch_timings, in window order. If any window fails the
+        whole fetch does: None is returned, or IncompleteReadError is raised
+        by the generator when concat is False.
+
+        Parameters:
+            table_name (str) - Table name, optionally schema-qualified
+            start_date, end_date - Inclusive date range
+            chunksize (int) - Stream the single-query read in chunks (ignored with window)
+            window (str) - Partition the range into windows of this frequency
+            max_workers (int) - Concurrent window reads, keep within the pool size
+            concat (bool) - Return one DataFrame; otherwise yield window results in order
+        """
+        table = self.quote_table_name(table_name)
+        if window is None:
+            query = f"""
+            SELECT * FROM {table} 
+            WHERE date BETWEEN %s AND %s;
+            """
+            return self.read_records_from_postgres(query, (start_date, end_date), chunksize=chunksize)
+
+        windows = _date_windows(start_date, end_date, window)
+        timings = self.last_fetch_timings = [None] * len(windows)
+
+        def read_window(i, bounds):
+            lo, hi, last = bounds
+            query = f"SELECT * FROM {table} WHERE date >= %s AND date {'<=' if last else '<'} %s;"
+            started = time.perf_counter()
+            frame = self.read_records_from_postgres(query, (lo, hi))
+            timings[i] = {
+                "start": lo,
+                "end": hi,
+                "rows": 0 if frame is None else len(frame),
+                "seconds": round(time.perf_counter() - started, 3),
+            }
+            return frame
+
+        def ordered_results():
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(windows)))) as executor:
+                # Each task runs in a copy of this context, so its spans nest under the caller's
+                futures = [executor.submit(contextvars.copy_context().run, read_window, i, bounds)
+                           for i, bounds in enumerate(windows)]
+                # Results are handed back in window order, whatever order they finish in
+                for future, (lo, hi, _) in zip(futures, windows):
+                    frame = future.result()
+                    if frame is None:
+                        for pending in futures:
+                            pending.cancel()
+                        raise IncompleteReadError(f"Reading {table_name} from {lo} to {hi} failed")
+                    yield frame
+
+        if not concat:
+            return ordered_results()
+        try:
+            frames = list(ordered_results())
+        except IncompleteReadError:
+            # Like the single-query read: no partial range passes as the result
+            return None
+        return pd.concat(frames, ignore_index=True) if frames else None
 
+    @timed("db.get_table_names_and_comments", rows=_frame_rows)
     def get_table_names_and_comments(self):
         query = """
         SELECT c.relname AS table_name, obj_description(c.oid) AS table_comment
@@ -58,6 +249,7 @@ class PostgresDB:
         """
         return self.read_records_from_postgres(query)
 
+    @timed("db.get_table_schema", rows=_frame_rows)
     def get_table_schema(self, table_name):
         query = """
         SELECT column_name, data_type, character_maximum_length, is_nullable, column_default
@@ -66,6 +258,7 @@ class PostgresDB:
         """
         return self.read_records_from_postgres(query, (table_name,))
 
+    @timed("db.get_el_pairs", rows=len)
     def get_el_pairs(self, module_id):
         try:
             # Step 1: Get Isc
@@ -111,6 +304,63 @@ class PostgresDB:
             self.handle_error(e, "get_el_pairs")
             return {"error": str(e)}
         
+    @timed("db.get_el_pairs_batch", rows=_frame_rows)
+    def get_el_pairs_batch(self, module_ids, pushdown=True, tolerance=EL_TOLERANCE):
+        """
+        Find EL pairs for many modules with a single query.
+
+        module_metadata is joined to el_metadata in the database. With
+        pushdown the Isc / 0.1*Isc windows and the first-match-per-date
+        selection run in SQL, so only candidate rows come back; without it
+        the joined rows are classified by pair_el_measurements in pandas.
+
+        Parameters:
+            module_ids (list) - Module IDs to scan
+            pushdown (bool) - Filter the tolerance windows in SQL
+            tolerance (float) - Window half-width as a fraction of Isc
+
+        Returns:
+            DataFrame with one row per module and date that has both a
+            0.1*Isc and an Isc measurement (see EL_PAIR_COLUMNS), or None on error
+        """
+        module_ids = list(module_ids)
+        if not module_ids:
+            return pd.DataFrame(columns=EL_PAIR_COLUMNS)
+        joined = """
+            SELECT m."module_id", m."nameplate_isc"::float AS isc,
+                   e."ID", e."date"::date AS date, e."time", e."current"::float AS current
+            FROM instrument_data.module_metadata m
+            JOIN instrument_data.el_metadata e ON e."module-id" = m."module_id"
+            WHERE m."module_id" = ANY(%(ids)s) AND e."module-id" = ANY(%(ids)s)
+        """
+        if pushdown:
+            query = f"""
+            WITH joined AS ({joined}),
+            classified AS (
+                SELECT *, CASE
+                    WHEN abs(current - isc) <= %(tolerance)s * isc THEN 'one_isc'
+                    WHEN abs(current - 0.1 * isc) <= %(tolerance)s * isc THEN 'tenth_isc'
+                END AS level
+                FROM joined
+            ),
+            ranked AS (
+                SELECT *, ROW_NUMBER() OVER (PARTITION BY "module_id", date, level ORDER BY "time") AS rn
+                FROM classified
+                WHERE level IS NOT NULL
+            )
+            SELECT "module_id", isc, "ID", date, "time", current FROM ranked WHERE rn = 1
+            """
+        else:
+            query = joined
+        el_df = self.read_records_from_postgres(query, {"ids": module_ids, "tolerance": tolerance})
+        if el_df is None:
+            return None
+        try:
+            return pair_el_measurements(el_df, tolerance)
+        except Exception as e:
+            self.handle_error(e, "get_el_pairs_batch")
+            return None
+
     def add_comment(self, schema='public', table='table_name', column='name_of_column', comment='ontology URI, definition'):
         """
         Add a comment to a table or a column in a table
@@ -134,6 +384,88 @@ class PostgresDB:
             self.handle_error(e, query)
             return False
 
+    def get_comments(self, schema='public', tables=None):
+        """
+        Current table and column comments of a schema in one catalog query.
+
+        Parameters:
+            schema (str) - Database schema name
+            tables (list) - Only these tables (all tables in the schema when None)
+
+        Returns:
+            dict - {(table, column): comment}, with column None for the table comment
+        """
+        query = text("""
+            SELECT cl.relname, a.attname, col_description(cl.oid, a.attnum)
+            FROM pg_catalog.pg_class cl
+            JOIN pg_catalog.pg_namespace n ON n.oid = cl.relnamespace
+            JOIN pg_catalog.pg_attribute a ON a.attrelid = cl.oid AND a.attnum > 0 AND NOT a.attisdropped
+            WHERE n.nspname = :schema AND cl.relkind IN ('r', 'p', 'v', 'm')
+              AND (CAST(:tables AS text[]) IS NULL OR cl.relname = ANY(:tables))
+            UNION ALL
+            SELECT cl.relname, NULL, obj_description(cl.oid, 'pg_class')
+            FROM pg_catalog.pg_class cl
+            JOIN pg_catalog.pg_namespace n ON n.oid = cl.relnamespace
+            WHERE n.nspname = :schema AND cl.relkind IN ('r', 'p', 'v', 'm')
+              AND (CAST(:tables AS text[]) IS NULL OR cl.relname = ANY(:tables))
+        """)
+        with self.engine.connect() as connection:
+            rows = connection.execute(query, {"schema": schema, "tables": list(tables) if tables else None})
+            return {(table, column): comment for table, column, comment in rows}
+
+    @timed("db.add_comments", rows=lambda stats: stats["written"])
+    def add_comments(self, comments, schema='public', table=None, batch_size=500):
+        """
+        Writes many table/column comments (e.g. a whole mapping of columns to
+        ontology URIs) in one transaction. Comments that already have the
+        requested text are skipped, and the remaining COMMENT statements are
+        sent batch_size at a time, one round trip per batch.
+
+        Parameters:
+            comments (dict) - {column: comment} for one table when `table` is given,
+                otherwise {table: {column: comment}} for the whole schema; the
+                column None comments on the table itself
+            schema (str) - Database schema name
+            table (str) - Table the comments belong to
+            batch_size (int) - COMMENT statements per round trip
+
+        Returns:
+            dict - Number of comments written and skipped, or None on error
+        """
+        by_table = {table: comments} if table is not None else comments
+        try:
+            existing = self.get_comments(schema, tables=list(by_table))
+        except SQLAlchemyError as e:
+            self.handle_error(e, "reading existing comments")
+            return None
+
+        # Literal percent signs in identifiers must not be read as placeholders
+        quote = lambda name: _quote_identifier(name).replace("%", "%%")
+        statements, params = [], []
+        skipped = 0
+        for table_name, columns in by_table.items():
+            target = f"{quote(schema)}.{quote(table_name)}"
+            for column, comment in columns.items():
+                if existing.get((table_name, column)) == comment:
+                    skipped += 1
+                    continue
+                if column is None:
+                    statement = f"COMMENT ON TABLE {target} IS %s"
+                else:
+                    statement = f"COMMENT ON COLUMN {target}.{quote(column)} IS %s"
+                statements.append(statement)
+                params.append(comment)
+
+        query = None
+        try:
+            with self.engine.begin() as connection:
+                for start in range(0, len(statements), batch_size):
+                    query = ";\n".join(statements[start:start + batch_size])
+                    connection.exec_driver_sql(query, tuple(params[start:start + batch_size]))
+        except SQLAlchemyError as e:
+            self.handle_error(e, query)
+            return None
+        return {"written": len(statements), "skipped": skipped}
 
         
 # Example usage:
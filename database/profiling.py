@@ -0,0 +1,118 @@
+# database/profiling.py
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from logic.timing import span
+
+# Rows each column is profiled over: a TABLESAMPLE of about this size on
+# Postgres, the first this many rows on SQLite and MySQL
+PROFILE_SAMPLE_ROWS = 100_000
+
+# Concurrent column queries, kept within the default pool size
+PROFILE_WORKERS = 4
+
+# Most frequent values reported per column
+TOP_VALUES = 5
+
+PROFILE_COLUMNS = ["column_name", "data_type", "rows_sampled", "null_ratio", "distinct",
+                   "min", "max", "top_values", "seconds", "error"]
+
+
+def sample_clause(engine, db_type, table, sample_rows=PROFILE_SAMPLE_ROWS):
+    """
+    Bounds the scan of the profiling queries: Postgres reads a block sample
+    sized from the planner's row estimate, other dialects a LIMIT. Tables
+    the estimate calls small, and tables never analyzed (reltuples -1, or 0
+    before Postgres 14), get the LIMIT too, so a stale or missing estimate
+    never turns into a full scan. Returns (FROM source, LIMIT clause,
+    sampled percent or None).
+    """
+    quote = engine.dialect.identifier_preparer.quote
+    limit = f"LIMIT {int(sample_rows)}"
+    if db_type != "postgres":
+        return quote(table), limit, None
+    with engine.connect() as conn:
+        estimate = conn.execute(
+            text("SELECT reltuples FROM pg_catalog.pg_class WHERE oid = to_regclass(:t)"),
+            {"t": quote(table)},
+        ).scalar()
+    if estimate is None or estimate <= sample_rows:
+        return quote(table), limit, None
+    percent = round(100 * sample_rows / estimate, 6)
+    # REPEATABLE keeps the sample, and so the profile, stable between runs
+    return f"{quote(table)} TABLESAMPLE SYSTEM ({percent}) REPEATABLE (0)", "", percent
+
+
+def _aggregates(conn, sample):
+    counts = "COUNT(*), COUNT(v), COUNT(DISTINCT v)"
+    try:
+        return conn.execute(text(f"SELECT {counts}, MIN(v), MAX(v) FROM {sample}")).one()
+    except DBAPIError:
+        # No ordering for this type (boolean on Postgres, ...): counts only
+        conn.rollback()
+        return (*conn.execute(text(f"SELECT {counts} FROM {sample}")).one(), None, None)
+
+
+def profile_column(engine, source, limit, column, data_type, top_values=TOP_VALUES):
+    """
+    Profiles one column with two aggregate queries over the sampled rows;
+    only the aggregates and the top values come back to Python.
+    """
+    quote = engine.dialect.identifier_preparer.quote
+    col = quote(column)
+    sample = f"(SELECT {col} AS v FROM {source} {limit}) AS sample"
+    profile = dict.fromkeys(PROFILE_COLUMNS)
+    profile.update(column_name=column, data_type=data_type)
+    started = time.perf_counter()
+    with span("db.profile_column") as s:
+        try:
+            with engine.connect() as conn:
+                rows, non_null, distinct, lo, hi = _aggregates(conn, sample)
+                top = conn.execute(text(
+                    f"SELECT v, COUNT(*) AS n FROM {sample} WHERE v IS NOT NULL "
+                    f"GROUP BY v ORDER BY n DESC LIMIT {int(top_values)}"
+                )).fetchall()
+        except Exception as e:
+            # Types without equality (json, ...) only lose their own row
+            profile["error"] = (str(e).splitlines() or [type(e).__name__])[0]
+            s["error"] = type(e).__name__
+        else:
+            profile.update(
+                rows_sampled=rows,
+                null_ratio=round(1 - non_null / rows, 4) if rows else None,
+                distinct=distinct,
+                min=None if lo is None else str(lo),
+                max=None if hi is None else str(hi),
+                top_values=", ".join(f"{value} ({n:,})" for value, n in top),
+            )
+            s["rows"] = rows
+    profile["seconds"] = round(time.perf_counter() - started, 3)
+    return profile
+
+
+def profile_table(engine, db_type, table, column_info, sample_rows=PROFILE_SAMPLE_ROWS,
+                  max_workers=PROFILE_WORKERS):
+    """
+    Profiles the columns in column_info (catalog rows with column_name and
+    data_type) concurrently, one pooled connection per worker. Returns a
+    DataFrame with one row per column (see PROFILE_COLUMNS) and the sampled
+    percent (None when the table was read without TABLESAMPLE).
+    """
+    source, limit, percent = sample_clause(engine, db_type, table, sample_rows)
+    columns = list(zip(column_info["column_name"], column_info["data_type"]))
+    if not columns:
+        return pd.DataFrame(columns=PROFILE_COLUMNS), percent
+
+    def run(column):
+        return profile_column(engine, source, limit, *column)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(columns)))) as executor:
+        # Each task runs in a copy of this context, so its spans keep the caller's session
+        futures = [executor.submit(contextvars.copy_context().run, run, column) for column in columns]
+        profiles = [future.result() for future in futures]
+    return pd.DataFrame(profiles, columns=PROFILE_COLUMNS), percent
@@ -1,14 +1,42 @@
 # database/sqlite.py
-import sqlite3
+import logging
+
 import pandas as pd
+from sqlalchemy.exc import SQLAlchemyError
+
+from database.bulk import bulk_load
+from database.engines import build_url, get_engine
+from logic.timing import annotate, timed
+
+logger = logging.getLogger(__name__)
 
 class SQLiteDB:
-    def __init__(self, db_path):
-        self.conn = sqlite3.connect(db_path)
+    def __init__(self, db_path, **pool_options):
+        self.engine = get_engine(build_url("sqlite", db_path=db_path), **pool_options)
+
+    def handle_error(self, error, context):
+        logger.error("Error in %s: %s", context, error)
+        # Marks the enclosing timing span as failed
+        annotate(error=type(error).__name__)
 
     def get_table_names_and_comments(self):
         query = "SELECT name as table_name FROM sqlite_master WHERE type='table';"
-        return pd.read_sql(query, self.conn)
+        return pd.read_sql(query, self.engine)
 
     def read_records(self, query):
-        return pd.read_sql(query, self.conn)
\ No newline at end of file
+        return pd.read_sql(query, self.engine)
+
+    @timed("db.bulk_load_records", rows=lambda stats: stats["rows"])
+    def bulk_load_records(self, table_name, data, if_exists='append', chunksize=100_000):
+        """
+        Bulk-load a DataFrame, or an iterator of DataFrame chunks, into a table
+        with chunked executemany inserts (see database.bulk.bulk_load).
+
+        Returns:
+            dict with rows, batches, batch_size, seconds and rows_per_sec, or None on error
+        """
+        try:
+            return bulk_load(self.engine, table_name, data, if_exists=if_exists, chunksize=chunksize)
+        except (SQLAlchemyError, pd.errors.DatabaseError) as e:
+            self.handle_error(e, "bulk loading dataframe records")
+            return None
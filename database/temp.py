@@ -42,17 +42,15 @@ def load_db_columns(db, table_name):
 
 
 # database/postgres.py
-import psycopg2
 import pandas as pd
 
+from database.engines import build_url, get_engine
+
 class PostgresDB:
-    def __init__(self, user, database, host='localhost', password='', port=5432):
-        self.conn = psycopg2.connect(
-            user=user,
-            password=password,
-            host=host,
-            port=port,
-            database=database
+    def __init__(self, user, database, host='localhost', password='', port=5432, **pool_options):
+        self.engine = get_engine(
+            build_url("postgres", user=user, password=password, host=host, port=port, database=database),
+            **pool_options
         )
 
     def get_table_names_and_comments(self):
@@ -61,47 +59,41 @@ class PostgresDB:
         FROM information_schema.tables
         WHERE table_schema = 'instrument_data';
         """
-        return pd.read_sql(query, self.conn)
+        return pd.read_sql(query, self.engine)
 
     def read_records(self, query):
-        return pd.read_sql(query, self.conn)
+        return pd.read_sql(query, self.engine)
 
 
 # database/mysql.py
-import mysql.connector
 import pandas as pd
 
 class MySQLDB:
-    def __init__(self, user, database, host='localhost', password='', port=3306):
-        self.conn = mysql.connector.connect(
-            user=user,
-            password=password,
-            host=host,
-            port=port,
-            database=database
+    def __init__(self, user, database, host='localhost', password='', port=3306, **pool_options):
+        self.engine = get_engine(
+            build_url("mysql", user=user, password=password, host=host, port=port, database=database),
+            **pool_options
         )
 
     def get_table_names_and_comments(self):
-        cursor = self.conn.cursor()
-        cursor.execute("SHOW TABLES")
-        tables = cursor.fetchall()
+        with self.engine.connect() as conn:
+            tables = conn.exec_driver_sql("SHOW TABLES").fetchall()
         return pd.DataFrame(tables, columns=['table_name'])
 
     def read_records(self, query):
-        return pd.read_sql(query, self.conn)
+        return pd.read_sql(query, self.engine)
 
 
 # database/sqlite.py
-import sqlite3
 import pandas as pd
 
 class SQLiteDB:
-    def __init__(self, db_path):
-        self.conn = sqlite3.connect(db_path)
+    def __init__(self, db_path, **pool_options):
+        self.engine = get_engine(build_url("sqlite", db_path=db_path), **pool_options)
 
     def get_table_names_and_comments(self):
         query = "SELECT name as table_name FROM sqlite_master WHERE type='table';"
-        return pd.read_sql(query, self.conn)
+        return pd.read_sql(query, self.engine)
 
     def read_records(self, query):
-        return pd.read_sql(query, self.conn)
+        return pd.read_sql(query, self.engine)
@@ -0,0 +1,165 @@
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from logic.ontology_search import local_name, split_words
+
+# Definitions are long and noisy compared to names, so they count for less
+DEFINITION_WEIGHT = 0.5
+
+# Ontology terms scored per matrix product; bounds peak memory on big ontologies
+TERM_BLOCK_SIZE = 4096
+
+
+def _features(words, weight=1.0):
+    """Word and character-trigram features for a list of words."""
+    features = Counter()
+    for word in words:
+        features[f"w:{word}"] += weight
+        padded = f"${word}$"
+        for i in range(max(len(padded) - 2, 1)):
+            features[f"g:{padded[i:i + 3]}"] += weight
+    return features
+
+
+def column_features(column):
+    return _features(split_words(column))
+
+
+def term_features(term, label="", definition=""):
+    features = _features(split_words(local_name(term)) + split_words(label))
+    features.update(_features(split_words(definition), DEFINITION_WEIGHT))
+    return features
+
+
+class TermMatrix:
+    """
+    Sparse TF-IDF feature matrix of an ontology's terms (COO arrays sorted
+    by term). It only depends on the ontology, so it is built once and
+    reused for every table that gets auto-mapped.
+    """
+
+    def __init__(self, terms, labels=None, definitions=None):
+        self.terms = list(terms)
+        labels = list(labels) if labels is not None else [""] * len(self.terms)
+        definitions = list(definitions) if definitions is not None else [""] * len(self.terms)
+
+        self.feature_ids = {}
+        rows, features, counts = [], [], []
+        for row, (term, label, definition) in enumerate(zip(self.terms, labels, definitions)):
+            for f, tf in term_features(term, label, definition).items():
+                rows.append(row)
+                features.append(self.feature_ids.setdefault(f, len(self.feature_ids)))
+                counts.append(tf)
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.features = np.asarray(features, dtype=np.int64)
+
+        n_terms = len(self.terms)
+        doc_freq = np.bincount(self.features, minlength=len(self.feature_ids))
+        self.idf = (np.log((1 + n_terms) / (1 + doc_freq)) + 1).astype(np.float32)
+        self.weights = np.asarray(counts, dtype=np.float32) * self.idf[self.features]
+        self.norms = np.sqrt(np.bincount(self.rows, self.weights ** 2, minlength=n_terms)).astype(np.float32)
+        self.norms[self.norms == 0] = 1.0
+
+    @classmethod
+    def from_index(cls, index):
+        """Builds the matrix from a compiled OntologyIndex."""
+        return cls(index.term_list(), index.labels, index.definitions)
+
+    def __len__(self):
+        return len(self.terms)
+
+
+def propose_mappings(columns, term_matrix, top_k=3, min_score=0.0, exclude_terms=None, term_mask=None):
+    """
+    Scores every column against every ontology term at once and returns the
+    top_k candidates per column as a DataFrame (column, term, score, rank),
+    best first. Scores are TF-IDF cosine similarities in [0, 1] over word and
+    character-trigram features of the column names and the term names,
+    labels and definitions.
+
+    `term_mask` optionally restricts candidates to the terms whose entry in
+    this boolean array is True (e.g. the terms of some namespaces).
+
+    Only features that occur in some column can contribute to a dot
+    product, so the term matrix is projected onto that (small) vocabulary
+    and scored in blocks with one matrix product each.
+    """
+    columns = list(columns)
+    terms = term_matrix.terms
+    n_terms = len(terms)
+    empty = pd.DataFrame(columns=["column", "term", "score", "rank"])
+    if not columns or not n_terms:
+        return empty
+
+    # Column matrix over the column vocabulary, restricted to features the ontology knows
+    column_docs = [column_features(c) for c in columns]
+    vocab = sorted({term_matrix.feature_ids[f] for doc in column_docs for f in doc if f in term_matrix.feature_ids})
+    if not vocab:
+        return empty
+    vocab = np.asarray(vocab, dtype=np.int64)
+    col_matrix = np.zeros((len(columns), len(vocab)), dtype=np.float32)
+    for row, doc in enumerate(column_docs):
+        for f, tf in doc.items():
+            feature_id = term_matrix.feature_ids.get(f)
+            if feature_id is not None:
+                col_matrix[row, np.searchsorted(vocab, feature_id)] = tf * term_matrix.idf[feature_id]
+    col_norms = np.linalg.norm(col_matrix, axis=1)
+    col_norms[col_norms == 0] = 1.0
+
+    keep = np.isin(term_matrix.features, vocab)
+    rows = term_matrix.rows[keep]
+    cols = np.searchsorted(vocab, term_matrix.features[keep])
+    vals = term_matrix.weights[keep]
+
+    excluded = np.zeros(n_terms, dtype=bool)
+    if exclude_terms:
+        excluded = np.fromiter((t in exclude_terms for t in terms), dtype=bool, count=n_terms)
+    if term_mask is not None:
+        excluded |= ~term_mask
+
+    k = min(top_k, n_terms)
+    best_scores = np.full((len(columns), k), -1.0, dtype=np.float32)
+    best_terms = np.zeros((len(columns), k), dtype=np.int64)
+    block_bounds = np.searchsorted(rows, np.arange(0, n_terms + TERM_BLOCK_SIZE, TERM_BLOCK_SIZE))
+    for block, start in enumerate(range(0, n_terms, TERM_BLOCK_SIZE)):
+        stop = min(start + TERM_BLOCK_SIZE, n_terms)
+        lo, hi = block_bounds[block], block_bounds[block + 1]
+        term_block = np.zeros((stop - start, len(vocab)), dtype=np.float32)
+        term_block[rows[lo:hi] - start, cols[lo:hi]] = vals[lo:hi]
+        scores = (col_matrix @ term_block.T) / np.outer(col_norms, term_matrix.norms[start:stop])
+        scores[:, excluded[start:stop]] = -1.0
+
+        # Merge this block's candidates with the running top-k per column
+        merged_scores = np.concatenate([best_scores, scores], axis=1)
+        merged_terms = np.concatenate([best_terms, np.broadcast_to(np.arange(start, stop), scores.shape)], axis=1)
+        top = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(merged_scores, top, axis=1)
+        best_terms = np.take_along_axis(merged_terms, top, axis=1)
+
+    order = np.argsort(-best_scores, axis=1, kind="stable")
+    best_scores = np.take_along_axis(best_scores, order, axis=1)
+    best_terms = np.take_along_axis(best_terms, order, axis=1)
+
+    proposals = pd.DataFrame({
+        "column": np.repeat(columns, k),
+        "term": [terms[i] for i in best_terms.ravel()],
+        "score": best_scores.ravel().round(4),
+        "rank": np.tile(np.arange(1, k + 1), len(columns)),
+    })
+    return proposals[proposals["score"] > max(min_score, 0.0)].reset_index(drop=True)
+
+
+def assign_one_to_one(proposals):
+    """
+    Greedily picks at most one term per column and one column per term,
+    highest score first, matching the one-to-one mappings the UI creates.
+    Returns a {column: term} dict.
+    """
+    assigned, used_terms = {}, set()
+    for row in proposals.sort_values("score", ascending=False, kind="stable").itertuples(index=False):
+        if row.column not in assigned and row.term not in used_terms:
+            assigned[row.column] = row.term
+            used_terms.add(row.term)
+    return assigned
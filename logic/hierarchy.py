@@ -0,0 +1,134 @@
+import numpy as np
+
+
+class ClassHierarchy:
+    """
+    rdfs:subClassOf hierarchy over the terms of a term table, labelled once
+    at load time.
+
+    A depth-first walk picks one parent per class (a spanning forest) and
+    numbers the classes in pre-order, so every subtree of that forest is the
+    contiguous slice order[start[i]:end[i]]: membership is two comparisons
+    and listing a subtree costs only its size. The few subClassOf edges left
+    outside the forest (multiple inheritance, cycles) are folded in when a
+    subtree is expanded.
+    """
+
+    def __init__(self, n_terms, subclass_edges):
+        edges = np.asarray(subclass_edges, dtype=np.int64).reshape(-1, 2)
+        edges = edges[edges[:, 0] != edges[:, 1]]
+        # Children of every class as CSR arrays, ordered like the terms
+        by_parent = edges[np.lexsort((edges[:, 0], edges[:, 1]))]
+        self.child_ids = by_parent[:, 0]
+        self.child_ptr = np.zeros(n_terms + 1, dtype=np.int64)
+        np.cumsum(np.bincount(by_parent[:, 1], minlength=n_terms), out=self.child_ptr[1:])
+
+        self.parent = np.full(n_terms, -1, dtype=np.int64)
+        self.depth = np.zeros(n_terms, dtype=np.int32)
+        self.start = np.zeros(n_terms, dtype=np.int64)
+        self.end = np.zeros(n_terms, dtype=np.int64)
+        self.order = np.zeros(n_terms, dtype=np.int64)
+        self._label(np.bincount(edges[:, 0], minlength=n_terms) == 0)
+
+        # Edges the walk did not use; a child reached twice keeps its first parent
+        extra = self.parent[edges[:, 0]] != edges[:, 1]
+        self.extra_edges = edges[extra]
+        # Only ancestors of an extra edge's parent have subtrees bigger than their range
+        self._inexact = set()
+        for node in self.extra_edges[:, 1].tolist():
+            while node >= 0 and node not in self._inexact:
+                self._inexact.add(node)
+                node = int(self.parent[node])
+        self._sizes = {}
+
+    def _label(self, is_root):
+        child_ids, child_ptr = self.child_ids.tolist(), self.child_ptr.tolist()
+        n = len(self.parent)
+        visited = bytearray(n)
+        parent, depth, start, end, order = [-1] * n, [0] * n, [0] * n, [0] * n, [0] * n
+        position = 0
+        # Proper roots first, then whatever only a cycle leads to
+        for root in np.concatenate([np.flatnonzero(is_root), np.flatnonzero(~is_root)]).tolist():
+            if visited[root]:
+                continue
+            visited[root] = 1
+            start[root], order[position] = position, root
+            position += 1
+            stack = [(root, child_ptr[root])]
+            while stack:
+                node, next_child = stack[-1]
+                if next_child == child_ptr[node + 1]:
+                    stack.pop()
+                    end[node] = position
+                    continue
+                stack[-1] = (node, next_child + 1)
+                child = child_ids[next_child]
+                if visited[child]:
+                    continue
+                visited[child] = 1
+                parent[child], depth[child] = node, depth[node] + 1
+                start[child], order[position] = position, child
+                position += 1
+                stack.append((child, child_ptr[child]))
+        self.parent[:], self.depth[:], self.start[:], self.end[:], self.order[:] = parent, depth, start, end, order
+
+    def __len__(self):
+        return len(self.parent)
+
+    def children(self, i):
+        """Direct subclasses of term i."""
+        return self.child_ids[self.child_ptr[i]:self.child_ptr[i + 1]]
+
+    def classes_with_subclasses(self):
+        """Term indices that have at least one subclass."""
+        return np.flatnonzero(np.diff(self.child_ptr))
+
+    def ancestors(self, i):
+        """Breadcrumb from the root of term i's tree down to its parent (following first parents)."""
+        path = []
+        node = int(self.parent[i])
+        while node >= 0:
+            path.append(node)
+            node = int(self.parent[node])
+        return path[::-1]
+
+    def is_descendant(self, i, root):
+        """True when term i lies in root's subtree of the spanning forest (ignores extra edges)."""
+        return self.start[root] <= self.start[i] < self.end[root]
+
+    def _ranges(self, root):
+        """Pre-order ranges covering root's full subtree, including the extra edges."""
+        lo, hi = np.array([self.start[root]]), np.array([self.end[root]])
+        if not len(self.extra_edges):
+            return lo, hi
+        children, parents = self.start[self.extra_edges[:, 0]], self.start[self.extra_edges[:, 1]]
+
+        def inside(positions):
+            return ((positions[:, None] >= lo) & (positions[:, None] < hi)).any(axis=1)
+
+        while True:
+            new = np.unique(self.extra_edges[inside(parents) & ~inside(children), 0])
+            if not len(new):
+                return lo, hi
+            lo, hi = np.concatenate([lo, self.start[new]]), np.concatenate([hi, self.end[new]])
+
+    def descendants(self, root):
+        """Term indices of root and all of its (transitive) subclasses."""
+        lo, hi = self._ranges(root)
+        if len(lo) == 1:
+            return self.order[lo[0]:hi[0]]
+        return np.unique(np.concatenate([self.order[a:b] for a, b in zip(lo.tolist(), hi.tolist())]))
+
+    def subtree_mask(self, root):
+        """Boolean array over all terms, True for root and its subclasses."""
+        mask = np.zeros(len(self), dtype=bool)
+        mask[self.descendants(root)] = True
+        return mask
+
+    def subtree_size(self, root):
+        """Number of terms in root's subtree, root included."""
+        if root not in self._inexact:
+            return int(self.end[root] - self.start[root])
+        if root not in self._sizes:
+            self._sizes[root] = len(self.descendants(root))
+        return self._sizes[root]
@@ -0,0 +1,175 @@
+import os
+import sqlite3
+import threading
+import time
+
+# Where mappings are kept between sessions, overridable per deployment
+MAPPING_DB = os.environ.get(
+    "FAIRMAPPER_MAPPING_DB",
+    os.path.join(os.path.expanduser("~"), ".fairmapper", "mappings.db")
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS mappings (
+    database TEXT NOT NULL,
+    schema TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    column_name TEXT NOT NULL,
+    term TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (database, schema, table_name, column_name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS mappings_by_term ON mappings (term, database, schema, table_name);
+
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    database TEXT NOT NULL,
+    schema TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    label TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_by_table ON snapshots (database, schema, table_name, id);
+
+CREATE TABLE IF NOT EXISTS snapshot_mappings (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots (id) ON DELETE CASCADE,
+    column_name TEXT NOT NULL,
+    term TEXT NOT NULL,
+    PRIMARY KEY (snapshot_id, column_name)
+) WITHOUT ROWID;
+"""
+
+
+class MappingStore:
+    """
+    Column -> ontology term mappings persisted in a local SQLite file.
+
+    Mappings are keyed by (database, schema, table, column), so one table's
+    mappings load with a primary-key range scan, and a secondary index on
+    the term makes reverse lookups ("which columns map to this term?")
+    independent of how many tables are stored. Snapshots keep numbered
+    versions of a table's mappings that can be restored later.
+    """
+
+    def __init__(self, path=MAPPING_DB):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # One connection shared by Streamlit's script threads, serialized by a lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def get_table_mappings(self, database, table, schema=""):
+        """Returns the {column: term} mappings of one table."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT column_name, term FROM mappings WHERE database = ? AND schema = ? AND table_name = ?",
+                (database, schema, table)
+            ).fetchall()
+        return dict(rows)
+
+    def set_mappings(self, database, table, mappings, schema=""):
+        """Inserts or updates several {column: term} mappings of one table in one transaction."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO mappings (database, schema, table_name, column_name, term, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (database, schema, table_name, column_name) "
+                "DO UPDATE SET term = excluded.term, updated_at = excluded.updated_at",
+                [(database, schema, table, column, term, now) for column, term in mappings.items()]
+            )
+
+    def set_mapping(self, database, table, column, term, schema=""):
+        self.set_mappings(database, table, {column: term}, schema)
+
+    def remove_mapping(self, database, table, column, schema=""):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM mappings WHERE database = ? AND schema = ? AND table_name = ? AND column_name = ?",
+                (database, schema, table, column)
+            )
+
+    def clear_table(self, database, table, schema=""):
+        """Removes every mapping of one table (snapshots are kept)."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM mappings WHERE database = ? AND schema = ? AND table_name = ?",
+                (database, schema, table)
+            )
+
+    def columns_for_term(self, term, database=None):
+        """Every (database, schema, table, column) mapped to an ontology term, optionally in one database."""
+        query = "SELECT database, schema, table_name, column_name FROM mappings WHERE term = ?"
+        params = [term]
+        if database is not None:
+            query += " AND database = ?"
+            params.append(database)
+        with self._lock:
+            return self._conn.execute(query + " ORDER BY database, schema, table_name, column_name", params).fetchall()
+
+    def mapped_tables(self, database):
+        """Number of mapped columns per table of a database."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT schema, table_name, COUNT(*) FROM mappings WHERE database = ? "
+                "GROUP BY schema, table_name ORDER BY schema, table_name",
+                (database,)
+            ).fetchall()
+        return rows
+
+    def snapshot(self, database, table, label=None, schema=""):
+        """Saves the table's current mappings as a new version and returns its id."""
+        with self._lock, self._conn:
+            snapshot_id = self._conn.execute(
+                "INSERT INTO snapshots (database, schema, table_name, label, created_at) VALUES (?, ?, ?, ?, ?)",
+                (database, schema, table, label, time.time())
+            ).lastrowid
+            self._conn.execute(
+                "INSERT INTO snapshot_mappings (snapshot_id, column_name, term) "
+                "SELECT ?, column_name, term FROM mappings "
+                "WHERE database = ? AND schema = ? AND table_name = ?",
+                (snapshot_id, database, schema, table)
+            )
+        return snapshot_id
+
+    def list_snapshots(self, database, table, schema=""):
+        """Snapshots of one table as dicts (id, label, created_at, columns), newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT s.id, s.label, s.created_at, COUNT(m.column_name) FROM snapshots s "
+                "LEFT JOIN snapshot_mappings m ON m.snapshot_id = s.id "
+                "WHERE s.database = ? AND s.schema = ? AND s.table_name = ? "
+                "GROUP BY s.id ORDER BY s.id DESC",
+                (database, schema, table)
+            ).fetchall()
+        return [{"id": r[0], "label": r[1], "created_at": r[2], "columns": r[3]} for r in rows]
+
+    def restore_snapshot(self, snapshot_id):
+        """Replaces the table's mappings with a snapshot's and returns them as a dict."""
+        now = time.time()
+        with self._lock, self._conn:
+            scope = self._conn.execute(
+                "SELECT database, schema, table_name FROM snapshots WHERE id = ?", (snapshot_id,)
+            ).fetchone()
+            if scope is None:
+                raise KeyError(f"Unknown snapshot {snapshot_id}")
+            self._conn.execute(
+                "DELETE FROM mappings WHERE database = ? AND schema = ? AND table_name = ?", scope
+            )
+            self._conn.execute(
+                "INSERT INTO mappings (database, schema, table_name, column_name, term, updated_at) "
+                "SELECT ?, ?, ?, column_name, term, ? FROM snapshot_mappings WHERE snapshot_id = ?",
+                (*scope, now, snapshot_id)
+            )
+            rows = self._conn.execute(
+                "SELECT column_name, term FROM snapshot_mappings WHERE snapshot_id = ?", (snapshot_id,)
+            ).fetchall()
+        return dict(rows)
@@ -0,0 +1,276 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from logic.term_extractor import collect_file, collect_graph
+from logic.timing import span
+
+# Compiled indexes live outside the repo so every session (and every app
+# process on the same machine) can share them.
+INDEX_DIR = os.environ.get(
+    "FAIRMAPPER_INDEX_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "fairmapper", "ontology"),
+)
+
+# Uploaded ontologies are kept next to the indexes, named by content hash
+UPLOAD_DIR = os.environ.get(
+    "FAIRMAPPER_UPLOAD_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "fairmapper", "uploads"),
+)
+
+DEFAULT_ONTOLOGY = "MDS-Onto-BuiltEnv-PV-Module-v0.3.0.0.ttl"
+
+ONTOLOGY_SUFFIXES = (".ttl", ".owl", ".rdf", ".xml", ".n3", ".nt", ".nt.gz", ".ntriples", ".jsonld")
+
+_MAGIC = b"FMONTIDX"
+_FORMAT_VERSION = 2
+_HEADER = struct.Struct("<8sII")  # magic, format version, JSON header length
+
+
+def ontology_path(filename=DEFAULT_ONTOLOGY):
+    """Returns the absolute path of an ontology file shipped in assets/."""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(script_dir, "..", "assets", filename)
+
+
+def bundled_ontologies():
+    """Absolute paths of the ontology files shipped in assets/."""
+    assets = os.path.dirname(ontology_path())
+    return sorted(os.path.join(assets, name) for name in os.listdir(assets) if name.endswith(ONTOLOGY_SUFFIXES))
+
+
+def store_uploaded_ontology(name, data, upload_dir=None):
+    """Saves uploaded ontology bytes under their content hash and returns the file path."""
+    upload_dir = upload_dir or UPLOAD_DIR
+    path = os.path.join(upload_dir, f"{hashlib.sha256(data).hexdigest()[:12]}-{os.path.basename(name)}")
+    if not os.path.exists(path):
+        os.makedirs(upload_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp_path, path)
+    return path
+
+
+def file_sha256(file_path, chunk_size=1 << 20):
+    """Returns the hex SHA-256 digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def split_uri(uri):
+    """
+    (namespace, local name) of a URI, split at its last '#', or else its
+    last '/'; the separator belongs to neither. A URI with neither is all
+    namespace. Every namespace and local name in the mapper comes from here.
+    """
+    for separator in "#/":
+        if separator in uri:
+            namespace, _, local = uri.rpartition(separator)
+            return namespace, local
+    return uri, ""
+
+
+def namespace_of(uri):
+    """Splits off the namespace part of a URI (see split_uri)."""
+    return split_uri(uri)[0]
+
+
+class StringTable:
+    """
+    Read-only sequence of strings stored as one UTF-8 blob plus an int64
+    offsets array. Strings are only decoded when they are accessed, so a
+    memory-mapped table costs almost nothing until it is used.
+    """
+
+    def __init__(self, blob, offsets):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("StringTable index out of range")
+        start, end = int(self._offsets[i]), int(self._offsets[i + 1])
+        return bytes(self._blob[start:end]).decode("utf-8")
+
+    def __iter__(self):
+        blob = bytes(self._blob)
+        offsets = self._offsets.tolist()
+        for start, end in zip(offsets[:-1], offsets[1:]):
+            yield blob[start:end].decode("utf-8")
+
+    def tolist(self):
+        return list(self)
+
+
+def _pack_strings(strings):
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype="<i8")
+    if encoded:
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return b"".join(encoded), offsets
+
+
+class OntologyIndex:
+    """
+    Compiled view of an ontology file: term URIs with their labels and
+    definitions (empty string when missing), the sorted namespaces, and the
+    rdfs:subClassOf edges between terms as (child, parent) term positions.
+    """
+
+    FIELDS = ("terms", "labels", "definitions", "namespaces")
+
+    def __init__(self, sha256, source, tables, mm=None, subclass_edges=None):
+        self.sha256 = sha256
+        self.source = source
+        self.terms = tables["terms"]
+        self.labels = tables["labels"]
+        self.definitions = tables["definitions"]
+        self.namespaces = tables["namespaces"]
+        self.subclass_edges = (subclass_edges if subclass_edges is not None
+                               else np.empty((0, 2), dtype=np.int32))
+        self._mmap = mm
+        self._term_list = None
+        self._namespace_list = None
+
+    def __len__(self):
+        return len(self.terms)
+
+    def term_list(self):
+        """Decoded term URIs, built once per index."""
+        if self._term_list is None:
+            self._term_list = self.terms.tolist()
+        return self._term_list
+
+    def namespace_list(self):
+        if self._namespace_list is None:
+            self._namespace_list = self.namespaces.tolist()
+        return self._namespace_list
+
+    @classmethod
+    def from_collector(cls, collector, sha256="", source=""):
+        """Compiles an index from a filled TermCollector."""
+        terms, labels, definitions = collector.terms()
+        namespaces = sorted(set(namespace_of(uri) for uri in terms))
+        return cls.from_lists(sha256, source, terms, labels, definitions, namespaces, collector.subclass_edges())
+
+    @classmethod
+    def from_graph(cls, g, sha256="", source=""):
+        """Compiles an index from an already parsed rdflib Graph."""
+        return cls.from_collector(collect_graph(g), sha256, source)
+
+    @classmethod
+    def from_lists(cls, sha256, source, terms, labels, definitions, namespaces, subclass_edges=None):
+        tables = {}
+        for name, values in zip(cls.FIELDS, (terms, labels, definitions, namespaces)):
+            blob, offsets = _pack_strings(values)
+            tables[name] = StringTable(memoryview(blob), offsets)
+        return cls(sha256, source, tables, subclass_edges=subclass_edges)
+
+    def save(self, path):
+        """Writes the index atomically as a single binary file."""
+        sections, payload, position = {}, [], 0
+        for name in self.FIELDS:
+            table = getattr(self, name)
+            blob, offsets = _pack_strings(table)
+            offsets_bytes = offsets.tobytes()
+            # Keep every offsets array 8-byte aligned so it can be viewed in place
+            padding = b"\0" * (-position % 8)
+            position += len(padding)
+            payload.append(padding)
+            sections[name] = {
+                "count": len(table),
+                "offsets": position,
+                "blob": position + len(offsets_bytes),
+                "blob_length": len(blob),
+            }
+            payload.extend([offsets_bytes, blob])
+            position += len(offsets_bytes) + len(blob)
+
+        edges_bytes = np.ascontiguousarray(self.subclass_edges, dtype="<i4").tobytes()
+        padding = b"\0" * (-position % 8)
+        position += len(padding)
+        payload.extend([padding, edges_bytes])
+        sections["subclass_edges"] = {"count": len(self.subclass_edges), "offset": position}
+
+        header = json.dumps({"sha256": self.sha256, "source": self.source, "sections": sections}).encode("utf-8")
+        header += b" " * (-(_HEADER.size + len(header)) % 8)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as fh:
+            fh.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, len(header)))
+            fh.write(header)
+            for chunk in payload:
+                fh.write(chunk)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Memory-maps a saved index. Raises ValueError if the file is not a valid index."""
+        with open(path, "rb") as fh:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(mm) < _HEADER.size:
+            mm.close()
+            raise ValueError(f"Truncated FAIRmapper ontology index: {path}")
+        magic, version, header_len = _HEADER.unpack_from(mm, 0)
+        if magic != _MAGIC or version != _FORMAT_VERSION:
+            mm.close()
+            raise ValueError(f"Not a FAIRmapper ontology index (or outdated format): {path}")
+        header = json.loads(mm[_HEADER.size:_HEADER.size + header_len].decode("utf-8"))
+        base = _HEADER.size + header_len
+        view = memoryview(mm)
+        tables = {}
+        for name in cls.FIELDS:
+            section = header["sections"][name]
+            offsets = np.frombuffer(mm, dtype="<i8", count=section["count"] + 1, offset=base + section["offsets"])
+            blob_start = base + section["blob"]
+            tables[name] = StringTable(view[blob_start:blob_start + section["blob_length"]], offsets)
+        section = header["sections"]["subclass_edges"]
+        edges = np.frombuffer(mm, dtype="<i4", count=2 * section["count"], offset=base + section["offset"])
+        return cls(header["sha256"], header["source"], tables, mm=mm, subclass_edges=edges.reshape(-1, 2))
+
+
+def index_path(sha256, index_dir=None):
+    return os.path.join(index_dir or INDEX_DIR, f"{sha256}.idx")
+
+
+def get_ontology_index(file_path, rdf_format=None, index_dir=None):
+    """
+    Returns the compiled index for an ontology file, building and saving it
+    on first use. The on-disk index is keyed by the file's content hash, so
+    an edited file is recompiled and an unchanged one is never parsed again.
+    """
+    with span("ontology.index", source=os.path.basename(file_path)) as s:
+        sha256 = file_sha256(file_path)
+        path = index_path(sha256, index_dir)
+        if os.path.exists(path):
+            try:
+                index = OntologyIndex.load(path)
+                s["cache"], s["rows"] = "hit", len(index.terms)
+                return index
+            except (ValueError, KeyError, struct.error):
+                pass  # Stale or corrupt index, rebuild it below
+
+        collector = collect_file(file_path, rdf_format)
+        index = OntologyIndex.from_collector(collector, sha256=sha256, source=os.path.basename(file_path))
+        s["cache"], s["rows"] = "miss", len(index.terms)
+        try:
+            index.save(path)
+        except OSError:
+            pass  # Read-only cache dir: still usable, just not persisted
+        return index
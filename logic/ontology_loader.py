@@ -1,30 +1,89 @@
 import streamlit as st
 import os # used for connecting the ontology file to fairmapper
-from rdfpandas.graph import to_dataframe
-from rdflib import Graph, Namespace, URIRef, Literal
-from rdflib.namespace import SH, RDF, RDFS, XSD
+from logic.ontology_index import DEFAULT_ONTOLOGY, get_ontology_index, ontology_path
+from logic.term_table import MergedTermTable
+from logic.hierarchy import ClassHierarchy
+from logic.ontology_search import OntologySearchIndex
+from logic.auto_mapper import TermMatrix
+from logic.timing import annotate, span
 
-def load_ontology_terms(filename="MDS-Onto-BuiltEnv-PV-Module-v0.3.0.0.ttl"):
-    """Loads ontology terms from an uploaded RDF file."""
 
-    try:
-        # Get the absolute path to the ontology file
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        file_path = os.path.join(script_dir, "..", "assets", filename)
+@st.cache_resource(show_spinner="Loading ontology...")
+def _cached_ontology_index(file_path, mtime):
+    # mtime is only part of the cache key so an edited file is picked up
+    annotate(cache="miss")
+    return get_ontology_index(file_path)
+
+
+def load_ontology_index(filename=DEFAULT_ONTOLOGY):
+    """Returns the compiled ontology index, shared across sessions."""
+    file_path = ontology_path(filename)
+    with span("ontology.load", source=os.path.basename(file_path), cache="hit"):
+        return _cached_ontology_index(file_path, os.path.getmtime(file_path))
+
+
+@st.cache_resource(show_spinner="Merging ontologies...", max_entries=8)
+def _cached_term_table(sha256s, _indexes):
+    annotate(cache="miss")
+    return MergedTermTable.merge(_indexes)
+
+
+def load_term_table(sources=None):
+    """
+    Returns the merged term table of one or more ontology files (asset
+    filenames or absolute paths, earlier ones taking priority), shared
+    across sessions.
+    """
+    indexes = [load_ontology_index(source) for source in sources or [DEFAULT_ONTOLOGY]]
+    with span("ontology.term_table", sources=len(indexes), cache="hit"):
+        return _cached_term_table(tuple(index.sha256 for index in indexes), indexes)
+
+
+@st.cache_resource(show_spinner="Indexing ontology terms...", max_entries=8)
+def _cached_search_index(sha256, _index):
+    annotate(cache="miss")
+    return OntologySearchIndex.from_index(_index)
+
 
+def load_search_index(sources=None):
+    """Returns the ranked term search index for the merged ontologies, shared across sessions."""
+    table = load_term_table(sources)
+    with span("ontology.search_index", cache="hit"):
+        return _cached_search_index(table.sha256, table)
 
-        g = Graph()
-        g.parse(file_path, format='turtle')
-        ontology_df = to_dataframe(g)
-        all_terms = list(ontology_df.index)
 
-        # Get namespaces from URIs
-        namespaces = sorted(set(
-            uri.rsplit("#", 1)[0] if "#" in uri else uri.rsplit("/", 1)[0]
-            for uri in all_terms
-        ))
+@st.cache_resource(show_spinner="Preparing auto-mapper...", max_entries=8)
+def _cached_term_matrix(sha256, _index):
+    annotate(cache="miss")
+    return TermMatrix.from_index(_index)
 
-        return all_terms, namespaces
+
+def load_term_matrix(sources=None):
+    """Returns the auto-mapper's term feature matrix for the merged ontologies, shared across sessions."""
+    table = load_term_table(sources)
+    with span("ontology.term_matrix", cache="hit"):
+        return _cached_term_matrix(table.sha256, table)
+
+
+@st.cache_resource(show_spinner="Labelling class hierarchy...", max_entries=8)
+def _cached_class_hierarchy(sha256, _table):
+    annotate(cache="miss")
+    return ClassHierarchy(len(_table), _table.subclass_edges)
+
+
+def load_class_hierarchy(sources=None):
+    """Returns the rdfs:subClassOf hierarchy of the merged ontologies, shared across sessions."""
+    table = load_term_table(sources)
+    with span("ontology.hierarchy", cache="hit"):
+        return _cached_class_hierarchy(table.sha256, table)
+
+
+def load_ontology_terms(sources=None):
+    """Loads the merged terms and namespaces of the given ontology files."""
+
+    try:
+        table = load_term_table(sources)
+        return table.term_list(), table.namespace_list()
     except Exception as e:
-        st.error(f"Error loading ontology file '{file_path}': {e}")
-        return [], []
\ No newline at end of file
+        st.error(f"Error loading ontology files {', '.join(map(os.path.basename, sources or [DEFAULT_ONTOLOGY]))}: {e}")
+        return [], []
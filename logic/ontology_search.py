@@ -0,0 +1,127 @@
+import re
+from collections import defaultdict
+
+import numpy as np
+
+from logic.ontology_index import split_uri
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_CAMEL_RE = re.compile(r"([a-z0-9])([A-Z])|([A-Z])([A-Z][a-z])")
+
+# How much a full match in each field contributes to a term's score
+NAME_WEIGHT = 1.0
+LABEL_WEIGHT = 0.8
+DEFINITION_WEIGHT = 0.3
+PREFIX_BONUS = 0.5
+
+# Candidates kept from the n-gram pass before the exact-match rerank
+_RERANK_POOL = 2000
+
+
+def local_name(uri):
+    """Returns the part of a URI after its namespace."""
+    return split_uri(uri)[1]
+
+
+def split_words(text):
+    """Lower-cased word tokens, with CamelCase and snake_case names split apart."""
+    text = _CAMEL_RE.sub(lambda m: f"{m.group(1) or m.group(3)} {m.group(2) or m.group(4)}", text)
+    return _WORD_RE.findall(text.lower())
+
+
+def trigrams(words):
+    """Boundary-padded character trigrams of each word, so short queries still match."""
+    grams = set()
+    for word in words:
+        padded = f"${word}$"
+        if len(padded) <= 3:
+            grams.add(padded)
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+def _postings(index):
+    return {key: np.fromiter(ids, dtype=np.int32, count=len(ids)) for key, ids in index.items()}
+
+
+class OntologySearchIndex:
+    """
+    Ranked full-text search over ontology terms.
+
+    Local names and labels are indexed as character trigrams, so partial
+    words typed into the UI match as-you-type; definitions are indexed by
+    whole words. Scores are accumulated with one np.bincount per posting
+    list, and the best candidates are reranked with an exact prefix bonus.
+    """
+
+    def __init__(self, terms, labels=None, definitions=None):
+        self.terms = list(terms)
+        labels = list(labels) if labels is not None else [""] * len(self.terms)
+        definitions = list(definitions) if definitions is not None else [""] * len(self.terms)
+        self._names = [" ".join(split_words(local_name(t))) for t in self.terms]
+        self._labels = [label.lower() for label in labels]
+
+        name_index, label_index, word_index = defaultdict(list), defaultdict(list), defaultdict(list)
+        for i, (name, label, definition) in enumerate(zip(self._names, self._labels, definitions)):
+            for gram in trigrams(name.split()):
+                name_index[gram].append(i)
+            for gram in trigrams(split_words(label)):
+                label_index[gram].append(i)
+            for word in set(split_words(definition)):
+                word_index[word].append(i)
+        self._name_index = _postings(name_index)
+        self._label_index = _postings(label_index)
+        self._word_index = _postings(word_index)
+
+    @classmethod
+    def from_index(cls, index):
+        """Builds a search index from a compiled OntologyIndex."""
+        return cls(index.term_list(), index.labels, index.definitions)
+
+    def __len__(self):
+        return len(self.terms)
+
+    def _accumulate(self, scores, postings_index, keys, weight):
+        if not keys:
+            return
+        hits = [postings_index[k] for k in keys if k in postings_index]
+        if hits:
+            scores += np.bincount(np.concatenate(hits), minlength=len(scores)) * (weight / len(keys))
+
+    def search(self, query, k=20, candidates=None, exclude=None, term_mask=None):
+        """
+        Returns up to k (term, score) pairs ranked best first.
+
+        `candidates` optionally restricts results to a set of term URIs and
+        `exclude` drops terms from them (for example terms already mapped).
+        `term_mask` is a boolean array over the indexed terms; only terms
+        where it is True are ranked, before the rerank pool is cut.
+        """
+        words = split_words(query)
+        if not words or not self.terms:
+            return []
+        scores = np.zeros(len(self.terms), dtype=np.float32)
+        grams = trigrams(words)
+        self._accumulate(scores, self._name_index, grams, NAME_WEIGHT)
+        self._accumulate(scores, self._label_index, grams, LABEL_WEIGHT)
+        self._accumulate(scores, self._word_index, set(words), DEFINITION_WEIGHT)
+        if term_mask is not None:
+            scores[~term_mask] = 0
+
+        pool = np.flatnonzero(scores)
+        if len(pool) > _RERANK_POOL:
+            pool = pool[np.argpartition(scores[pool], -_RERANK_POOL)[-_RERANK_POOL:]]
+
+        phrase = " ".join(words)
+        ranked = []
+        for i in pool:
+            term = self.terms[i]
+            if (candidates is not None and term not in candidates) or (exclude and term in exclude):
+                continue
+            score = float(scores[i])
+            if self._names[i].startswith(phrase) or self._labels[i].startswith(phrase):
+                score += PREFIX_BONUS
+            ranked.append((score, term))
+        ranked.sort(key=lambda item: (-item[0], item[1]))
+        return [(term, score) for score, term in ranked[:k]]
@@ -0,0 +1,248 @@
+import gzip
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import quote
+
+import pandas as pd
+from rdflib import BNode, Graph, Literal, Namespace, URIRef
+from rdflib.namespace import RDF, XSD
+
+from logic.shacl_generator import EX, _iri
+
+RR = Namespace("http://www.w3.org/ns/r2rml#")
+DATA = Namespace("http://example.com/data/")
+
+_TEMPLATE_RE = re.compile(r"\{([^{}]+)\}")
+_IRI_SAFE_RE = r"^[A-Za-z0-9_.~-]*$"
+_RDF_TYPE = f"<{RDF.type}>"
+
+# Materialized tables are written here, never to a path the user types in
+EXPORT_DIR = os.environ.get(
+    "FAIRMAPPER_EXPORT_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "fairmapper", "exports"),
+)
+
+
+def export_path(db_table_name, owner, compress=True, export_dir=None):
+    """The file a table is materialized to: one per owner (a UI session) and table inside the export directory."""
+    export_dir = export_dir or EXPORT_DIR
+    os.makedirs(export_dir, exist_ok=True)
+    name = re.sub(r"[^A-Za-z0-9_.-]", "_", f"{owner}-{db_table_name}")
+    return os.path.join(export_dir, name + (".nt.gz" if compress else ".nt"))
+
+
+def build_r2rml_mapping(mappings, db_table_name, key_columns, base_iri=str(DATA)):
+    """
+    Builds an R2RML TriplesMap for one mapped table: rows become
+    <base/table/key...> subjects typed with the table's Record class (the
+    SHACL target class), and each mapped column becomes a predicate-object
+    map with the ontology term as predicate.
+    """
+    g = Graph()
+    g.bind("rr", RR)
+    g.bind("ex", EX)
+    safe_table = db_table_name.replace('.', '_')
+    triples_map = EX[f"{safe_table}TriplesMap"]
+    g.add((triples_map, RDF.type, RR.TriplesMap))
+
+    logical_table = BNode()
+    g.add((triples_map, RR.logicalTable, logical_table))
+    g.add((logical_table, RR.tableName, Literal(db_table_name)))
+
+    subject_map = BNode()
+    template = base_iri + quote(safe_table) + "/" + "/".join("{%s}" % c for c in key_columns)
+    g.add((triples_map, RR.subjectMap, subject_map))
+    g.add((subject_map, RR.template, Literal(template)))
+    g.add((subject_map, RR["class"], EX[safe_table + "Record"]))
+
+    for db_column, ontology_term in mappings.items():
+        predicate_object_map, object_map = BNode(), BNode()
+        g.add((triples_map, RR.predicateObjectMap, predicate_object_map))
+        g.add((predicate_object_map, RR.predicate, URIRef(ontology_term)))
+        g.add((predicate_object_map, RR.objectMap, object_map))
+        g.add((object_map, RR.column, Literal(db_column)))
+    return g
+
+
+def parse_r2rml(g):
+    """
+    Reads the supported R2RML subset (rr:tableName, rr:template subject maps
+    with rr:class, and rr:column object maps with optional rr:datatype) into
+    one plan dict per TriplesMap.
+    """
+    plans = []
+    for triples_map in g.subjects(RDF.type, RR.TriplesMap):
+        logical_table = g.value(triples_map, RR.logicalTable)
+        subject_map = g.value(triples_map, RR.subjectMap)
+        template = str(g.value(subject_map, RR.template))
+        classes = [str(c) for c in g.objects(subject_map, RR["class"])]
+        predicate_objects = []
+        for pom in g.objects(triples_map, RR.predicateObjectMap):
+            object_map = g.value(pom, RR.objectMap)
+            datatype = g.value(object_map, RR.datatype)
+            predicate_objects.append({
+                "predicate": str(g.value(pom, RR.predicate)),
+                "column": str(g.value(object_map, RR.column)),
+                "datatype": str(datatype) if datatype else None,
+            })
+        plans.append({
+            "table": str(g.value(logical_table, RR.tableName)),
+            "template": template,
+            "template_columns": _TEMPLATE_RE.findall(template),
+            "classes": classes,
+            "predicate_objects": predicate_objects,
+        })
+    return plans
+
+
+def plan_columns(plan):
+    """Every column a plan reads, in a stable order."""
+    columns = list(plan["template_columns"])
+    for po in plan["predicate_objects"]:
+        if po["column"] not in columns:
+            columns.append(po["column"])
+    return columns
+
+
+def _iri_safe(series):
+    """Percent-encodes template values, only calling quote() on values that need it."""
+    # Plain object strings, so concatenation works whatever the column's dtype;
+    # rows with a missing key are dropped by the caller
+    values = series.astype(str).fillna("").astype(object)
+    if pd.api.types.is_float_dtype(series):
+        # Keys read as float (an integer column with NULLs) name rows 1, not 1.0
+        integral = series.notna() & (series % 1 == 0) & (series.abs() < 2 ** 63)
+        values[integral] = series[integral].astype("int64").astype(str)
+    needs_quoting = ~values.str.match(_IRI_SAFE_RE).astype(bool)
+    if needs_quoting.any():
+        values[needs_quoting] = values[needs_quoting].map(lambda v: quote(v, safe=""))
+    return values
+
+
+def _escape(values):
+    return (values.str.replace("\\", "\\\\", regex=False)
+                  .str.replace('"', '\\"', regex=False)
+                  .str.replace("\n", "\\n", regex=False)
+                  .str.replace("\r", "\\r", regex=False))
+
+
+def _datetime_lexical(series, datatype):
+    """xsd:date / xsd:dateTime lexical forms of a datetime64 column, independent of the chunk's values."""
+    if datatype == str(XSD.date):
+        return series.dt.strftime("%Y-%m-%d")
+    values = series.dt.strftime("%Y-%m-%dT%H:%M:%S")
+    micros = series.dt.microsecond
+    values = values.where(micros == 0, values + "." + micros.astype(str).str.zfill(6))
+    if series.dt.tz is not None:
+        offsets = series.dt.strftime("%z")
+        values = values + offsets.str[:3] + ":" + offsets.str[3:]
+    return values
+
+
+def _literal_terms(series, datatype=None):
+    """N-Triples literals for a whole column, with the XSD datatype taken from its dtype."""
+    if datatype is None:
+        if pd.api.types.is_bool_dtype(series):
+            datatype = str(XSD.boolean)
+        elif pd.api.types.is_integer_dtype(series):
+            datatype = str(XSD.integer)
+        elif pd.api.types.is_float_dtype(series):
+            datatype = str(XSD.double)
+        elif pd.api.types.is_datetime64_any_dtype(series):
+            datatype = str(XSD.dateTime)
+    if datatype == str(XSD.boolean) and pd.api.types.is_bool_dtype(series):
+        values = series.map({True: "true", False: "false"})
+    elif datatype == str(XSD.double):
+        values = series.astype(str).replace({"inf": "INF", "-inf": "-INF"})
+    elif datatype in (str(XSD.dateTime), str(XSD.date)) and pd.api.types.is_datetime64_any_dtype(series):
+        values = _datetime_lexical(series, datatype)
+    elif datatype == str(XSD.dateTime):
+        values = series.astype(str).str.replace(" ", "T", n=1, regex=False)
+    else:
+        values = series.astype(str)
+    literals = '"' + _escape(values) + '"'
+    return literals + "^^" + _iri(datatype, "nt") if datatype else literals
+
+
+def chunk_to_ntriples(chunk, plan):
+    """
+    Converts one DataFrame chunk to N-Triples text, building each term
+    column-at-a-time with vectorized string operations. Returns (text, triples).
+    """
+    parts = _TEMPLATE_RE.split(plan["template"])
+    # split() alternates literal text and column names: text, col, text, col, ..., text
+    subjects = pd.Series(parts[0], index=chunk.index, dtype=object)
+    for i in range(1, len(parts), 2):
+        subjects = subjects + _iri_safe(chunk[parts[i]]) + parts[i + 1]
+    has_key = chunk[plan["template_columns"]].notna().all(axis=1)
+    subjects = "<" + subjects[has_key] + "> "
+
+    pieces, triples = [], 0
+    for rdf_class in plan["classes"]:
+        pieces.append(subjects + f"{_RDF_TYPE} {_iri(rdf_class, 'nt')} .\n")
+        triples += len(subjects)
+    for po in plan["predicate_objects"]:
+        values = chunk.loc[has_key, po["column"]]
+        present = values.notna()
+        if not present.any():
+            continue
+        objects = _literal_terms(values[present], po["datatype"])
+        pieces.append(subjects[present] + f"{_iri(po['predicate'], 'nt')} " + objects + " .\n")
+        triples += int(present.sum())
+    text = "".join("".join(piece.tolist()) for piece in pieces)
+    return text, triples
+
+
+def _convert(args):
+    # Module-level so it can be pickled into worker processes
+    chunk, plan = args
+    return len(chunk), *chunk_to_ntriples(chunk, plan)
+
+
+def materialize(chunks, plan, out_path, workers=1, compresslevel=6):
+    """
+    Streams DataFrame chunks of a table through an R2RML plan into an
+    N-Triples file (gzip-compressed when out_path ends with .gz).
+
+    With workers > 1 chunks are converted in worker processes; at most
+    2 * workers chunks are in flight, so memory stays bounded however large
+    the table is, and output keeps the chunk order.
+
+    Returns rows, triples, seconds and rows/triples per second.
+    """
+    opener = (lambda p: gzip.open(p, "wt", encoding="utf-8", compresslevel=compresslevel)) \
+        if out_path.endswith(".gz") else (lambda p: open(p, "w", encoding="utf-8"))
+    totals = {"rows": 0, "triples": 0}
+    started = time.perf_counter()
+
+    def write(result):
+        n_rows, text, n_triples = result
+        out.write(text)
+        totals["rows"] += n_rows
+        totals["triples"] += n_triples
+
+    with opener(out_path) as out:
+        if workers <= 1:
+            for chunk in chunks:
+                write(_convert((chunk, plan)))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(executor.submit(_convert, (chunk, plan)))
+                    if len(pending) >= 2 * workers:
+                        write(pending.popleft().result())
+                while pending:
+                    write(pending.popleft().result())
+    seconds = time.perf_counter() - started
+    rows, triples = totals["rows"], totals["triples"]
+    return {
+        "rows": rows,
+        "triples": triples,
+        "seconds": round(seconds, 3),
+        "rows_per_sec": round(rows / seconds, 1) if seconds else None,
+        "triples_per_sec": round(triples / seconds, 1) if seconds else None,
+    }
@@ -1,43 +1,151 @@
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
 from rdflib import Graph, Namespace, URIRef, Literal
 from rdflib.namespace import SH, RDF, RDFS, XSD
 from io import StringIO # To read uploaded file content
 
+from logic.timing import record, span
 
 
-def generate_shacl_file(mappings, db_table_name="DatabaseTable"):
+
+EX = Namespace("http://example.com/shacl-mappings#")
+DBP = Namespace("http://example.com/database-properties#") # For database column properties
+
+# Prefixes of the Turtle output, in the order they are written
+PREFIXES = [("dbp", DBP), ("ex", EX), ("rdf", RDF), ("rdfs", RDFS), ("sh", SH), ("xsd", XSD)]
+_PREFIX_IRIS = [(prefix, str(namespace)) for prefix, namespace in PREFIXES]
+
+# Local names that are safe to abbreviate as prefix:local in Turtle
+_PN_LOCAL_RE = re.compile(r"^[A-Za-z_]([A-Za-z0-9_.-]*[A-Za-z0-9_-])?$")
+_IRI_ESCAPE_RE = re.compile(r'[\x00-\x20<>"{}|^`\\]')
+_LITERAL_ESCAPES = {"\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r", "\t": "\\t"}
+_LITERAL_ESCAPE_RE = re.compile(r'[\\"\x00-\x1f\x7f]')
+
+
+# Optional property shape constraints, in the order they are written
+CONSTRAINTS = [
+    ("datatype", SH.datatype),
+    ("minCount", SH.minCount),
+    ("maxCount", SH.maxCount),
+    ("minInclusive", SH.minInclusive),
+    ("maxInclusive", SH.maxInclusive),
+    ("minExclusive", SH.minExclusive),
+    ("maxExclusive", SH.maxExclusive),
+]
+RANGE_CONSTRAINTS = ["minInclusive", "maxInclusive", "minExclusive", "maxExclusive"]
+
+# XSD datatype of a column by its catalog type, first match wins
+SQL_XSD_TYPES = [
+    (re.compile(r"^bool"), XSD.boolean),
+    (re.compile(r"^(tiny|small|medium|big)?int(eger)?\b|^int[248]\b|serial"), XSD.integer),
+    (re.compile(r"^(numeric|decimal|dec)\b"), XSD.decimal),
+    (re.compile(r"^(real|double|float)"), XSD.double),
+    (re.compile(r"^(timestamp|datetime)"), XSD.dateTime),
+    (re.compile(r"^date\b"), XSD.date),
+    (re.compile(r"char|text|^string|^uuid|^clob"), XSD.string),
+]
+
+# Ordered datatypes: the ones value ranges apply to, their bounds written with the column's own datatype
+ORDERED_DATATYPES = {str(XSD.integer), str(XSD.decimal), str(XSD.double), str(XSD.date), str(XSD.dateTime)}
+
+
+def xsd_datatype(sql_type):
+    """The XSD datatype URI for a catalog column type, or None when there is no obvious one."""
+    sql_type = str(sql_type or "").strip().lower()
+    for pattern, datatype in SQL_XSD_TYPES:
+        if pattern.search(sql_type):
+            return str(datatype)
+    return None
+
+
+def constraints_from_catalog(column_info, columns=None):
     """
-    Generates a SHACL Turtle file describing the mappings.
+    {column: constraints} for catalog rows (column_name, data_type,
+    is_nullable): sh:datatype from the column type, sh:minCount 1 for NOT
+    NULL columns, and sh:maxCount 1 as a column holds one value per row.
+    Ranges are not known from the catalog and are left to the caller.
+    """
+    constraints = {}
+    for row in column_info.itertuples(index=False):
+        if columns is not None and row.column_name not in columns:
+            continue
+        column = {"maxCount": 1}
+        datatype = xsd_datatype(row.data_type)
+        if datatype:
+            column["datatype"] = datatype
+        if not row.is_nullable:
+            column["minCount"] = 1
+        constraints[row.column_name] = column
+    return constraints
+
+
+def _bound(value, datatype=None):
+    """A range bound as an rdflib Literal, typed like the column when it is ordered."""
+    if datatype == str(XSD.integer) and isinstance(value, float):
+        # 2.0 bounds an integer column as 2; 2.5 keeps its own type
+        return Literal(int(value)) if value.is_integer() else Literal(value)
+    if datatype in ORDERED_DATATYPES:
+        return Literal(str(value), datatype=URIRef(datatype))
+    return Literal(value)
+
+
+def _constraint_objects(constraints):
+    """(SHACL predicate, rdflib term) pairs of one column's constraints."""
+    objects = []
+    datatype = constraints.get("datatype")
+    for name, predicate in CONSTRAINTS:
+        value = constraints.get(name)
+        if value is None or value == "":
+            continue
+        if name == "datatype":
+            objects.append((predicate, URIRef(value)))
+        elif name in RANGE_CONSTRAINTS:
+            objects.append((predicate, _bound(value, datatype)))
+        else:
+            objects.append((predicate, Literal(int(value))))
+    return objects
+
+
+def table_shape_uri(db_table_name):
+    return EX[f"{db_table_name}Shape"]
+
+
+def property_shape_uri(db_table_name, db_column):
+    return EX[f"{db_table_name.replace('.', '_')}_{db_column.replace('.', '_')}PropertyShape"]
+
+
+def build_shacl_graph(mappings, db_table_name="DatabaseTable", constraints=None):
+    """
+    Builds the SHACL mapping shapes as an in-memory rdflib Graph.
     This uses a custom predicate `ex:mapsTo` to link database columns
-    (represented as sh:path) to ontology terms.
+    (represented as sh:path) to ontology terms. `constraints` optionally
+    adds {column: {"datatype", "minCount", "maxCount", "minInclusive", ...}}
+    to the property shapes.
     """
     g = Graph()
 
     # Define namespaces
-    EX = Namespace("http://example.com/shacl-mappings#")
-    DBP = Namespace("http://example.com/database-properties#") # For database column properties
-    g.bind("sh", SH)
-    g.bind("rdf", RDF)
-    g.bind("rdfs", RDFS)
-    g.bind("xsd", XSD)
-    g.bind("ex", EX)
-    g.bind("dbp", DBP)
+    for prefix, namespace in PREFIXES:
+        g.bind(prefix, namespace)
     # Note: We don't bind a specific ontology prefix here as ontology terms are full URIs
 
     # Define a NodeShape for the database table
-    table_shape_uri = EX[f"{db_table_name}Shape"]
-    g.add((table_shape_uri, RDF.type, SH.NodeShape))
-    g.add((table_shape_uri, RDFS.label, Literal(f"SHACL Shape for {db_table_name}")))
-    g.add((table_shape_uri, SH.targetClass, EX[db_table_name.replace('.', '_') + "Record"])) # A placeholder target class
+    table_shape = table_shape_uri(db_table_name)
+    g.add((table_shape, RDF.type, SH.NodeShape))
+    g.add((table_shape, RDFS.label, Literal(f"SHACL Shape for {db_table_name}")))
+    g.add((table_shape, SH.targetClass, EX[db_table_name.replace('.', '_') + "Record"])) # A placeholder target class
 
     for db_column, ontology_term in mappings.items():
-        # Create a blank node for the PropertyShape
-        prop_shape = EX[f"{db_table_name.replace('.', '_')}_{db_column.replace('.', '_')}PropertyShape"]
-        g.add((table_shape_uri, SH.property, prop_shape))
+        prop_shape = property_shape_uri(db_table_name, db_column)
+        g.add((table_shape, SH.property, prop_shape))
         g.add((prop_shape, RDF.type, SH.PropertyShape))
 
         # Define the path for the database column
-        db_column_uri = DBP[db_column]
-        g.add((prop_shape, SH.path, db_column_uri))
+        g.add((prop_shape, SH.path, DBP[db_column]))
 
         # Add the custom mapping predicate
         g.add((prop_shape, EX.mapsTo, URIRef(ontology_term)))
@@ -45,4 +153,207 @@ def generate_shacl_file(mappings, db_table_name="DatabaseTable"):
         # Add a comment for clarity
         g.add((prop_shape, RDFS.comment, Literal(f"Maps database column '{db_column}' to ontology term '{ontology_term}'.")))
 
-    return g.serialize(format='turtle')
\ No newline at end of file
+        for predicate, value in _constraint_objects((constraints or {}).get(db_column, {})):
+            g.add((prop_shape, predicate, value))
+
+    return g
+
+
+def _iri(uri, rdf_format):
+    uri = str(uri)
+    if rdf_format == "turtle":
+        for prefix, namespace in _PREFIX_IRIS:
+            if uri.startswith(namespace) and _PN_LOCAL_RE.match(uri[len(namespace):]):
+                return f"{prefix}:{uri[len(namespace):]}"
+    return "<" + _IRI_ESCAPE_RE.sub(lambda m: f"\\u{ord(m.group()):04X}", uri) + ">"
+
+
+def _literal(text):
+    escaped = _LITERAL_ESCAPE_RE.sub(lambda m: _LITERAL_ESCAPES.get(m.group(), f"\\u{ord(m.group()):04X}"), text)
+    return f'"{escaped}"'
+
+
+def _term(value, rdf_format):
+    if isinstance(value, URIRef):
+        return _iri(value, rdf_format)
+    if value.datatype is None or value.datatype == XSD.string:
+        return _literal(str(value))
+    if rdf_format == "turtle" and value.datatype == XSD.integer:
+        # Turtle's integer shorthand, as rdflib writes it
+        return str(value)
+    return f"{_literal(str(value))}^^{_iri(value.datatype, rdf_format)}"
+
+
+def _statements(subject, predicate_objects, rdf_format):
+    """Writes one subject's triples as a Turtle block or as N-Triples lines."""
+    s = _iri(subject, rdf_format)
+    if rdf_format == "turtle":
+        body = " ;\n    ".join(f"{'a' if p == RDF.type else _iri(p, rdf_format)} {o}" for p, o in predicate_objects)
+        return f"{s} {body} .\n"
+    return "".join(f"{s} {_iri(p, rdf_format)} {o} .\n" for p, o in predicate_objects)
+
+
+def prefix_block(rdf_format="turtle"):
+    if rdf_format != "turtle":
+        return ""
+    return "".join(f"@prefix {prefix}: <{namespace}> .\n" for prefix, namespace in _PREFIX_IRIS) + "\n"
+
+
+def node_shape_block(db_table_name, rdf_format="turtle"):
+    """The table's NodeShape, without its sh:property links."""
+    return _statements(table_shape_uri(db_table_name), [
+        (RDF.type, _iri(SH.NodeShape, rdf_format)),
+        (RDFS.label, _literal(f"SHACL Shape for {db_table_name}")),
+        (SH.targetClass, _iri(EX[db_table_name.replace('.', '_') + "Record"], rdf_format)),
+    ], rdf_format) + "\n"
+
+
+def property_shape_block(db_table_name, db_column, ontology_term, rdf_format="turtle", constraints=None):
+    """
+    One column's PropertyShape (with its optional constraints) together with
+    the sh:property link from the table's NodeShape, so blocks can be
+    written (or replaced) independently.
+    """
+    prop_shape = property_shape_uri(db_table_name, db_column)
+    link = _statements(table_shape_uri(db_table_name), [(SH.property, _iri(prop_shape, rdf_format))], rdf_format)
+    return link + _statements(prop_shape, [
+        (RDF.type, _iri(SH.PropertyShape, rdf_format)),
+        (SH.path, _iri(DBP[db_column], rdf_format)),
+        (EX.mapsTo, _iri(ontology_term, rdf_format)),
+        (RDFS.comment, _literal(f"Maps database column '{db_column}' to ontology term '{ontology_term}'.")),
+    ] + [
+        (predicate, _term(value, rdf_format)) for predicate, value in _constraint_objects(constraints or {})
+    ], rdf_format) + "\n"
+
+
+def write_shacl(mappings, out, db_table_name="DatabaseTable", rdf_format="turtle", constraints=None):
+    """
+    Streams the SHACL mapping shapes to a file-like object as prefix-compressed
+    Turtle (rdf_format="turtle") or N-Triples (rdf_format="nt"), one block per
+    mapping, without building an rdflib Graph. The triples are the same as
+    build_shacl_graph produces.
+    """
+    if rdf_format not in ("turtle", "nt"):
+        raise ValueError(f"Unsupported SHACL output format: {rdf_format}")
+    out.write(prefix_block(rdf_format))
+    out.write(node_shape_block(db_table_name, rdf_format))
+    constraints = constraints or {}
+    for db_column, ontology_term in mappings.items():
+        out.write(property_shape_block(db_table_name, db_column, ontology_term, rdf_format,
+                                       constraints.get(db_column)))
+
+
+def generate_shacl_file(mappings, db_table_name="DatabaseTable", rdf_format="turtle", constraints=None):
+    """
+    Generates a SHACL Turtle file describing the mappings.
+    This uses a custom predicate `ex:mapsTo` to link database columns
+    (represented as sh:path) to ontology terms.
+    """
+    with span("shacl.generate", rows=len(mappings)):
+        out = StringIO()
+        write_shacl(mappings, out, db_table_name=db_table_name, rdf_format=rdf_format, constraints=constraints)
+        return out.getvalue()
+
+
+class IncrementalShaclDocument:
+    """
+    One table's SHACL document, kept as separately rendered blocks.
+
+    render() returns the cached text when the content hash of
+    (table, mappings) is unchanged; otherwise only the PropertyShapes of
+    columns that were added, removed or remapped are rebuilt, and the
+    blocks are spliced back together in mapping order.
+    """
+
+    def __init__(self, db_table_name, rdf_format="turtle"):
+        self.db_table_name = db_table_name
+        self.rdf_format = rdf_format
+        self._header = prefix_block(rdf_format) + node_shape_block(db_table_name, rdf_format)
+        self._blocks = {}  # column -> (ontology_term, rendered block)
+        self._key = None
+        self._text = None
+
+    @staticmethod
+    def content_key(db_table_name, mappings, constraints=None):
+        payload = json.dumps([db_table_name, sorted(mappings.items()), sorted((constraints or {}).items())],
+                             ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def render(self, mappings, constraints=None):
+        with span("shacl.render", rows=len(mappings)) as s:
+            key = self.content_key(self.db_table_name, mappings, constraints)
+            s["cache"] = "hit" if key == self._key else "miss"
+            if key != self._key:
+                self._rebuild(mappings, key, constraints or {})
+            return self._text
+
+    def _rebuild(self, mappings, key, constraints):
+        for column in [c for c in self._blocks if c not in mappings]:
+            del self._blocks[column]
+        for column, term in mappings.items():
+            cached = self._blocks.get(column)
+            state = (term, constraints.get(column))
+            if cached is None or cached[0] != state:
+                block = property_shape_block(self.db_table_name, column, term, self.rdf_format, constraints.get(column))
+                self._blocks[column] = (state, block)
+        self._text = self._header + "".join(self._blocks[column][1] for column in mappings)
+        self._key = key
+
+
+def load_mapping_catalog(path):
+    """Reads a {table: {column: ontology_term}} catalog from a JSON file."""
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def _render_table(item):
+    # Module-level so it can be pickled into worker processes
+    table, mappings = item
+    started = time.perf_counter()
+    content = generate_shacl_file(mappings, db_table_name=table)
+    return table, content, time.perf_counter() - started
+
+
+def generate_shacl_catalog(catalog, output_dir=None, merged_path=None, max_workers=None):
+    """
+    Generates SHACL shapes for every table in a {table: {column: term}} catalog.
+
+    Tables are rendered in parallel worker processes (max_workers=1 renders
+    in-process). Each table can be written to its own file in output_dir
+    and/or all of them to one merged Turtle file; Turtle allows prefixes to
+    be redeclared, so the per-table documents are simply concatenated.
+
+    Returns one {"table", "mappings", "seconds", "path"} report per table,
+    in catalog order.
+    """
+    items = [(table, mappings) for table, mappings in catalog.items() if mappings]
+    started = time.perf_counter()
+    executor = None
+    if max_workers == 1 or len(items) <= 1:
+        results = map(_render_table, items)
+    else:
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+        workers = max_workers or os.cpu_count() or 1
+        results = executor.map(_render_table, items, chunksize=max(1, len(items) // (4 * workers)))
+
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    merged = open(merged_path, "w", encoding="utf-8") if merged_path else None
+    report = []
+    try:
+        for table, content, seconds in results:
+            path = None
+            if output_dir:
+                path = os.path.join(output_dir, f"shacl_mappings_{table}.ttl")
+                with open(path, "w", encoding="utf-8") as fh:
+                    fh.write(content)
+            if merged:
+                merged.write(f"# --- {table} ---\n{content}\n")
+            report.append({"table": table, "mappings": len(catalog[table]), "seconds": round(seconds, 4), "path": path})
+    finally:
+        if merged:
+            merged.close()
+        if executor:
+            executor.shutdown()
+    record("shacl.catalog", (time.perf_counter() - started) * 1000, rows=len(report))
+    return report
@@ -0,0 +1,219 @@
+"""
+Validates table data against the SHACL property shapes the mapper writes.
+
+Instead of converting rows to RDF and running a generic SHACL engine, each
+supported constraint of a shape (sh:datatype, sh:minCount, sh:maxCount and
+the sh:min/maxInclusive/Exclusive ranges) is compiled into a vectorized
+pandas check that flags violating rows of a column. The table is then
+streamed through those checks chunk by chunk, so memory stays bounded by
+the chunk size whatever the table's row count.
+"""
+import numbers
+import time
+
+import numpy as np
+import pandas as pd
+from rdflib import Graph
+from rdflib.namespace import SH, XSD
+
+from logic.shacl_generator import CONSTRAINTS, DBP, ORDERED_DATATYPES, RANGE_CONSTRAINTS
+from logic.timing import span
+
+# Violating rows kept per column and constraint
+SAMPLE_VIOLATIONS = 5
+
+_NUMERIC_TYPES = {str(XSD.integer), str(XSD.decimal), str(XSD.double), str(XSD.float)}
+_TEMPORAL_TYPES = {str(XSD.date), str(XSD.dateTime)}
+_BOOLEAN_LEXICAL = {"true", "false", "1", "0", "t", "f"}
+
+REPORT_COLUMNS = ["column", "constraint", "expected", "violations", "violation_ratio", "samples"]
+
+
+def load_shapes(shacl, rdf_format="turtle"):
+    """
+    {column: constraints} from SHACL text or an rdflib Graph, for every
+    property shape whose sh:path is a database column (dbp:<column>).
+    """
+    g = shacl if isinstance(shacl, Graph) else Graph().parse(data=shacl, format=rdf_format)
+    shapes = {}
+    for shape, path in g.subject_objects(SH.path):
+        path = str(path)
+        if not path.startswith(str(DBP)):
+            continue
+        constraints = {}
+        for name, predicate in CONSTRAINTS:
+            value = g.value(shape, predicate)
+            if value is not None:
+                constraints[name] = str(value) if name == "datatype" else value.toPython()
+        shapes[path[len(str(DBP)):]] = constraints
+    return shapes
+
+
+def _numbers(series):
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.astype(float)
+    return pd.to_numeric(series, errors="coerce")
+
+
+def _timestamps(series):
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    if pd.api.types.is_string_dtype(series):
+        return pd.to_datetime(series, errors="coerce", format="ISO8601")
+    return pd.to_datetime(series, errors="coerce")
+
+
+def _show(value):
+    # numpy scalars print as their Python values
+    return repr(value.item() if isinstance(value, np.generic) else value)
+
+
+def _align_tz(bound, values):
+    """The bound in the column's timezone, or naive when the column is."""
+    tz = values.dt.tz
+    if tz is None:
+        return bound.tz_convert(None) if bound.tz is not None else bound
+    return bound.tz_localize(tz) if bound.tz is None else bound.tz_convert(tz)
+
+
+class ColumnCheck:
+    """
+    The compiled constraints of one property shape. check() parses a chunk
+    of the column at most once (as numbers or timestamps) and returns a
+    boolean violation mask per constraint.
+
+    Value ranges are only supported on numbers, dates and timestamps: a
+    range on another datatype, or a bound that is not a number or a date
+    as its column needs, raises ValueError here rather than mid-stream.
+    """
+
+    def __init__(self, column, constraints):
+        self.column = column
+        self.constraints = constraints
+        self.datatype = constraints.get("datatype")
+        bounds = [(name, constraints[name]) for name in RANGE_CONSTRAINTS if constraints.get(name) is not None]
+        if bounds and self.datatype is not None and self.datatype not in ORDERED_DATATYPES:
+            raise ValueError(f"{column}: value ranges are not supported on {self.datatype.replace(str(XSD), 'xsd:')}")
+        temporal_bounds = any(not isinstance(bound, numbers.Number) for _, bound in bounds)
+        self.temporal = self.datatype in _TEMPORAL_TYPES or (self.datatype is None and temporal_bounds)
+        self.ranges = [(name, self._parse_bound(name, bound)) for name, bound in bounds]
+        self.names = [name for name in self._checked() if name]
+
+    def _parse_bound(self, name, bound):
+        if not self.temporal:
+            if not isinstance(bound, numbers.Number):
+                raise ValueError(f"{self.column}: {name} {bound!r} is not a number")
+            return float(bound)
+        try:
+            return pd.Timestamp(bound)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"{self.column}: {name} {bound!r} is not a date or timestamp") from e
+
+    def _checked(self):
+        yield "datatype" if self.datatype in _NUMERIC_TYPES | _TEMPORAL_TYPES | {str(XSD.boolean)} else None
+        yield "minCount" if (self.constraints.get("minCount") or 0) >= 1 else None
+        # A column holds a single value per row, so only sh:maxCount 0 can fail
+        yield "maxCount" if self.constraints.get("maxCount") == 0 else None
+        yield from (name for name, _ in self.ranges)
+
+    def expected(self, name):
+        value = self.constraints[name]
+        if name == "datatype":
+            return value.replace(str(XSD), "xsd:")
+        return str(value)
+
+    def check(self, series):
+        """{constraint: boolean mask of violating rows}."""
+        present = series.notna()
+        masks = {}
+        parsed = None
+        if self.ranges or self.datatype in _NUMERIC_TYPES | _TEMPORAL_TYPES:
+            parsed = _timestamps(series) if self.temporal else _numbers(series)
+
+        if "datatype" in self.names:
+            if self.datatype == str(XSD.boolean):
+                bad = pd.Series(False, index=series.index) if pd.api.types.is_bool_dtype(series) else \
+                    present & ~series.astype(str).str.lower().isin(_BOOLEAN_LEXICAL)
+            elif self.datatype == str(XSD.integer):
+                bad = present & (parsed.isna() | (parsed % 1 != 0))
+            else:
+                bad = present & parsed.isna()
+            masks["datatype"] = bad
+        if "minCount" in self.names:
+            masks["minCount"] = ~present
+        if "maxCount" in self.names:
+            masks["maxCount"] = present
+        for name, bound in self.ranges:
+            if self.temporal:
+                bound = _align_tz(bound, parsed)
+            if name == "minInclusive":
+                ok = parsed >= bound
+            elif name == "maxInclusive":
+                ok = parsed <= bound
+            elif name == "minExclusive":
+                ok = parsed > bound
+            else:
+                ok = parsed < bound
+            # Unparseable values are reported by the datatype check, not here
+            masks[name] = parsed.notna() & ~ok
+        return masks
+
+
+def compile_shapes(shapes):
+    """{column: ColumnCheck} for the columns that have something to check."""
+    checks = {column: ColumnCheck(column, constraints) for column, constraints in shapes.items()}
+    return {column: check for column, check in checks.items() if check.names}
+
+
+def validate_chunks(chunks, shapes, sample_size=SAMPLE_VIOLATIONS):
+    """
+    Streams DataFrame chunks through the compiled shapes.
+
+    Returns a dict with rows, seconds and a report DataFrame (see
+    REPORT_COLUMNS): one row per column and constraint with its violation
+    count and ratio and up to sample_size violating values as
+    "row <n>: <value>", rows numbered from 0 in stream order.
+    """
+    checks = compile_shapes(shapes)
+    counts, samples = {}, {}
+    rows = 0
+    started = time.perf_counter()
+    with span("shacl.validate", columns=len(checks)) as s:
+        for chunk in chunks:
+            for column, check in checks.items():
+                if column not in chunk:
+                    # A shape for a column the data lacks fails on every row
+                    key = (column, "path")
+                    counts[key] = counts.get(key, 0) + len(chunk)
+                    continue
+                values = chunk[column]
+                for name, mask in check.check(values).items():
+                    mask = mask.to_numpy(dtype=bool, na_value=False)
+                    key = (column, name)
+                    hits = int(mask.sum())
+                    counts[key] = counts.get(key, 0) + hits
+                    kept = samples.setdefault(key, [])
+                    if hits and len(kept) < sample_size:
+                        positions = np.flatnonzero(mask)[:sample_size - len(kept)]
+                        kept.extend(f"row {rows + i}: {_show(values.iloc[i])}" for i in positions.tolist())
+            rows += len(chunk)
+        s["rows"] = rows
+
+    report = []
+    for column, check in checks.items():
+        names = ["path"] if (column, "path") in counts else check.names
+        for name in names:
+            violations = counts.get((column, name), 0)
+            report.append({
+                "column": column,
+                "constraint": name,
+                "expected": "column present" if name == "path" else check.expected(name),
+                "violations": violations,
+                "violation_ratio": round(violations / rows, 4) if rows else None,
+                "samples": "; ".join(samples.get((column, name), [])),
+            })
+    return {
+        "rows": rows,
+        "seconds": round(time.perf_counter() - started, 3),
+        "report": pd.DataFrame(report, columns=REPORT_COLUMNS),
+    }
@@ -0,0 +1,120 @@
+import gzip
+import os
+from array import array
+
+import numpy as np
+
+from rdflib import Graph, URIRef
+from rdflib.namespace import RDFS, SKOS
+from rdflib.plugins.parsers.ntriples import W3CNTriplesParser
+from rdflib.util import guess_format
+
+from logic.timing import span
+
+NTRIPLES_SUFFIXES = (".nt", ".nt.gz", ".ntriples")
+
+
+class TermCollector:
+    """
+    Triple sink that keeps only what the ontology index needs.
+
+    Every URI is interned once into an integer ID; subjects are stored as an
+    array of those IDs and labels/definitions as ID -> string dicts, so the
+    full triple set never has to be held in memory. rdfs:subClassOf edges
+    between URIs are kept as (child ID, parent ID) pairs. It can be fed directly
+    by rdflib's N-Triples parser (which calls `triple`) or by walking the
+    triples of an already parsed Graph.
+    """
+
+    def __init__(self):
+        self.uri_ids = {}
+        self.uris = []
+        self.subject_ids = array("q")
+        self._is_subject = bytearray()
+        self.labels = {}
+        self.definitions = {}
+        self.subclass_of = array("q")
+        self._sorted_ids = None
+
+    def intern(self, uri):
+        uri_id = self.uri_ids.get(uri)
+        if uri_id is None:
+            uri_id = self.uri_ids[uri] = len(self.uris)
+            self.uris.append(uri)
+            self._is_subject.append(0)
+        return uri_id
+
+    def triple(self, s, p, o):
+        if not isinstance(s, URIRef):
+            return
+        s_id = self.intern(str(s))
+        if not self._is_subject[s_id]:
+            self._is_subject[s_id] = 1
+            self.subject_ids.append(s_id)
+        # The first label/definition wins, as with Graph.value
+        if p == RDFS.label:
+            self.labels.setdefault(s_id, str(o))
+        elif p == SKOS.definition:
+            self.definitions.setdefault(s_id, str(o))
+        elif p == RDFS.subClassOf and isinstance(o, URIRef):
+            self.subclass_of.extend((s_id, self.intern(str(o))))
+
+    def _subject_order(self):
+        if self._sorted_ids is None or len(self._sorted_ids) != len(self.subject_ids):
+            self._sorted_ids = sorted(self.subject_ids, key=self.uris.__getitem__)
+        return self._sorted_ids
+
+    def terms(self):
+        """Returns sorted (uri, label, definition) lists for every subject seen."""
+        ids = self._subject_order()
+        return (
+            [self.uris[i] for i in ids],
+            [self.labels.get(i, "") for i in ids],
+            [self.definitions.get(i, "") for i in ids],
+        )
+
+    def subclass_edges(self):
+        """
+        (child, parent) positions in the sorted terms() lists, as an int32
+        array of shape (n, 2). Edges to classes that are never a subject
+        themselves (owl:Thing, external classes) are dropped.
+        """
+        position = np.full(len(self.uris), -1, dtype=np.int64)
+        position[np.asarray(self._subject_order(), dtype=np.int64)] = np.arange(len(self.subject_ids))
+        edges = position[np.frombuffer(self.subclass_of, dtype=np.int64).reshape(-1, 2)]
+        edges = edges[(edges >= 0).all(axis=1)]
+        return np.unique(edges, axis=0).astype(np.int32).reshape(-1, 2)
+
+
+def collect_graph(g, collector=None):
+    """Walks every triple of a parsed Graph once into a TermCollector."""
+    collector = collector or TermCollector()
+    for s, p, o in g.triples((None, None, None)):
+        collector.triple(s, p, o)
+    return collector
+
+
+def collect_ntriples(file_path, collector=None):
+    """Streams an N-Triples file (optionally gzipped) line by line into a TermCollector."""
+    collector = collector or TermCollector()
+    opener = gzip.open if file_path.endswith(".gz") else open
+    with opener(file_path, "rt", encoding="utf-8") as fh:
+        W3CNTriplesParser(sink=collector).parse(fh)
+    return collector
+
+
+def collect_file(file_path, rdf_format=None, collector=None):
+    """
+    Extracts terms from an ontology file. N-Triples are streamed with bounded
+    memory; other formats have to be parsed by rdflib first, but the graph
+    is only walked once and dropped straight after.
+    """
+    with span("ontology.parse", source=os.path.basename(file_path)) as s:
+        if rdf_format == "nt" or (rdf_format is None and file_path.endswith(NTRIPLES_SUFFIXES)):
+            collector = collect_ntriples(file_path, collector)
+        else:
+            g = Graph()
+            g.parse(file_path, format=rdf_format or guess_format(file_path) or "turtle")
+            collector = collect_graph(g, collector)
+        s["rows"] = len(collector.uris)
+        return collector
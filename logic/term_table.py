@@ -0,0 +1,148 @@
+import hashlib
+
+import numpy as np
+
+from logic.ontology_index import StringTable, _pack_strings, get_ontology_index, namespace_of, split_uri
+from logic.timing import span
+
+# Sources are tracked as bits of a uint64 per term
+MAX_SOURCES = 64
+
+
+class MergedTermTable:
+    """
+    Terms of several ontologies merged into one table.
+
+    Each distinct URI is stored once, as a namespace ID plus its local name,
+    so shared namespaces are not repeated for every term. Labels and
+    definitions come from the first source that has them, `sources` holds a
+    bitmask of the ontologies each term appears in, and `subclass_edges` the
+    union of their rdfs:subClassOf edges as (child, parent) rows. It exposes the
+    same term_list() / labels / definitions / namespace_list() interface as
+    OntologyIndex, so the search index and auto-mapper build on it unchanged.
+    """
+
+    def __init__(self, sha256, source_names, prefixes, ns_ids, local_names, labels, definitions, sources,
+                 subclass_edges):
+        self.sha256 = sha256
+        self.source_names = source_names
+        self.prefixes = prefixes
+        self.ns_ids = ns_ids
+        self.local_names = local_names
+        self.labels = labels
+        self.definitions = definitions
+        self.sources = sources
+        self.subclass_edges = subclass_edges
+        self._term_list = None
+
+    @classmethod
+    def merge(cls, indexes):
+        """Builds the merged table from OntologyIndex objects, in priority order."""
+        if len(indexes) > MAX_SOURCES:
+            raise ValueError(f"At most {MAX_SOURCES} ontologies can be merged")
+        prefix_ids, term_ids = {}, {}
+        keys, labels, definitions, masks, edges = [], [], [], [], []
+        for source_id, index in enumerate(indexes):
+            bit = 1 << source_id
+            merged_ids = np.empty(len(index), dtype=np.int64)
+            for position, (term, label, definition) in enumerate(zip(index.terms, index.labels, index.definitions)):
+                local = split_uri(term)[1]
+                # The namespace with its separator, so prefix + local is the URI again
+                prefix = term[:len(term) - len(local)]
+                key = (prefix_ids.setdefault(prefix, len(prefix_ids)), local)
+                term_id = term_ids.get(key)
+                if term_id is None:
+                    term_id = term_ids[key] = len(keys)
+                    merged_ids[position] = term_id
+                    keys.append(key)
+                    labels.append(label)
+                    definitions.append(definition)
+                    masks.append(bit)
+                    continue
+                merged_ids[position] = term_id
+                masks[term_id] |= bit
+                # Earlier sources win, later ones only fill in what is missing
+                if not labels[term_id] and label:
+                    labels[term_id] = label
+                if not definitions[term_id] and definition:
+                    definitions[term_id] = definition
+            edges.append(merged_ids[np.asarray(index.subclass_edges, dtype=np.int64)].reshape(-1, 2))
+        del term_ids
+
+        # Sort namespaces, then terms by (namespace, local name), i.e. by URI
+        prefixes = sorted(prefix_ids)
+        remap = np.empty(len(prefixes), dtype=np.int32)
+        for new_id, prefix in enumerate(prefixes):
+            remap[prefix_ids[prefix]] = new_id
+        order = sorted(range(len(keys)), key=lambda i: (remap[keys[i][0]], keys[i][1]))
+
+        ns_ids = np.fromiter((remap[keys[i][0]] for i in order), dtype=np.int32, count=len(order))
+        new_position = np.empty(len(order), dtype=np.int64)
+        new_position[np.asarray(order, dtype=np.int64)] = np.arange(len(order))
+        subclass_edges = np.unique(new_position[np.concatenate(edges or [np.empty((0, 2), dtype=np.int64)])], axis=0)
+        sha256 = hashlib.sha256("".join(index.sha256 for index in indexes).encode("utf-8")).hexdigest()
+        return cls(
+            sha256,
+            [index.source for index in indexes],
+            prefixes,
+            ns_ids,
+            _string_table(keys[i][1] for i in order),
+            _string_table(labels[i] for i in order),
+            _string_table(definitions[i] for i in order),
+            np.fromiter((masks[i] for i in order), dtype=np.uint64, count=len(order)),
+            subclass_edges.astype(np.int32).reshape(-1, 2),
+        )
+
+    def __len__(self):
+        return len(self.ns_ids)
+
+    def term(self, i):
+        return self.prefixes[self.ns_ids[i]] + self.local_names[i]
+
+    def term_list(self):
+        """Full term URIs, built once per table."""
+        if self._term_list is None:
+            prefixes = self.prefixes
+            self._term_list = [prefixes[ns] + local for ns, local in zip(self.ns_ids.tolist(), self.local_names)]
+        return self._term_list
+
+    def _prefix_namespaces(self):
+        # The namespace of each prefix, by the same rule as OntologyIndex (http://x/ and http://x# share one)
+        return [namespace_of(prefix) for prefix in self.prefixes]
+
+    def namespace_list(self):
+        """Namespaces (without their trailing separator), sorted."""
+        return sorted(set(self._prefix_namespaces()))
+
+    def namespace_counts(self):
+        """{namespace: number of terms}."""
+        counts = {}
+        for namespace, n in zip(self._prefix_namespaces(), np.bincount(self.ns_ids, minlength=len(self.prefixes)).tolist()):
+            counts[namespace] = counts.get(namespace, 0) + n
+        return counts
+
+    def source_counts(self):
+        """{source name: number of terms it contributes}."""
+        return {
+            name: int(np.count_nonzero(self.sources & np.uint64(1 << i)))
+            for i, name in enumerate(self.source_names)
+        }
+
+    def in_namespaces(self, namespaces):
+        """Boolean mask of the terms in any of the given namespaces."""
+        namespaces = set(namespaces)
+        wanted = [i for i, ns in enumerate(self._prefix_namespaces()) if ns in namespaces]
+        return np.isin(self.ns_ids, wanted)
+
+
+def get_term_table(file_paths, index_dir=None):
+    """Merges the compiled indexes of several ontology files; earlier files take priority."""
+    with span("ontology.merge", sources=len(file_paths)) as s:
+        table = MergedTermTable.merge([get_ontology_index(path, index_dir=index_dir) for path in file_paths])
+        s["rows"] = len(table)
+        return table
+
+
+def _string_table(strings):
+    blob, offsets = _pack_strings(list(strings))
+    return StringTable(memoryview(blob), offsets)
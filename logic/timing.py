@@ -0,0 +1,163 @@
+"""
+Lightweight timing spans for the mapper's hot paths.
+
+    with span("db.get_all_tables") as s:
+        tables = ...
+        s["rows"] = len(tables)
+
+Every finished span becomes an event (name, session, start, duration_ms and
+attributes such as rows, cache="hit"/"miss" or error) kept in a bounded
+in-process buffer, and is folded into running totals per process and per
+session. Events can be exported as JSON lines for offline analysis.
+"""
+import contextvars
+import functools
+import json
+import threading
+import time
+from collections import deque
+
+# Events kept in memory; older ones only survive in the running totals
+MAX_EVENTS = 10_000
+
+_session = contextvars.ContextVar("fairmapper_timing_session", default=None)
+_open_spans = contextvars.ContextVar("fairmapper_open_spans", default=())
+
+
+def set_session(session_id):
+    """Attributes spans recorded from this thread/context to a UI session."""
+    _session.set(session_id)
+
+
+def current_session():
+    return _session.get()
+
+
+def _new_totals():
+    return {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0, "hits": 0, "misses": 0, "errors": 0}
+
+
+class Recorder:
+    """Thread-safe event buffer plus per-process and per-session totals by span name."""
+
+    def __init__(self, max_events=MAX_EVENTS):
+        self._lock = threading.Lock()
+        self._events = deque(maxlen=max_events)
+        self._totals = {}
+
+    def record(self, name, duration_ms, start=None, session=None, **attrs):
+        event = {
+            "name": name,
+            "session": session,
+            "start": start if start is not None else time.time(),
+            "duration_ms": round(duration_ms, 3),
+            **attrs,
+        }
+        with self._lock:
+            self._events.append(event)
+            for key in ((None, name), (session, name)) if session is not None else ((None, name),):
+                totals = self._totals.get(key)
+                if totals is None:
+                    totals = self._totals[key] = _new_totals()
+                totals["count"] += 1
+                totals["total_ms"] += duration_ms
+                totals["max_ms"] = max(totals["max_ms"], duration_ms)
+                totals["rows"] += attrs.get("rows") or 0
+                totals["hits"] += attrs.get("cache") == "hit"
+                totals["misses"] += attrs.get("cache") == "miss"
+                totals["errors"] += "error" in attrs
+        return event
+
+    def summary(self, session=None):
+        """[{name, count, total_ms, mean_ms, max_ms, rows, hits, misses, errors}], slowest total first."""
+        with self._lock:
+            rows = [
+                {"name": name, **totals, "mean_ms": totals["total_ms"] / totals["count"]}
+                for (owner, name), totals in self._totals.items() if owner == session
+            ]
+        return sorted(rows, key=lambda row: -row["total_ms"])
+
+    def events(self, session=None, limit=None):
+        """Recorded events, oldest first, optionally of one session only."""
+        with self._lock:
+            events = [e for e in self._events if session is None or e["session"] == session]
+        return events[-limit:] if limit else events
+
+    def export_jsonl(self, out, session=None):
+        """Writes the events as JSON lines to a path or a text file object; returns how many."""
+        events = self.events(session)
+        lines = "".join(json.dumps(e, default=str) + "\n" for e in events)
+        if isinstance(out, str):
+            with open(out, "a", encoding="utf-8") as fh:
+                fh.write(lines)
+        else:
+            out.write(lines)
+        return len(events)
+
+    def clear(self, session=None):
+        """Forgets the events and totals of one session, or everything when session is None."""
+        with self._lock:
+            if session is None:
+                self._events.clear()
+                self._totals.clear()
+                return
+            self._events = deque((e for e in self._events if e["session"] != session), maxlen=self._events.maxlen)
+            self._totals = {key: t for key, t in self._totals.items() if key[0] != session}
+
+
+recorder = Recorder()
+
+
+class span:
+    """
+    Times a block and records it on exit. The object is a dict-like bag for
+    attributes (rows, cache, ...); an exception escaping the block is
+    recorded as error=<type> and re-raised.
+    """
+
+    def __init__(self, name, **attrs):
+        self.name = name
+        self.attrs = attrs
+
+    def __setitem__(self, key, value):
+        self.attrs[key] = value
+
+    def __enter__(self):
+        self._token = _open_spans.set(_open_spans.get() + (self,))
+        self._start = time.time()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration_ms = (time.perf_counter() - self._started) * 1000
+        _open_spans.reset(self._token)
+        if exc_type is not None and issubclass(exc_type, Exception):
+            self.attrs["error"] = exc_type.__name__
+        recorder.record(self.name, duration_ms, start=self._start, session=_session.get(), **self.attrs)
+        return False
+
+
+def annotate(**attrs):
+    """Adds attributes to the innermost open span, e.g. annotate(cache="miss") from a cached function body."""
+    spans = _open_spans.get()
+    if spans:
+        spans[-1].attrs.update(attrs)
+
+
+def timed(name, rows=None):
+    """Decorator form of span; rows optionally maps the return value to a row count."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name) as s:
+                result = func(*args, **kwargs)
+                if rows is not None and result is not None:
+                    s["rows"] = rows(result)
+                return result
+        return wrapper
+    return decorator
+
+
+def record(name, duration_ms, **attrs):
+    """Records an already-measured duration (e.g. from code that cannot use a with block)."""
+    return recorder.record(name, duration_ms, session=_session.get(), **attrs)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The app runs from the repository root, which has no package metadata
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
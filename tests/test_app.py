@@ -0,0 +1,57 @@
+import functools
+import os
+import sqlite3
+
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+import logic.ontology_index
+import ui.state
+from database.engines import dispose_engines
+from logic.mapping_store import MappingStore
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+ISC = "https://cwrusdle.bitbucket.io/mds/CurrentShortCircuit"
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "app.db")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE el_metadata (id INTEGER PRIMARY KEY, module_id TEXT, current REAL)")
+    monkeypatch.setattr(logic.ontology_index, "INDEX_DIR", str(tmp_path / "index"))
+    monkeypatch.setattr(ui.state, "MappingStore", functools.partial(MappingStore, str(tmp_path / "maps.db")))
+    st.cache_resource.clear()
+    st.cache_data.clear()
+
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.run()
+    at.sidebar.selectbox[0].select("sqlite").run()
+    at.sidebar.text_input[0].input(db_path).run()
+    at.sidebar.button[0].click().run()
+    # The catalog panel only lists the tables on the run after connecting
+    at.run()
+    yield at
+    st.cache_resource.clear()
+    dispose_engines()
+
+
+def test_map_a_column_through_the_panels(app):
+    app.selectbox(key="db_table_selector").select("el_metadata").run()
+    assert not app.exception
+    assert [b.label for b in app.button if b.label.startswith("Map:")] == [
+        "Map: **id**", "Map: **module_id**", "Map: **current**"]
+
+    app.button(key="df1_current").click().run()
+    dropdown = app.selectbox(key="ontology_dropdown_current")
+    assert f"CurrentShortCircuit  ({ISC})" in dropdown.options
+    dropdown.select(ISC).run()
+
+    assert not app.exception
+    assert app.session_state.mappings == {"current": ISC}
+    assert app.button(key="df1_current").disabled
+    assert "CurrentShortCircuit" in app.code[0].value
+    # Every panel ran as its own fragment and recorded its latency
+    assert {"catalog_panel", "column_picker", "term_picker", "shacl_preview"} <= set(
+        app.session_state.panel_latency_ms)
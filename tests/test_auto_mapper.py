@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import logic.auto_mapper as auto_mapper
+from logic.auto_mapper import TermMatrix, assign_one_to_one, column_features, propose_mappings, term_features
+
+EX = "http://example.org/onto#"
+
+TERMS = [EX + "ShortCircuitCurrent", EX + "OpenCircuitVoltage", EX + "ModuleTemperature", EX + "Irradiance",
+         EX + "MaximumPower", EX + "Timestamp", EX + "SerialNumber"]
+LABELS = ["short circuit current", "open circuit voltage", "", "irradiance", "maximum power", "", "serial number"]
+DEFINITIONS = ["", "", "Temperature of the module back sheet.", "", "", "", ""]
+COLUMNS = ["short_circuit_current", "openCircuitVoltage", "module_temp", "timestamp", "serial_no", "zzz"]
+
+
+def brute_force_scores(columns, matrix):
+    """Dense cosine similarities with the same features and IDF weights."""
+    term_vectors = []
+    for term, label, definition in zip(TERMS, LABELS, DEFINITIONS):
+        term_vectors.append({f: tf * matrix.idf[matrix.feature_ids[f]]
+                             for f, tf in term_features(term, label, definition).items()})
+    scores = np.zeros((len(columns), len(TERMS)))
+    for i, column in enumerate(columns):
+        col = {f: tf * matrix.idf[matrix.feature_ids[f]]
+               for f, tf in column_features(column).items() if f in matrix.feature_ids}
+        col_norm = np.sqrt(sum(v * v for v in col.values())) or 1.0
+        for j, term in enumerate(term_vectors):
+            term_norm = np.sqrt(sum(v * v for v in term.values())) or 1.0
+            scores[i, j] = sum(v * term.get(f, 0.0) for f, v in col.items()) / (col_norm * term_norm)
+    return scores
+
+
+@pytest.mark.parametrize("block_size", [2, 4096])
+def test_top_k_matches_brute_force(monkeypatch, block_size):
+    monkeypatch.setattr(auto_mapper, "TERM_BLOCK_SIZE", block_size)
+    matrix = TermMatrix(TERMS, LABELS, DEFINITIONS)
+    proposals = propose_mappings(COLUMNS, matrix, top_k=3)
+    expected = brute_force_scores(COLUMNS, matrix)
+    for i, column in enumerate(COLUMNS):
+        got = proposals[proposals["column"] == column]
+        best = np.sort(expected[i][expected[i] > 0])[::-1][:3]
+        np.testing.assert_allclose(got["score"].to_numpy(), best.round(4), atol=1e-4)
+        assert got["rank"].tolist() == list(range(1, len(got) + 1))
+    assert proposals[proposals["rank"] == 1].set_index("column")["term"].to_dict() == {
+        "short_circuit_current": EX + "ShortCircuitCurrent",
+        "openCircuitVoltage": EX + "OpenCircuitVoltage",
+        "module_temp": EX + "ModuleTemperature",
+        "timestamp": EX + "Timestamp",
+        "serial_no": EX + "SerialNumber",
+    }
+
+
+def test_exclusions_and_empty_inputs():
+    matrix = TermMatrix(TERMS, LABELS, DEFINITIONS)
+    excluded = propose_mappings(["timestamp"], matrix, exclude_terms={EX + "Timestamp"})
+    assert EX + "Timestamp" not in excluded["term"].tolist()
+    mask = np.array([t == EX + "Irradiance" for t in TERMS])
+    assert set(propose_mappings(COLUMNS, matrix, term_mask=mask)["term"]) <= {EX + "Irradiance"}
+    assert propose_mappings([], matrix).empty
+    assert propose_mappings(["zzz"], matrix).empty
+    assert propose_mappings(["timestamp"], TermMatrix([])).empty
+
+
+def test_assign_one_to_one():
+    proposals = pd.DataFrame({
+        "column": ["a", "a", "b", "b", "c"],
+        "term": ["T1", "T2", "T1", "T3", "T1"],
+        "score": [0.9, 0.5, 0.95, 0.2, 0.1],
+        "rank": [1, 2, 1, 2, 1],
+    })
+    assert assign_one_to_one(proposals) == {"b": "T1", "a": "T2"}
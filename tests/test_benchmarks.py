@@ -0,0 +1,42 @@
+import json
+import sqlite3
+
+from benchmarks import synthetic
+from benchmarks.compare import compare, main
+from logic.ontology_index import get_ontology_index
+
+
+def run(**cases):
+    return {"params": {"classes": 10}, "results": {
+        case: {"median_s": seconds, "peak_kib": kib} for case, (seconds, kib) in cases.items()}}
+
+
+def test_compare_flags_slower_and_hungrier_cases():
+    before = run(a=(1.0, 100), b=(1.0, 100), c=(0.0001, 100), gone=(1.0, 1))
+    after = run(a=(1.1, 100), b=(1.5, 100), c=(0.001, 130), new=(1.0, 1))
+    result = {case: worse for case, _, _, worse in compare(before, after, 1.2, min_seconds=0.002)}
+    # c is 10x slower but within the timer noise; its memory still regressed
+    assert result == {"a": False, "b": True, "c": True}
+
+
+def test_compare_exit_status(tmp_path, capsys):
+    (tmp_path / "before.json").write_text(json.dumps(run(a=(1.0, 100))))
+    (tmp_path / "same.json").write_text(json.dumps(run(a=(1.0, 100))))
+    (tmp_path / "slow.json").write_text(json.dumps(run(a=(2.0, 100))))
+    assert main([str(tmp_path / "before.json"), str(tmp_path / "same.json")]) == 0
+    assert main([str(tmp_path / "before.json"), str(tmp_path / "slow.json")]) == 1
+    assert "REGRESSED" in capsys.readouterr().out
+
+
+def test_synthetic_inputs_are_deterministic(tmp_path):
+    for name in ("a", "b"):
+        synthetic.make_sqlite_db(str(tmp_path / f"{name}.db"), n_tables=3, n_columns=4, rows=2)
+        synthetic.make_ontology(str(tmp_path / f"{name}.ttl"), n_classes=25)
+    schemas = []
+    for name in ("a", "b"):
+        with sqlite3.connect(str(tmp_path / f"{name}.db")) as conn:
+            schemas.append(conn.execute("SELECT sql FROM sqlite_master ORDER BY name").fetchall())
+    assert schemas[0] == schemas[1] and len(schemas[0]) == 3
+    assert (tmp_path / "a.ttl").read_text() == (tmp_path / "b.ttl").read_text()
+    index = get_ontology_index(str(tmp_path / "a.ttl"), index_dir=str(tmp_path / "index"))
+    assert len(index) == 25 and len(index.subclass_edges) == 15
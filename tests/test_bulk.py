@@ -0,0 +1,70 @@
+import csv
+import io
+
+import pandas as pd
+import pytest
+
+from database.bulk import _copy_from_stdin, bulk_load
+from database.engines import dispose_engines
+from database.sqlite import SQLiteDB
+
+
+class RecordingCopy:
+    """Stands in for the psycopg2 connection pandas hands to _copy_from_stdin."""
+
+    def __init__(self):
+        self.connection = self
+        self.copied = None
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def copy_expert(self, sql, buffer):
+        self.sql, self.copied = sql, buffer.getvalue()
+
+
+def test_copy_marks_only_real_nulls():
+    class Table:
+        name, schema = 't"x', "s"
+
+    conn = RecordingCopy()
+    _copy_from_stdin(Table, conn, ["a", "b"], iter([("x", None), (r"\N", ""), (None, 1.5)]))
+    assert conn.sql.startswith('COPY "s"."t""x" ("a", "b") FROM STDIN')
+    assert "FORMAT csv" in conn.sql and "NULL '\\N'" in conn.sql
+    # Postgres CSV: a quoted field is never NULL, an unquoted \N always is
+    assert conn.copied.splitlines() == ['"x",\\N', '"\\N",""', '\\N,1.5']
+    assert list(csv.reader(io.StringIO(conn.copied)))[1] == [r"\N", ""]
+
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    yield SQLiteDB(str(tmp_path / "bulk.db"))
+    dispose_engines()
+
+
+def frame(start, stop):
+    return pd.DataFrame({"id": range(start, stop), "name": [f"m{i}" if i % 3 else None for i in range(start, stop)]})
+
+
+def test_bulk_load_chunks_and_replaces(sqlite_db):
+    stats = bulk_load(sqlite_db.engine, "modules", frame(0, 10), if_exists="replace", chunksize=4)
+    assert (stats["rows"], stats["batches"], stats["batch_size"]) == (10, 3, 4)
+    loaded = sqlite_db.read_records("SELECT * FROM modules ORDER BY id")
+    pd.testing.assert_frame_equal(loaded, frame(0, 10), check_dtype=False)
+
+    # An iterator of chunks is appended after the first batch replaced the table
+    stats = sqlite_db.bulk_load_records("modules", iter([frame(0, 3), frame(3, 5)]), if_exists="replace")
+    assert (stats["rows"], stats["batches"]) == (5, 2)
+    assert sqlite_db.read_records("SELECT COUNT(*) AS n FROM modules")["n"][0] == 5
+
+
+def test_bulk_load_is_one_transaction(sqlite_db):
+    sqlite_db.bulk_load_records("modules", frame(0, 2), if_exists="replace")
+    assert sqlite_db.bulk_load_records("modules", iter([frame(2, 4), frame(0, 1).assign(extra=1)])) is None
+    assert sqlite_db.read_records("SELECT COUNT(*) AS n FROM modules")["n"][0] == 2
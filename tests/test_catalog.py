@@ -0,0 +1,45 @@
+import sqlite3
+
+import pytest
+
+from database.catalog import CATALOG_COLUMNS, DatabaseConnector
+from database.engines import dispose_engines
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / "catalog.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE modules (id INTEGER NOT NULL PRIMARY KEY, serial TEXT, isc REAL)")
+        conn.execute("CREATE TABLE el (module_id INTEGER, taken_at TEXT)")
+    connector = DatabaseConnector("sqlite", db_path=path)
+    assert connector.connect()
+    yield connector
+    dispose_engines()
+
+
+def test_catalog_lists_every_column(db):
+    catalog = db.load_catalog()
+    assert list(catalog.columns) == CATALOG_COLUMNS
+    assert db.get_table_columns("modules") == ["id", "serial", "isc"]
+    assert db.get_table_columns("el") == ["module_id", "taken_at"]
+    info = db.get_column_info("modules").set_index("column_name")
+    assert info.loc["serial", "data_type"] == "TEXT"
+    assert not info.loc["id", "is_nullable"] and info.loc["isc", "is_nullable"]
+    assert db.get_column_info("missing").empty
+
+
+def test_catalog_is_cached_until_invalidated(db):
+    first = db.load_catalog()
+    with db.engine.begin() as conn:
+        conn.exec_driver_sql("ALTER TABLE modules ADD COLUMN voc REAL")
+    assert db.load_catalog() is first
+    assert "voc" not in db.get_table_columns("modules")
+    db.invalidate_catalog()
+    assert db.get_table_columns("modules")[-1] == "voc"
+
+
+def test_expired_catalog_is_refreshed(db):
+    db.catalog_ttl = 0
+    first = db.load_catalog()
+    assert db.load_catalog() is not first
@@ -0,0 +1,108 @@
+import functools
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+from rdflib import Graph
+
+import cli
+import logic.mapping_store
+from database.engines import dispose_engines
+from logic.mapping_store import MappingStore
+
+ISC = "https://cwrusdle.bitbucket.io/mds/CurrentShortCircuit"
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "pv.db")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE el_metadata (id INTEGER NOT NULL PRIMARY KEY, module_id TEXT, "
+                     "short_circuit_current REAL)")
+        conn.execute("CREATE TABLE notes (body TEXT)")
+    (tmp_path / "db.json").write_text(json.dumps({"db_type": "sqlite", "db_path": db_path}))
+    (tmp_path / "mappings.json").write_text(json.dumps(
+        {"el_metadata": {"module_id": "urn:module", "gone": "urn:gone"}, "missing": {"x": "urn:x"}}))
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(logic.mapping_store, "MappingStore", functools.partial(MappingStore, str(tmp_path / "m.db")))
+    yield tmp_path
+    dispose_engines()
+
+
+def test_introspect(workdir, capsys):
+    assert cli.main(["introspect", "--db", "db.json", "--table", "el_metadata"]) == 0
+    tables = json.loads(capsys.readouterr().out)
+    assert list(tables) == ["el_metadata"]
+    assert [c["column"] for c in tables["el_metadata"]] == ["id", "module_id", "short_circuit_current"]
+    assert tables["el_metadata"][0]["nullable"] is False
+
+
+def test_profile(workdir, capsys):
+    cli.main(["profile", "--db", "db.json", "--table", "el_metadata", "--sample-rows", "10", "--workers", "2"])
+    profile = json.loads(capsys.readouterr().out)["el_metadata"]
+    assert [p["column_name"] for p in profile] == ["id", "module_id", "short_circuit_current"]
+    assert profile[0]["rows_sampled"] == 0 and profile[0]["error"] is None
+
+
+def test_automap_keeps_valid_mappings(workdir, capsys):
+    cli.main(["automap", "--db", "db.json", "--mappings", "mappings.json", "--min-score", "0.3",
+              "--output", "out.json"])
+    catalog = json.loads((workdir / "out.json").read_text())
+    assert catalog["el_metadata"]["module_id"] == "urn:module"
+    assert catalog["el_metadata"]["short_circuit_current"] == ISC
+    assert "missing" not in catalog and "gone" not in catalog["el_metadata"]
+    assert "Skipping unknown column el_metadata.gone" in capsys.readouterr().err
+
+
+def test_shacl(workdir, capsys):
+    cli.main(["shacl", "--mappings", "mappings.json", "--db", "db.json", "--output-dir", "shapes",
+              "--merged", "all.ttl", "--workers", "1"])
+    assert [p.name for p in (workdir / "shapes").iterdir()] == ["shacl_mappings_el_metadata.ttl"]
+    assert len(Graph().parse(str(workdir / "all.ttl"), format="turtle"))
+    # Without an output, the shapes go to stdout
+    cli.main(["shacl", "--mappings", "mappings.json"])
+    assert "urn:gone" in capsys.readouterr().out
+
+
+def test_validate(workdir, capsys):
+    with sqlite3.connect(str(workdir / "pv.db")) as conn:
+        conn.executemany("INSERT INTO el_metadata VALUES (?, ?, ?)", [(1, "M1", 9.1), (2, "M2", "n/a")])
+    (workdir / "checks.json").write_text(json.dumps({"el_metadata": {"id": "urn:id", "short_circuit_current": ISC}}))
+    args = ["validate", "--db", "db.json", "--mappings", "checks.json", "--chunksize", "1"]
+    cli.main(args)
+    report = json.loads(capsys.readouterr().out)["el_metadata"]
+    assert report["rows"] == 2
+    violations = {(c["column"], c["constraint"]): c["violations"] for c in report["constraints"]}
+    assert violations[("short_circuit_current", "datatype")] == 1
+    assert violations[("id", "minCount")] == 0
+    with pytest.raises(SystemExit) as exited:
+        cli.main(args + ["--strict"])
+    assert exited.value.code == 1
+
+
+def test_run_job(workdir):
+    (workdir / "job.json").write_text(json.dumps({
+        "database": json.loads((workdir / "db.json").read_text()),
+        "mappings": ["mappings.json"],
+        "auto_map": {"min_score": 0.3},
+        "store": True,
+        "output_dir": "shapes",
+        "catalog_output": "catalog.json",
+    }))
+    cli.main(["run", "--config", "job.json"])
+    catalog = json.loads((workdir / "catalog.json").read_text())
+    assert catalog["el_metadata"]["short_circuit_current"] == ISC
+    assert (workdir / "shapes" / "shacl_mappings_el_metadata.ttl").exists()
+    store = logic.mapping_store.MappingStore()
+    assert store.mapped_tables(f"sqlite:///{workdir / 'pv.db'}") == [("", "el_metadata", len(catalog["el_metadata"]))]
+    store.close()
+
+
+def test_help_starts_without_heavy_imports():
+    code = "import sys, cli; cli.build_parser(); print(sorted({'pandas', 'rdflib', 'sqlalchemy', 'numpy'} & set(sys.modules)))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(os.path.abspath(cli.__file__))).stdout
+    assert out.strip() == "[]"
@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import SyntheticELDB, make_el_data
+from database.postgres import pair_el_measurements
+
+
+def pairs_from_get_el_pairs(db, modules):
+    pairs = set()
+    for module in modules:
+        for date, pair in db.get_el_pairs(module).items():
+            if date in ("message", "error"):
+                continue
+            pairs.add((module, date, pair["tenth_isc"]["ID"], pair["one_isc"]["ID"]))
+    return pairs
+
+
+def pairs_from_frame(frame):
+    return {(r.module_id, str(r.date), r.tenth_isc_id, r.one_isc_id) for r in frame.itertuples(index=False)}
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_vectorized_pairs_match_get_el_pairs(seed):
+    isc, el = make_el_data(6, days=12, per_day=6, seed=seed, random_levels=True)
+    db = SyntheticELDB(isc, el)
+    expected = pairs_from_get_el_pairs(db, isc["module_id"])
+    # Random levels leave some days without a pair
+    assert 0 < len(expected) < 6 * 12
+    assert pairs_from_frame(pair_el_measurements(db.joined)) == expected
+    assert pairs_from_frame(db.get_el_pairs_batch(list(isc["module_id"]), pushdown=False)) == expected
+
+
+def test_every_day_pairs_with_fixed_levels():
+    isc, el = make_el_data(3, days=5)
+    assert len(SyntheticELDB(isc, el).get_el_pairs_batch(list(isc["module_id"]), pushdown=False)) == 15
+
+
+def test_pairs_of_empty_input():
+    assert pair_el_measurements(pd.DataFrame()).empty
+    isc, el = make_el_data(2, days=2)
+    assert SyntheticELDB(isc, el).get_el_pairs_batch([]).empty
@@ -0,0 +1,50 @@
+import pytest
+
+from database.catalog import DatabaseConnector
+from database.engines import build_url, dispose_engines, get_engine, pool_stats, pool_status
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry():
+    dispose_engines()
+    yield
+    dispose_engines()
+
+
+def test_build_url_escapes_credentials():
+    url = build_url("postgres", user="fair", password="p@ss/word", host="db", port="5432", database="pv")
+    assert url.password == "p@ss/word" and url.port == 5432
+    assert url.render_as_string(hide_password=False).startswith("postgresql+psycopg2://fair:p%40ss%2Fword@db")
+    with pytest.raises(ValueError):
+        build_url("oracle")
+
+
+def test_engines_are_shared_per_url_and_options(tmp_path):
+    url = build_url("sqlite", db_path=str(tmp_path / "a.db"))
+    engine = get_engine(url)
+    assert get_engine(str(url)) is engine
+    assert get_engine(url, pool_size=2) is not engine
+    assert get_engine(build_url("sqlite", db_path=str(tmp_path / "b.db"))) is not engine
+
+    first = DatabaseConnector("sqlite", db_path=str(tmp_path / "a.db"))
+    second = DatabaseConnector("sqlite", db_path=str(tmp_path / "a.db"))
+    assert first.connect() and second.connect()
+    assert first.engine is second.engine is engine
+    assert len(pool_stats()) == 3
+
+
+def test_pool_status_never_reports_negative_overflow(tmp_path):
+    engine = get_engine(build_url("sqlite", db_path=str(tmp_path / "a.db")), pool_size=2, max_overflow=1)
+    status = pool_status(engine)
+    assert status["pool"] == "QueuePool" and status["overflow"] == 0
+    connections = [engine.connect() for _ in range(3)]
+    status = pool_status(engine)
+    assert status["checkedout"] == 3 and status["overflow"] == 1
+    for conn in connections:
+        conn.close()
+    assert pool_status(engine)["checkedin"] == 2
+
+
+def test_memory_sqlite_ignores_pool_sizing():
+    engine = get_engine("sqlite://", pool_size=2)
+    assert pool_status(engine) == {"url": "sqlite://", "pool": "SingletonThreadPool"}
@@ -0,0 +1,72 @@
+from collections import deque
+
+import numpy as np
+import pytest
+
+from logic.hierarchy import ClassHierarchy
+
+
+def random_edges(n, seed):
+    """(child, parent) rows: a random forest plus multiple inheritance, a cycle and a self-loop."""
+    rng = np.random.default_rng(seed)
+    edges = [(child, int(rng.integers(0, child))) for child in range(1, n) if rng.random() < 0.8]
+    edges += [(int(rng.integers(1, n)), int(rng.integers(0, n))) for _ in range(n // 5)]
+    edges += [(2, n - 1), (5, 5)]
+    return np.array(edges, dtype=np.int64)
+
+
+def brute_descendants(n, edges, root):
+    children = {}
+    for child, parent in edges.tolist():
+        if child != parent:
+            children.setdefault(parent, set()).add(child)
+    seen, queue = {root}, deque([root])
+    while queue:
+        for child in children.get(queue.popleft(), ()):
+            if child not in seen:
+                seen.add(child)
+                queue.append(child)
+    return seen
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_subtrees_match_brute_force_reachability(seed):
+    n = 80
+    edges = random_edges(n, seed)
+    hierarchy = ClassHierarchy(n, edges)
+    for root in range(n):
+        expected = brute_descendants(n, edges, root)
+        assert set(hierarchy.descendants(root).tolist()) == expected
+        assert hierarchy.subtree_size(root) == len(expected)
+        assert set(np.flatnonzero(hierarchy.subtree_mask(root)).tolist()) == expected
+        for i in range(n):
+            if hierarchy.is_descendant(i, root):
+                assert i in expected
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_breadcrumbs_follow_subclass_edges(seed):
+    n = 80
+    edges = random_edges(n, seed)
+    pairs = set(map(tuple, edges.tolist()))
+    hierarchy = ClassHierarchy(n, edges)
+    for i in range(n):
+        path = hierarchy.ancestors(i) + [i]
+        for parent, child in zip(path, path[1:]):
+            assert (child, parent) in pairs
+        for ancestor in path[:-1]:
+            assert i in brute_descendants(n, edges, ancestor)
+
+
+def test_children_and_classes_with_subclasses():
+    edges = np.array([(1, 0), (2, 0), (3, 1)])
+    hierarchy = ClassHierarchy(5, edges)
+    assert sorted(hierarchy.children(0).tolist()) == [1, 2]
+    assert hierarchy.children(4).tolist() == []
+    assert hierarchy.classes_with_subclasses().tolist() == [0, 1]
+
+
+def test_no_edges():
+    hierarchy = ClassHierarchy(3, np.empty((0, 2), dtype=np.int64))
+    assert [hierarchy.subtree_size(i) for i in range(3)] == [1, 1, 1]
+    assert hierarchy.ancestors(2) == []
@@ -0,0 +1,52 @@
+import pytest
+
+from logic.mapping_store import MappingStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = MappingStore(str(tmp_path / "maps" / "mappings.db"))
+    yield store
+    store.close()
+
+
+def test_mappings_are_scoped_per_table(store):
+    store.set_mappings("db", "el", {"current": "T:Isc", "date": "T:Date"})
+    store.set_mapping("db", "el", "current", "T:Current")
+    store.set_mapping("db", "el", "current", "T:Other", schema="archive")
+    store.set_mapping("other", "el", "date", "T:Date")
+    assert store.get_table_mappings("db", "el") == {"current": "T:Current", "date": "T:Date"}
+    assert store.get_table_mappings("db", "el", schema="archive") == {"current": "T:Other"}
+    assert store.columns_for_term("T:Date") == [("db", "", "el", "date"), ("other", "", "el", "date")]
+    assert store.columns_for_term("T:Date", database="other") == [("other", "", "el", "date")]
+    assert store.mapped_tables("db") == [("", "el", 2), ("archive", "el", 1)]
+
+    store.remove_mapping("db", "el", "date")
+    assert store.get_table_mappings("db", "el") == {"current": "T:Current"}
+    store.clear_table("db", "el")
+    assert store.get_table_mappings("db", "el") == {}
+
+
+def test_snapshots_restore_a_version(store):
+    store.set_mappings("db", "el", {"current": "T:Isc", "date": "T:Date"})
+    first = store.snapshot("db", "el", label="initial")
+    store.set_mappings("db", "el", {"current": "T:Current", "module": "T:Module"})
+    second = store.snapshot("db", "el")
+    store.clear_table("db", "el")
+
+    snapshots = store.list_snapshots("db", "el")
+    assert [(s["id"], s["label"], s["columns"]) for s in snapshots] == [(second, None, 3), (first, "initial", 2)]
+    assert store.restore_snapshot(first) == {"current": "T:Isc", "date": "T:Date"}
+    assert store.get_table_mappings("db", "el") == {"current": "T:Isc", "date": "T:Date"}
+    with pytest.raises(KeyError):
+        store.restore_snapshot(second + 1)
+
+
+def test_mappings_persist_across_stores(tmp_path):
+    path = str(tmp_path / "mappings.db")
+    first = MappingStore(path)
+    first.set_mapping("db", "el", "current", "T:Isc")
+    first.close()
+    second = MappingStore(path)
+    assert second.get_table_mappings("db", "el") == {"current": "T:Isc"}
+    second.close()
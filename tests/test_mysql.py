@@ -0,0 +1,101 @@
+import pytest
+
+from database.mysql import MySQLDB
+
+
+def column(name="note", column_type="varchar(20)", default=None, extra="", nullable="YES", comment=""):
+    return {"table_name": "modules", "column_name": name, "column_type": column_type, "is_nullable": nullable,
+            "column_default": default, "extra": extra, "collation_name": None, "column_comment": comment}
+
+
+def modify(info):
+    return MySQLDB._modify_column_clause(info), MySQLDB._modify_column_params(info)
+
+
+def test_literal_default_is_bound():
+    assert modify(column(default="n/a 100%")) == (
+        "MODIFY COLUMN `note` varchar(20) NULL DEFAULT %s COMMENT %s", ["n/a 100%"])
+    # A text column whose default merely reads like an expression keeps it as text
+    assert modify(column(default="CURRENT_TIMESTAMP"))[1] == ["CURRENT_TIMESTAMP"]
+
+
+def test_null_default_is_omitted():
+    assert modify(column(nullable="NO")) == ("MODIFY COLUMN `note` varchar(20) NOT NULL COMMENT %s", [])
+
+
+@pytest.mark.parametrize("column_type, default, extra, expected", [
+    # MySQL 8
+    ("timestamp", "CURRENT_TIMESTAMP", "DEFAULT_GENERATED", "DEFAULT (CURRENT_TIMESTAMP)"),
+    ("int", "(`a` + 1)", "DEFAULT_GENERATED", "DEFAULT ((`a` + 1))"),
+    # MySQL 5.7
+    ("timestamp", "CURRENT_TIMESTAMP", "on update CURRENT_TIMESTAMP",
+     "DEFAULT CURRENT_TIMESTAMP on update CURRENT_TIMESTAMP"),
+    ("datetime(3)", "CURRENT_TIMESTAMP(3)", "", "DEFAULT CURRENT_TIMESTAMP(3)"),
+    # MariaDB
+    ("timestamp", "current_timestamp()", "on update current_timestamp()",
+     "DEFAULT current_timestamp() on update current_timestamp()"),
+    ("datetime", "now(6)", "", "DEFAULT now(6)"),
+])
+def test_expression_defaults_are_not_bound(column_type, default, extra, expected):
+    clause, params = modify(column("at", column_type, default, extra))
+    assert clause == f"MODIFY COLUMN `at` {column_type} NULL {expected} COMMENT %s"
+    assert params == []
+
+
+def test_generated_columns_are_rejected():
+    with pytest.raises(ValueError):
+        MySQLDB._modify_column_clause(column(extra="VIRTUAL GENERATED"))
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+    def fetchall(self):
+        return self.rows
+
+
+class FakeEngine:
+    """Serves the information_schema reads of add_comments and records its ALTER statements."""
+
+    def __init__(self, columns, table_comments):
+        self.columns, self.table_comments, self.executed = columns, table_comments, []
+
+    def connect(self):
+        return self
+
+    begin = connect
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query):
+        return FakeResult(self.columns if "information_schema.columns" in str(query) else self.table_comments)
+
+    def exec_driver_sql(self, query, params):
+        self.executed.append((query, params))
+
+
+def test_add_comments_writes_one_statement_per_table():
+    db = MySQLDB.__new__(MySQLDB)
+    db.engine = FakeEngine(
+        [column(comment="same"), column("at", "datetime", "CURRENT_TIMESTAMP"), column("n", "int", "0")],
+        [("modules", "old")],
+    )
+    stats = db.add_comments({"note": "same", "at": "Time", "n": "Count", None: "Modules"}, table="modules")
+    assert stats == {"written": 3, "skipped": 1}
+    assert db.engine.executed == [(
+        "ALTER TABLE `modules` MODIFY COLUMN `at` datetime NULL DEFAULT CURRENT_TIMESTAMP COMMENT %s, "
+        "MODIFY COLUMN `n` int NULL DEFAULT %s COMMENT %s, COMMENT = %s",
+        ("Time", "0", "Count", "Modules"),
+    )]
+    assert db.add_comments({"missing": "x"}, table="modules") is None
@@ -0,0 +1,77 @@
+import os
+
+import numpy as np
+import pytest
+
+from logic.ontology_index import OntologyIndex, StringTable, _pack_strings, get_ontology_index, index_path
+
+ONTOLOGY = """\
+@prefix ex: <http://example.org/onto#> .
+@prefix owl: <http://www.w3.org/2002/07/owl#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix skos: <http://www.w3.org/2004/02/skos/core#> .
+
+ex:Module a owl:Class ; rdfs:label "Module" ; skos:definition "A PV module." .
+ex:Cell a owl:Class ; rdfs:label "Zelle ü" ; rdfs:subClassOf ex:Module .
+<http://other.org/terms/Current> a owl:Class ; rdfs:subClassOf owl:Thing .
+"""
+
+
+@pytest.fixture
+def ontology(tmp_path):
+    path = tmp_path / "onto.ttl"
+    path.write_text(ONTOLOGY, encoding="utf-8")
+    return str(path)
+
+
+def test_string_table():
+    strings = ["", "a", "über", "long " * 10]
+    table = StringTable(*_pack_strings(strings))
+    assert len(table) == 4
+    assert list(table) == table.tolist() == strings
+    assert table[-1] == strings[-1]
+    assert table[1:3] == strings[1:3]
+    with pytest.raises(IndexError):
+        table[4]
+
+
+def test_save_and_load_round_trip(ontology, tmp_path):
+    built = get_ontology_index(ontology, index_dir=str(tmp_path / "idx"))
+    path = str(tmp_path / "copy.idx")
+    built.save(path)
+    loaded = OntologyIndex.load(path)
+    assert loaded.sha256 == built.sha256 and loaded.source == "onto.ttl"
+    for field in OntologyIndex.FIELDS:
+        assert getattr(loaded, field).tolist() == getattr(built, field).tolist()
+    assert np.array_equal(loaded.subclass_edges, built.subclass_edges)
+    assert loaded.term_list() == ["http://example.org/onto#Cell", "http://example.org/onto#Module",
+                                  "http://other.org/terms/Current"]
+    assert loaded.labels.tolist() == ["Zelle ü", "Module", ""]
+    assert loaded.definitions.tolist() == ["", "A PV module.", ""]
+    assert loaded.namespace_list() == ["http://example.org/onto", "http://other.org/terms"]
+    assert loaded.subclass_edges.tolist() == [[0, 1]]
+
+
+def test_index_is_reused_until_the_file_changes(ontology, tmp_path):
+    index_dir = str(tmp_path / "idx")
+    first = get_ontology_index(ontology, index_dir=index_dir)
+    path = index_path(first.sha256, index_dir)
+    assert os.path.exists(path)
+    # A second call maps the saved file instead of parsing the ontology again
+    assert get_ontology_index(ontology, index_dir=index_dir)._mmap is not None
+
+    with open(ontology, "a", encoding="utf-8") as fh:
+        fh.write('<http://example.org/onto#New> a <http://www.w3.org/2002/07/owl#Class> .\n')
+    changed = get_ontology_index(ontology, index_dir=index_dir)
+    assert changed.sha256 != first.sha256
+    assert "http://example.org/onto#New" in changed.term_list()
+
+
+def test_corrupt_index_is_rebuilt(ontology, tmp_path):
+    index_dir = str(tmp_path / "idx")
+    sha256 = get_ontology_index(ontology, index_dir=index_dir).sha256
+    with open(index_path(sha256, index_dir), "wb") as fh:
+        fh.write(b"not an index")
+    with pytest.raises(ValueError):
+        OntologyIndex.load(index_path(sha256, index_dir))
+    assert len(get_ontology_index(ontology, index_dir=index_dir)) == 3
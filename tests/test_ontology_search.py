@@ -0,0 +1,50 @@
+import numpy as np
+
+from logic.ontology_search import OntologySearchIndex, local_name, split_words, trigrams
+
+EX = "http://example.org/onto#"
+
+TERMS = [EX + "ShortCircuitCurrent", EX + "OpenCircuitVoltage", EX + "Module", EX + "CellTemperature",
+         EX + "Irradiance"]
+LABELS = ["short circuit current", "", "PV module", "cell temperature", "Plane of array irradiance"]
+DEFINITIONS = ["", "Voltage with no load.", "A photovoltaic module.", "Temperature of a module's cells.", ""]
+
+
+def make_search():
+    return OntologySearchIndex(TERMS, LABELS, DEFINITIONS)
+
+
+def test_split_words_and_trigrams():
+    assert split_words("ShortCircuitCurrent") == ["short", "circuit", "current"]
+    assert split_words("isc_stc_W") == ["isc", "stc", "w"]
+    assert split_words("PVModule") == ["pv", "module"]
+    assert trigrams(["ab"]) == {"$ab", "ab$"}
+    assert trigrams(["a"]) == {"$a$"}
+    assert local_name(EX + "Module") == "Module"
+
+
+def test_partial_words_match_as_you_type():
+    search = make_search()
+    assert {t for t, _ in search.search("circ", k=2)} == {EX + "ShortCircuitCurrent", EX + "OpenCircuitVoltage"}
+    assert search.search("irrad")[0][0] == EX + "Irradiance"
+
+
+def test_prefix_match_ranks_first():
+    results = make_search().search("module")
+    assert results[0][0] == EX + "Module"
+    # The definition mentions "module" too, with a lower score
+    assert EX + "CellTemperature" in [term for term, _ in results]
+    scores = [score for _, score in results]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_filters():
+    search = make_search()
+    assert search.search("") == []
+    assert [t for t, _ in search.search("circuit", candidates={EX + "OpenCircuitVoltage"})] == [
+        EX + "OpenCircuitVoltage"]
+    assert EX + "Module" not in [t for t, _ in search.search("module", exclude={EX + "Module"})]
+    mask = np.zeros(len(TERMS), dtype=bool)
+    mask[TERMS.index(EX + "CellTemperature")] = True
+    assert [t for t, _ in search.search("module", term_mask=mask)] == [EX + "CellTemperature"]
+    assert len(search.search("c", k=1)) <= 1
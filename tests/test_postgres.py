@@ -0,0 +1,52 @@
+import datetime
+import time
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+
+from database.postgres import IncompleteReadError, PostgresDB
+
+
+class FakeWindowDB(PostgresDB):
+    """Answers window reads with one row per window, failing the one starting at fail_at."""
+
+    def __init__(self, fail_at=None):
+        self.engine = create_engine("sqlite://")
+        self.fail_at = fail_at
+
+    def read_records_from_postgres(self, query, params=None, chunksize=None):
+        lo = params[0]
+        # Finish out of order, so results must be put back in window order
+        time.sleep(0.02 if lo.day < 10 else 0)
+        if lo == self.fail_at:
+            return None
+        return pd.DataFrame({"start": [lo]})
+
+
+def test_windows_come_back_in_order_with_their_timings():
+    db = FakeWindowDB()
+    frame = db.fetch_data_by_date("t", "2024-01-01", "2024-02-29", window="7D")
+    starts = [t["start"] for t in db.last_fetch_timings]
+    assert frame["start"].tolist() == starts == sorted(starts)
+    assert starts[0] == datetime.date(2024, 1, 1) and len(starts) == 9
+
+
+def test_a_failed_window_fails_the_whole_fetch():
+    db = FakeWindowDB(fail_at=datetime.date(2024, 1, 15))
+    assert db.fetch_data_by_date("t", "2024-01-01", "2024-02-29", window="7D") is None
+    with pytest.raises(IncompleteReadError):
+        list(db.fetch_data_by_date("t", "2024-01-01", "2024-02-29", window="7D", concat=False))
+
+
+def test_stream_errors_are_raised(tmp_path):
+    db = PostgresDB.__new__(PostgresDB)
+    db.engine = create_engine(f"sqlite:///{tmp_path / 'db.sqlite'}")
+    with db.engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE t (x INTEGER)")
+        conn.exec_driver_sql("INSERT INTO t VALUES (1), (2), (3)")
+    assert sum(len(c) for c in db.stream_records_from_postgres("SELECT x FROM t", chunksize=2)) == 3
+    with pytest.raises(IncompleteReadError) as raised:
+        list(db.stream_records_from_postgres("SELECT x FROM missing", chunksize=2))
+    assert isinstance(raised.value.__cause__, (OperationalError, pd.errors.DatabaseError))
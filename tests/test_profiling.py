@@ -0,0 +1,83 @@
+import sqlite3
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+import database.profiling
+from database.catalog import DatabaseConnector
+from database.engines import dispose_engines
+from database.profiling import PROFILE_COLUMNS, sample_clause
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / "profile.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute('CREATE TABLE el ("module id" TEXT, current REAL, note TEXT)')
+        conn.executemany("INSERT INTO el VALUES (?, ?, ?)",
+                         [("M1", 1.5, None), ("M1", 2.5, None), ("M2", None, None), ("M1", 0.5, "x")])
+    connector = DatabaseConnector("sqlite", db_path=path)
+    assert connector.connect()
+    yield connector
+    dispose_engines()
+
+
+def test_profile_is_computed_in_the_database(db):
+    result = db.profile_table("el")
+    profile = result["profile"].set_index("column_name")
+    assert list(result["profile"].columns) == PROFILE_COLUMNS and result["sample_percent"] is None
+    assert profile.loc["module id", "distinct"] == 2
+    assert profile.loc["module id", "top_values"] == "M1 (3), M2 (1)"
+    assert profile.loc["current", "null_ratio"] == 0.25
+    assert (profile.loc["current", "min"], profile.loc["current", "max"]) == ("0.5", "2.5")
+    assert profile.loc["note", "null_ratio"] == 0.75
+    assert db.cached_profile("el") is result and db.profile_table("el") is result
+
+
+def test_sample_limit_bounds_the_scan(db):
+    profile = db.profile_table("el", sample_rows=2)["profile"].set_index("column_name")
+    assert profile.loc["module id", "rows_sampled"] == 2
+
+
+def test_failed_column_keeps_its_row(db, monkeypatch):
+    def fail(conn, sample):
+        raise RuntimeError()
+
+    monkeypatch.setattr(database.profiling, "_aggregates", fail)
+    profile = db.profile_table("el", force=True)["profile"]
+    assert profile["error"].tolist() == ["RuntimeError"] * 3
+
+
+class EstimateEngine:
+    """Postgres-flavoured engine that only answers the reltuples lookup."""
+
+    dialect = postgresql.dialect()
+
+    def __init__(self, estimate):
+        self.estimate = estimate
+
+    def connect(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params):
+        return self
+
+    def scalar(self):
+        return self.estimate
+
+
+@pytest.mark.parametrize("estimate", [None, -1, 0, 500])
+def test_small_or_unanalyzed_postgres_tables_use_a_limit(estimate):
+    assert sample_clause(EstimateEngine(estimate), "postgres", "el", sample_rows=1000) == ("el", "LIMIT 1000", None)
+
+
+def test_large_postgres_tables_are_block_sampled():
+    source, limit, percent = sample_clause(EstimateEngine(4_000_000), "postgres", "El Data", sample_rows=100_000)
+    assert source == '"El Data" TABLESAMPLE SYSTEM (2.5) REPEATABLE (0)'
+    assert limit == "" and percent == 2.5
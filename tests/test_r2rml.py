@@ -0,0 +1,97 @@
+import datetime
+import gzip
+
+import numpy as np
+import pandas as pd
+import pytest
+from rdflib import Graph, Literal, URIRef
+from rdflib.namespace import RDF, XSD
+
+from logic.r2rml import build_r2rml_mapping, chunk_to_ntriples, export_path, materialize, parse_r2rml
+
+MAPPINGS = {
+    "current": "https://cwrusdle.bitbucket.io/mds/CurrentShortCircuit",
+    "module name": "http://example.org/terms#ModuleName",
+    "measured at": "http://example.org/terms/MeasuredAt",
+    "ok": "http://example.org/terms/OK",
+}
+
+
+def plan_for(table="el metadata", key_columns=("id",)):
+    return parse_r2rml(build_r2rml_mapping(MAPPINGS, table, list(key_columns)))[0]
+
+
+def chunk():
+    return pd.DataFrame({
+        "id": [1.0, 2.0, np.nan, 4.0],
+        "current": [9.1, np.nan, 0.5, float("inf")],
+        "module name": ['M "1"', "line\nbreak", "x", None],
+        "measured at": pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04"]),
+        "ok": [True, False, True, False],
+    })
+
+
+def parse(text):
+    return Graph().parse(data=text, format="nt")
+
+
+def test_output_parses_back_with_every_triple():
+    text, triples = chunk_to_ntriples(chunk(), plan_for())
+    g = parse(text)
+    # Row 3 has no key; every other row is typed and gets its non-null values
+    assert triples == len(g) == 3 + 2 + 2 + 3 + 3
+    subjects = set(g.subjects(RDF.type, None))
+    assert {str(s) for s in subjects} == {f"http://example.com/data/el%20metadata/{i}" for i in (1, 2, 4)}
+
+
+def test_literals_round_trip():
+    g = parse(chunk_to_ntriples(chunk(), plan_for())[0])
+    row = URIRef("http://example.com/data/el%20metadata/1")
+    assert g.value(row, URIRef(MAPPINGS["current"])) == Literal(9.1)
+    assert g.value(row, URIRef(MAPPINGS["module name"])) == Literal('M "1"')
+    assert g.value(row, URIRef(MAPPINGS["ok"])).toPython() is True
+    assert g.value(URIRef("http://example.com/data/el%20metadata/2"), URIRef(MAPPINGS["module name"])) == \
+        Literal("line\nbreak")
+
+
+def test_midnight_datetimes_keep_their_time():
+    text = chunk_to_ntriples(chunk(), plan_for())[0]
+    values = list(parse(text).objects(None, URIRef(MAPPINGS["measured at"])))
+    assert all(v.datatype == XSD.dateTime for v in values)
+    assert sorted(str(v) for v in values) == ["2024-01-01T00:00:00", "2024-01-02T00:00:00", "2024-01-04T00:00:00"]
+
+
+def test_timezone_aware_datetimes():
+    frame = chunk().assign(**{"measured at": pd.to_datetime(
+        ["2024-01-01 10:30:00.25", "2024-01-02 00:00:00", "2024-01-03 00:00:00", "2024-06-01 12:00:00"],
+        format="ISO8601",
+    ).tz_localize("Europe/Berlin")})
+    g = parse(chunk_to_ntriples(frame, plan_for())[0])
+    values = {v.toPython() for v in g.objects(None, URIRef(MAPPINGS["measured at"]))}
+    berlin = frame["measured at"].dt.to_pydatetime()
+    assert values == {berlin[0], berlin[1], berlin[3]}
+    assert all(isinstance(v, datetime.datetime) and v.utcoffset() is not None for v in values)
+
+
+def test_names_with_spaces_produce_valid_ntriples():
+    text = chunk_to_ntriples(chunk(), plan_for("instrument data.el metadata", ("id", "module name")))[0]
+    g = parse(text)
+    assert len(set(g.objects(None, RDF.type))) == 1
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_materialize(tmp_path, workers):
+    frames = [chunk(), chunk().assign(id=[5.0, 6.0, 7.0, 8.0])]
+    out = str(tmp_path / "table.nt.gz")
+    stats = materialize(iter(frames), plan_for(), out, workers=workers)
+    with gzip.open(out, "rt", encoding="utf-8") as fh:
+        g = parse(fh.read())
+    assert stats["rows"] == 8
+    assert stats["triples"] == len(g)
+
+
+def test_export_path_stays_in_the_export_directory(tmp_path):
+    export_dir = str(tmp_path / "exports")
+    path = export_path("../instrument data/el", "session 1", export_dir=export_dir)
+    assert path == str(tmp_path / "exports" / "session_1-.._instrument_data_el.nt.gz")
+    assert export_path("el", "s", compress=False, export_dir=export_dir).endswith("s-el.nt")
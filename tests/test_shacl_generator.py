@@ -0,0 +1,101 @@
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+from rdflib import Graph
+
+from logic.shacl_generator import (IncrementalShaclDocument, build_shacl_graph, constraints_from_catalog,
+                                   generate_shacl_catalog, generate_shacl_file, xsd_datatype)
+
+XSD = "http://www.w3.org/2001/XMLSchema#"
+
+MAPPINGS = {
+    "current": "https://cwrusdle.bitbucket.io/mds/CurrentShortCircuit",
+    "module id": "http://example.org/terms#ModuleID",
+    'quote"d': "http://example.org/terms/Quoted",
+    "load %": "urn:example:load",
+    "température": "http://example.org/terms/Température",
+}
+
+CONSTRAINTS = {
+    "current": {"datatype": XSD + "double", "minCount": 1, "maxCount": 1,
+                "minInclusive": 0, "maxInclusive": 12.5},
+    "module id": {"datatype": XSD + "integer", "minExclusive": 0.0, "maxExclusive": 10.5},
+    "load %": {"datatype": XSD + "decimal", "maxInclusive": Decimal("99.5")},
+    "température": {"datatype": XSD + "dateTime", "minInclusive": "2024-01-01T00:00:00"},
+}
+
+CATALOG = {
+    "el_metadata": MAPPINGS,
+    "module_metadata": {"nameplate_isc": "https://cwrusdle.bitbucket.io/mds/CurrentShortCircuit"},
+    "unmapped": {},
+    "iv_curves": {"voltage": "urn:example:voltage", "current": "urn:example:current"},
+}
+
+
+@pytest.mark.parametrize("rdf_format", ["turtle", "nt"])
+@pytest.mark.parametrize("constraints", [None, CONSTRAINTS])
+@pytest.mark.parametrize("table", ["el_metadata", "instrument_data.el metadata"])
+def test_writer_matches_graph(rdf_format, constraints, table):
+    text = generate_shacl_file(MAPPINGS, db_table_name=table, rdf_format=rdf_format, constraints=constraints)
+    expected = build_shacl_graph(MAPPINGS, db_table_name=table, constraints=constraints)
+    # The shapes have no blank nodes, so equal triple sets mean equal graphs
+    # (rdflib's isomorphic() cannot hash the escaped IRIs of names with spaces)
+    assert set(Graph().parse(data=text, format=rdf_format)) == set(expected)
+
+
+def test_unsupported_format():
+    with pytest.raises(ValueError):
+        generate_shacl_file(MAPPINGS, rdf_format="xml")
+
+
+def test_incremental_document_matches_full_render():
+    document = IncrementalShaclDocument("el_metadata")
+    steps = [
+        ({}, None),
+        (dict(list(MAPPINGS.items())[:2]), None),
+        (MAPPINGS, None),
+        (MAPPINGS, CONSTRAINTS),
+        ({**MAPPINGS, "current": "http://example.org/terms/Other"}, CONSTRAINTS),
+        (dict(list(MAPPINGS.items())[1:]), {"module id": {"datatype": XSD + "integer"}}),
+    ]
+    for mappings, constraints in steps:
+        assert document.render(mappings, constraints) == \
+            generate_shacl_file(mappings, db_table_name="el_metadata", constraints=constraints)
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_catalog_writes_every_mapped_table(tmp_path, max_workers):
+    merged_path = str(tmp_path / "merged.ttl")
+    report = generate_shacl_catalog(CATALOG, output_dir=str(tmp_path / "shapes"), merged_path=merged_path,
+                                    max_workers=max_workers)
+    assert [r["table"] for r in report] == ["el_metadata", "module_metadata", "iv_curves"]
+    assert [r["mappings"] for r in report] == [5, 1, 2]
+    merged = Graph()
+    for r in report:
+        with open(r["path"], encoding="utf-8") as fh:
+            assert fh.read() == generate_shacl_file(CATALOG[r["table"]], db_table_name=r["table"])
+        merged += build_shacl_graph(CATALOG[r["table"]], db_table_name=r["table"])
+    assert set(Graph().parse(merged_path, format="turtle")) == set(merged)
+
+
+def test_catalog_without_output(tmp_path):
+    report = generate_shacl_catalog({"t": {"a": "urn:a"}})
+    assert report[0]["path"] is None and report[0]["seconds"] >= 0
+    assert generate_shacl_catalog({}) == []
+
+
+def test_constraints_from_catalog():
+    column_info = pd.DataFrame({
+        "column_name": ["id", "current", "date", "note", "flag"],
+        "data_type": ["INTEGER", "double precision", "timestamp with time zone", "TEXT", "boolean"],
+        "is_nullable": [False, True, True, True, False],
+    })
+    constraints = constraints_from_catalog(column_info, columns=["id", "current", "date", "flag"])
+    assert constraints == {
+        "id": {"maxCount": 1, "datatype": XSD + "integer", "minCount": 1},
+        "current": {"maxCount": 1, "datatype": XSD + "double"},
+        "date": {"maxCount": 1, "datatype": XSD + "dateTime"},
+        "flag": {"maxCount": 1, "datatype": XSD + "boolean", "minCount": 1},
+    }
+    assert xsd_datatype("jsonb") is None
@@ -0,0 +1,112 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from logic.shacl_generator import generate_shacl_file
+from logic.shacl_validator import compile_shapes, load_shapes, validate_chunks
+
+XSD = "http://www.w3.org/2001/XMLSchema#"
+
+SHAPES = {
+    "id": {"datatype": XSD + "integer", "minCount": 1, "maxCount": 1, "minInclusive": 1},
+    "current": {"datatype": XSD + "double", "minInclusive": 0, "maxExclusive": 10},
+    "flag": {"datatype": XSD + "boolean"},
+    "day": {"datatype": XSD + "date", "maxInclusive": datetime.date(2024, 1, 31)},
+    "note": {"maxCount": 1},
+    "gone": {"minCount": 1},
+}
+
+
+def frame():
+    return pd.DataFrame({
+        "id": [1, 2, 0, None, 5, 6.5],
+        "current": [1.0, 12.0, -1.0, None, "abc", 9.99],
+        "flag": ["true", "no", "0", None, "T", "false"],
+        "day": ["2024-01-01", "2024-02-01", "not a date", None, "2024-01-31", "2024-01-15"],
+        "note": ["a", "b", "c", "d", "e", "f"],
+    })
+
+
+def counts(result):
+    report = result["report"]
+    return {(r.column, r.constraint): r.violations for r in report.itertuples(index=False)}
+
+
+EXPECTED = {
+    ("id", "datatype"): 1,          # 6.5
+    ("id", "minCount"): 1,          # None
+    ("id", "minInclusive"): 1,      # 0
+    ("current", "datatype"): 1,     # "abc"
+    ("current", "minInclusive"): 1,  # -1
+    ("current", "maxExclusive"): 1,  # 12
+    ("flag", "datatype"): 1,        # "no"
+    ("day", "datatype"): 1,         # "not a date"
+    ("day", "maxInclusive"): 1,     # 2024-02-01
+    ("gone", "path"): 6,
+}
+
+
+def test_violation_counts():
+    result = validate_chunks([frame()], SHAPES)
+    assert result["rows"] == 6
+    assert counts(result) == EXPECTED
+
+
+@pytest.mark.parametrize("size", [1, 2, 4])
+def test_chunking_does_not_change_the_report(size):
+    data = frame()
+    chunks = [data.iloc[i:i + size] for i in range(0, len(data), size)]
+    assert counts(validate_chunks(chunks, SHAPES)) == EXPECTED
+
+
+def test_samples_name_rows_in_stream_order():
+    data = frame()
+    chunks = [data.iloc[:3], data.iloc[3:]]
+    report = validate_chunks(chunks, SHAPES, sample_size=2)["report"].set_index(["column", "constraint"])
+    assert report.loc[("id", "datatype"), "samples"] == "row 5: 6.5"
+    assert report.loc[("current", "datatype"), "samples"] == "row 4: 'abc'"
+    assert report.loc[("id", "minCount"), "violation_ratio"] == round(1 / 6, 4)
+
+
+def test_numeric_dtypes_and_no_rows():
+    data = pd.DataFrame({"id": np.array([1, 2, 3], dtype="int64"), "current": np.array([0.5, 10.0, 3.0])})
+    shapes = {"id": SHAPES["id"], "current": SHAPES["current"]}
+    assert counts(validate_chunks([data], shapes)) == {
+        ("id", "datatype"): 0, ("id", "minCount"): 0, ("id", "minInclusive"): 0,
+        ("current", "datatype"): 0, ("current", "minInclusive"): 0, ("current", "maxExclusive"): 1,
+    }
+    empty = validate_chunks([], shapes)
+    assert empty["rows"] == 0 and empty["report"]["violation_ratio"].isna().all()
+
+
+def test_timezone_aware_columns_and_bounds():
+    data = pd.DataFrame({
+        "aware": pd.to_datetime(["2024-01-01", "2024-06-01"]).tz_localize("UTC"),
+        "naive": pd.to_datetime(["2024-01-01", "2024-06-01"]),
+    })
+    shapes = {
+        "aware": {"datatype": XSD + "dateTime", "maxInclusive": datetime.datetime(2024, 3, 1)},
+        "naive": {"datatype": XSD + "dateTime", "minInclusive": pd.Timestamp("2024-03-01", tz="Europe/Berlin")},
+    }
+    result = counts(validate_chunks([data], shapes))
+    assert result[("aware", "maxInclusive")] == 1
+    assert result[("naive", "minInclusive")] == 1
+
+
+@pytest.mark.parametrize("constraints", [
+    {"datatype": XSD + "string", "minInclusive": "a"},
+    {"datatype": XSD + "boolean", "maxInclusive": 1},
+    {"datatype": XSD + "integer", "maxInclusive": "ten"},
+    {"minInclusive": "not a date"},
+])
+def test_unsupported_ranges_are_rejected_when_compiled(constraints):
+    with pytest.raises(ValueError):
+        compile_shapes({"column": constraints})
+
+
+def test_shapes_round_trip_through_shacl():
+    mappings = {column: f"http://example.org/terms/{column}" for column in SHAPES}
+    shapes = load_shapes(generate_shacl_file(mappings, db_table_name="t", constraints=SHAPES))
+    assert counts(validate_chunks([frame()], shapes)) == EXPECTED
@@ -0,0 +1,38 @@
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+from ui.table_mapping import filter_columns
+
+
+def test_filter_columns():
+    columns = pd.Series(["module_id", "Current", "current_max", "date"], dtype=object)
+    assert filter_columns(columns, {"current_max"}, "curr") == ["Current", "current_max"]
+    assert filter_columns(columns, {"current_max"}, "curr", "Unmapped") == ["Current"]
+    assert filter_columns(columns, {"current_max", "date"}, status="Mapped") == ["current_max", "date"]
+
+
+def paged_app():
+    import streamlit as st
+    from ui.table_mapping import paginate
+
+    n_items = st.session_state.get("n_items", 250)
+    start, stop = paginate(n_items, 100, "page")
+    st.write(f"{start}:{stop}")
+
+
+def test_paginate_shows_one_page_and_clamps_to_the_last():
+    at = AppTest.from_function(paged_app)
+    at.session_state["n_items"] = 50
+    at.run()
+    assert not at.number_input and at.markdown[0].value == "0:50"
+
+    at.session_state["n_items"] = 250
+    at.run()
+    assert at.number_input[0].label == "Page (of 3)"
+    at.number_input[0].set_value(3).run()
+    assert at.markdown[0].value == "200:250"
+
+    # Fewer items after filtering: the page moves back to the last one left
+    at.session_state["n_items"] = 150
+    at.run()
+    assert not at.exception and at.markdown[0].value == "100:150"
@@ -0,0 +1,54 @@
+import gzip
+
+import pytest
+from rdflib import Graph, Literal, URIRef
+from rdflib.namespace import RDFS, SKOS
+
+from logic.term_extractor import TermCollector, collect_file
+
+ONTOLOGY = """\
+@prefix ex: <http://example.org/onto#> .
+@prefix owl: <http://www.w3.org/2002/07/owl#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix skos: <http://www.w3.org/2004/02/skos/core#> .
+
+ex:Module a owl:Class ; rdfs:label "Module" ; skos:definition "A PV module." .
+ex:Cell a owl:Class ; rdfs:label "Cell" ; rdfs:subClassOf ex:Module, owl:Thing .
+ex:Voltage a owl:DatatypeProperty ; rdfs:subClassOf [ a owl:Restriction ] .
+_:b0 rdfs:label "anonymous" .
+"""
+
+
+@pytest.fixture(params=["ttl", "nt", "nt.gz"])
+def ontology_file(request, tmp_path):
+    g = Graph().parse(data=ONTOLOGY, format="turtle")
+    path = tmp_path / f"onto.{request.param}"
+    if request.param == "ttl":
+        path.write_text(ONTOLOGY, encoding="utf-8")
+    elif request.param == "nt":
+        g.serialize(str(path), format="nt", encoding="utf-8")
+    else:
+        with gzip.open(path, "wb") as fh:
+            fh.write(g.serialize(format="nt", encoding="utf-8"))
+    return str(path)
+
+
+def test_every_format_yields_the_same_terms(ontology_file):
+    collector = collect_file(ontology_file)
+    terms, labels, definitions = collector.terms()
+    assert terms == ["http://example.org/onto#Cell", "http://example.org/onto#Module",
+                     "http://example.org/onto#Voltage"]
+    assert labels == ["Cell", "Module", ""]
+    assert definitions == ["", "A PV module.", ""]
+    # Edges to owl:Thing and to blank nodes are not terms of the index
+    assert collector.subclass_edges().tolist() == [[0, 1]]
+
+
+def test_first_label_wins():
+    collector = TermCollector()
+    cell = URIRef("http://example.org/onto#Cell")
+    collector.triple(cell, RDFS.label, Literal("Cell"))
+    collector.triple(cell, RDFS.label, Literal("Zelle"))
+    collector.triple(cell, SKOS.definition, Literal("First."))
+    collector.triple(cell, SKOS.definition, Literal("Second."))
+    assert collector.terms() == (["http://example.org/onto#Cell"], ["Cell"], ["First."])
@@ -0,0 +1,76 @@
+import numpy as np
+
+from logic.ontology_index import OntologyIndex, namespace_of, split_uri
+from logic.ontology_search import local_name
+from logic.term_table import MergedTermTable
+
+EX = "http://example.org/onto#"
+
+
+def make_index(sha256, terms, labels, definitions, edges):
+    namespaces = sorted(set(namespace_of(t) for t in terms))
+    return OntologyIndex.from_lists(sha256, sha256, terms, labels, definitions, namespaces,
+                                    np.array(edges, dtype=np.int32).reshape(-1, 2))
+
+
+def merged():
+    first = make_index(
+        "a" * 64,
+        [EX + "A", EX + "B", "urn:x"],
+        ["A", "", "X"],
+        ["", "first B", ""],
+        [(1, 0)],  # B subClassOf A
+    )
+    second = make_index(
+        "b" * 64,
+        [EX + "B", "http://other.org/C", EX + "A"],
+        ["Bee", "C", "Other A"],
+        ["second B", "", "A defined"],
+        [(1, 0)],  # C subClassOf B
+    )
+    return first, second, MergedTermTable.merge([first, second])
+
+
+def test_terms_are_deduplicated_and_sorted():
+    first, second, table = merged()
+    expected = sorted(set(first.term_list()) | set(second.term_list()))
+    assert table.term_list() == expected
+    assert [table.term(i) for i in range(len(table))] == expected
+
+
+def test_earlier_sources_win_and_later_ones_fill_gaps():
+    _, _, table = merged()
+    row = {term: i for i, term in enumerate(table.term_list())}
+    assert table.labels[row[EX + "A"]] == "A"
+    assert table.definitions[row[EX + "A"]] == "A defined"
+    assert table.labels[row[EX + "B"]] == "Bee"
+    assert table.definitions[row[EX + "B"]] == "first B"
+
+
+def test_sources_and_edges():
+    _, _, table = merged()
+    row = {term: i for i, term in enumerate(table.term_list())}
+    assert table.sources[row[EX + "A"]] == 0b11
+    assert table.sources[row["urn:x"]] == 0b01
+    assert table.sources[row["http://other.org/C"]] == 0b10
+    assert table.source_counts() == {"a" * 64: 3, "b" * 64: 3}
+    assert {tuple(e) for e in table.subclass_edges.tolist()} == {
+        (row[EX + "B"], row[EX + "A"]),
+        (row["http://other.org/C"], row[EX + "B"]),
+    }
+
+
+def test_namespaces_agree_with_the_indexes():
+    first, second, table = merged()
+    assert table.namespace_list() == sorted(set(first.namespace_list()) | set(second.namespace_list()))
+    assert table.namespace_counts() == {"http://example.org/onto": 2, "http://other.org": 1, "urn:x": 1}
+    mask = table.in_namespaces(["urn:x"])
+    assert [t for t, m in zip(table.term_list(), mask) if m] == ["urn:x"]
+
+
+def test_split_uri():
+    assert split_uri(EX + "A") == ("http://example.org/onto", "A")
+    assert split_uri("http://example.org/a/B") == ("http://example.org/a", "B")
+    assert split_uri("http://example.org/a#b/c") == ("http://example.org/a", "b/c")
+    assert split_uri("urn:x") == ("urn:x", "")
+    assert local_name("http://example.org/a/B") == "B"
@@ -0,0 +1,78 @@
+import io
+import json
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from logic import timing
+from logic.timing import Recorder, annotate, span, timed
+
+
+def test_evicted_events_stay_in_the_totals():
+    recorder = Recorder(max_events=2)
+    for i in range(3):
+        recorder.record("db.read", 10.0, session="s1", rows=5, cache="hit" if i else "miss")
+    recorder.record("ui.panel", 1.0, session="s2", error="KeyError")
+
+    assert [e["name"] for e in recorder.events()] == ["db.read", "ui.panel"]
+    assert recorder.events("s1", limit=5)[0]["cache"] == "hit"
+    [read] = recorder.summary("s1")
+    assert (read["count"], read["total_ms"], read["rows"], read["hits"], read["misses"]) == (3, 30.0, 15, 2, 1)
+    assert {row["name"]: row["errors"] for row in recorder.summary()} == {"db.read": 0, "ui.panel": 1}
+
+    recorder.clear("s1")
+    assert recorder.summary("s1") == [] and recorder.events("s1") == []
+    assert len(recorder.summary("s2")) == 1
+
+
+def test_export_jsonl():
+    recorder = Recorder()
+    recorder.record("a", 1.0, session="s1")
+    recorder.record("b", 2.0, session="s2")
+    out = io.StringIO()
+    assert recorder.export_jsonl(out, "s2") == 1
+    assert json.loads(out.getvalue())["name"] == "b"
+
+
+def test_spans_record_errors_and_annotations(monkeypatch):
+    recorder = Recorder()
+    monkeypatch.setattr(timing, "recorder", recorder)
+
+    @timed("work", rows=len)
+    def work():
+        annotate(cache="miss")
+        return [1, 2]
+
+    work()
+    with pytest.raises(ValueError):
+        with span("fails"):
+            raise ValueError("boom")
+    events = {e["name"]: e for e in recorder.events()}
+    assert events["work"]["rows"] == 2 and events["work"]["cache"] == "miss"
+    assert events["fails"]["error"] == "ValueError"
+
+
+def diagnostics_app():
+    import streamlit as st
+    from ui.diagnostics import render_diagnostics
+
+    st.session_state.session_id = "s1"
+    render_diagnostics()
+
+
+def test_panel_survives_evicted_events(monkeypatch):
+    recorder = Recorder(max_events=2)
+    monkeypatch.setattr(timing, "recorder", recorder)
+    for _ in range(3):
+        recorder.record("db.read", 10.0, session="other")
+    recorder.record("db.read", 10.0, session="s1")
+    recorder.record("db.read", 10.0, session="other")
+    recorder.record("db.read", 10.0, session="other")
+
+    at = AppTest.from_function(diagnostics_app).run()
+    assert not at.exception
+    assert len(at.sidebar.dataframe) == 1
+    assert "event buffer" in at.sidebar.caption[0].value
+
+    at.sidebar.radio(key="diagnostics_scope").set_value("All sessions").run()
+    assert not at.exception and len(at.sidebar.dataframe) == 2
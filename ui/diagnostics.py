@@ -0,0 +1,46 @@
+import io
+
+import streamlit as st
+import pandas as pd
+
+from logic import timing
+
+SUMMARY_COLUMNS = ["name", "count", "total_ms", "mean_ms", "max_ms", "rows", "hits", "misses", "errors"]
+
+# Most recent spans listed under the totals
+RECENT_EVENTS = 50
+
+
+def render_diagnostics():
+    """Sidebar panel with the timing spans of this session or of the whole process."""
+    with st.sidebar.expander("⏱ Diagnostics"):
+        scope = st.radio("Scope", ["This session", "All sessions"], horizontal=True, key="diagnostics_scope")
+        session = st.session_state.get("session_id") if scope == "This session" else None
+
+        summary = pd.DataFrame(timing.recorder.summary(session), columns=SUMMARY_COLUMNS)
+        if summary.empty:
+            st.caption("No timings recorded yet.")
+            return
+        st.dataframe(summary.round(2), use_container_width=True, hide_index=True)
+
+        recent = pd.DataFrame(timing.recorder.events(session, limit=RECENT_EVENTS)[::-1])
+        if recent.empty:
+            # Totals outlive the bounded event buffer
+            st.caption("No recent spans left in the event buffer; the totals above still count them.")
+        else:
+            st.caption(f"Last {RECENT_EVENTS} spans")
+            recent["start"] = pd.to_datetime(recent["start"], unit="s").dt.strftime("%H:%M:%S.%f").str[:-3]
+            st.dataframe(recent.drop(columns="session"), use_container_width=True, hide_index=True)
+
+        out = io.StringIO()
+        timing.recorder.export_jsonl(out, session)
+        st.download_button(
+            "Export spans (.jsonl)",
+            data=out.getvalue(),
+            file_name=f"fairmapper_timings_{session or 'process'}.jsonl",
+            mime="application/jsonl",
+            use_container_width=True
+        )
+        if st.button("Clear timings", use_container_width=True):
+            timing.recorder.clear(session)
+            st.rerun()
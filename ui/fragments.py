@@ -0,0 +1,46 @@
+import functools
+import os
+import time
+
+import streamlit as st
+
+from logic import timing
+
+# Interaction budget per panel; panels slower than this say so under themselves
+LATENCY_TARGET_MS = float(os.environ.get("FAIRMAPPER_LATENCY_TARGET_MS", 200))
+
+# Panels of the mapping page, rerun on their own when their inputs change
+CATALOG_PANEL = "catalog_panel"
+COLUMN_PICKER = "column_picker"
+TERM_PICKER = "term_picker"
+SHACL_PREVIEW = "shacl_preview"
+MAPPING_PANELS = [COLUMN_PICKER, TERM_PICKER, SHACL_PREVIEW]
+
+
+def panel(key):
+    """
+    Turns a render function into a keyed st.fragment, so interacting with
+    its widgets reruns only that panel, and records how long each run took
+    in st.session_state.panel_latency_ms.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            # Fragment reruns may not go through init_session_state
+            timing.set_session(st.session_state.get("session_id"))
+            started = time.perf_counter()
+            result = func(*args, **kwargs)
+            elapsed = (time.perf_counter() - started) * 1000
+            st.session_state.setdefault("panel_latency_ms", {})[key] = elapsed
+            timing.record(f"ui.panel.{key}", elapsed)
+            if elapsed > LATENCY_TARGET_MS or st.session_state.get("show_panel_latency"):
+                flag = " ⚠️ over target" if elapsed > LATENCY_TARGET_MS else ""
+                st.caption(f"⏱ {elapsed:.0f} ms (target {LATENCY_TARGET_MS:.0f} ms){flag}")
+            return result
+        return st.fragment(timed, key=key)
+    return decorator
+
+
+def rerun_panels(*keys):
+    """Widget callback helper: reruns only the given panels instead of the whole app."""
+    st.rerun(list(keys))
@@ -1,6 +1,11 @@
+import os
+
 import streamlit as st
-from logic.ontology_loader import load_ontology_terms
-from ui.state import reset_mappings
+from logic.ontology_index import ONTOLOGY_SUFFIXES, bundled_ontologies, store_uploaded_ontology
+from logic.ontology_loader import load_ontology_terms, load_term_table
+from ui.state import load_table_mappings
+from database.connectors import get_all_db_tables
+from ui.fragments import panel, CATALOG_PANEL
 import pandas as pd
 
 def render_sidebar():
@@ -11,37 +16,12 @@ def render_sidebar():
     db = st.session_state.get("db")
 
     with col_config_left:
-        st.subheader("Database Tables Overview")
-
-        # Fetch all tables info if not already cached
-        if db and st.session_state.get("all_db_tables_info") is None:
-            tables = db.get_all_tables()  # This returns a list
-            # Convert to DataFrame for UI display consistency
-            st.session_state.all_db_tables_info = pd.DataFrame(tables, columns=['table_name'])
-
-        all_tables_df = st.session_state.get("all_db_tables_info")
-
-        if all_tables_df is not None and not all_tables_df.empty:
-            st.dataframe(all_tables_df, use_container_width=True, hide_index=True)
-
-            table_names = all_tables_df['table_name'].tolist()
-            selected_db_table = st.selectbox(
-                "Select a Database Table for Mapping (Source Columns)",
-                options=[''] + table_names,
-                index=0 if st.session_state.get("selected_db_table") is None else (
-                    table_names.index(st.session_state.selected_db_table) + 1
-                    if st.session_state.selected_db_table in table_names else 0),
-                key="db_table_selector"
-            )
-            if selected_db_table and selected_db_table != st.session_state.get("selected_db_table"):
-                st.session_state.selected_db_table = selected_db_table
-                reset_mappings()
-        else:
-            st.warning("No database tables found or connection error. Check your DB connection.")
+        render_catalog_panel(db)
 
     with col_config_right:
-        st.subheader("Upload Ontology File (optional)")
-        # Future upload widget here
+        render_ontology_sources()
+        st.toggle("Show panel latency", key="show_panel_latency",
+                  help="Show how long each panel of the page took on its last run")
 
     # Fetch columns for selected table and update session state
     if db and st.session_state.get("selected_db_table"):
@@ -49,6 +29,98 @@ def render_sidebar():
     else:
         st.session_state.database_list = []
 
-    # Load ontology terms and namespaces into session state
-    st.session_state.ontology_list, st.session_state.available_namespaces = load_ontology_terms()
 
+def render_ontology_sources():
+    """Upload widget, the ontologies merged into the term list, and the namespace filter."""
+    st.subheader("Ontologies")
+    uploads = st.file_uploader(
+        "Upload Ontology File(s) (optional)",
+        type=sorted({suffix.rsplit(".", 1)[-1] for suffix in ONTOLOGY_SUFFIXES}),
+        accept_multiple_files=True,
+        key="ontology_uploads"
+    )
+    # Widget values are copied to plain session keys, which the mapping panels read
+    if "ontology_source_picker" not in st.session_state:
+        st.session_state.ontology_source_picker = st.session_state.ontology_sources
+    for upload in uploads or []:
+        path = store_uploaded_ontology(upload.name, upload.getvalue())
+        # Only activate a file the first time it is seen, so it can be deselected below
+        if path not in st.session_state.uploaded_ontologies:
+            st.session_state.uploaded_ontologies.append(path)
+            st.session_state.ontology_source_picker = st.session_state.ontology_source_picker + [path]
+
+    sources = st.session_state.ontology_sources = st.multiselect(
+        "Merged ontologies (earlier ones win for labels and definitions)",
+        bundled_ontologies() + st.session_state.uploaded_ontologies,
+        format_func=os.path.basename,
+        key="ontology_source_picker"
+    )
+    if not sources:
+        st.warning("Select at least one ontology.")
+        st.session_state.ontology_list, st.session_state.available_namespaces = [], []
+        st.session_state.namespace_filter = []
+        return
+
+    # Load the merged ontology terms and namespaces into session state
+    st.session_state.ontology_list, st.session_state.available_namespaces = load_ontology_terms(sources)
+    if not st.session_state.ontology_list:
+        return
+    table = load_term_table(sources)
+    merged = sum(table.source_counts().values()) - len(table)
+    st.caption(f"{len(table):,} terms in {len(table.prefixes):,} namespaces"
+               + (f" · {merged:,} duplicate URIs merged" if merged else ""))
+
+    counts = table.namespace_counts()
+    # Drop namespaces of ontologies that are no longer loaded
+    st.session_state.namespace_picker = [
+        ns for ns in st.session_state.get("namespace_picker", st.session_state.namespace_filter) if ns in counts
+    ]
+    st.session_state.namespace_filter = st.multiselect(
+        "Only show terms from these namespaces",
+        st.session_state.available_namespaces,
+        format_func=lambda ns: f"{ns} ({counts[ns]:,})",
+        key="namespace_picker",
+        placeholder="All namespaces"
+    )
+
+
+@panel(CATALOG_PANEL)
+def render_catalog_panel(db):
+    st.subheader("Database Tables Overview")
+
+    # Fetch all tables info if not already cached
+    if db and st.session_state.get("all_db_tables_info") is None:
+        tables = db.get_all_tables()  # This returns a list
+        # Convert to DataFrame for UI display consistency
+        st.session_state.all_db_tables_info = pd.DataFrame(tables, columns=['table_name'])
+
+    all_tables_df = st.session_state.get("all_db_tables_info")
+
+    if all_tables_df is not None and not all_tables_df.empty:
+        st.dataframe(all_tables_df, use_container_width=True, hide_index=True)
+
+        table_names = all_tables_df['table_name'].tolist()
+        selected_db_table = st.selectbox(
+            "Select a Database Table for Mapping (Source Columns)",
+            options=[''] + table_names,
+            index=0 if st.session_state.get("selected_db_table") is None else (
+                table_names.index(st.session_state.selected_db_table) + 1
+                if st.session_state.selected_db_table in table_names else 0),
+            key="db_table_selector"
+        )
+        if selected_db_table and selected_db_table != st.session_state.get("selected_db_table"):
+            st.session_state.selected_db_table = selected_db_table
+            # A new table changes every other panel, so rerun the whole page
+            st.rerun()
+        # Load the saved mappings whenever the database or table changes
+        scope = (db.key, st.session_state.selected_db_table) if db else None
+        if scope and scope[1] and scope != st.session_state.get("mapping_scope"):
+            load_table_mappings(*scope)
+
+        if db and st.button("Refresh database catalog", help="Re-read tables and columns from the database"):
+            db.invalidate_catalog()
+            get_all_db_tables.clear()
+            st.session_state.all_db_tables_info = None
+            st.rerun()
+    else:
+        st.warning("No database tables found or connection error. Check your DB connection.")
@@ -1,4 +1,9 @@
+import uuid
+
 import streamlit as st
+from logic import timing
+from logic.mapping_store import MappingStore
+from logic.ontology_index import ontology_path
 
 # --- Session State Initialization ---
 def init_session_state():
@@ -11,9 +16,42 @@ def init_session_state():
         st.session_state.selected_db_table = None
     if 'all_db_tables_info' not in st.session_state:
         st.session_state.all_db_tables_info = None
+    if 'mapping_scope' not in st.session_state:
+        # (database key, table) the session's mappings are persisted under
+        st.session_state.mapping_scope = None
+    if 'ontology_sources' not in st.session_state:
+        # Ontology files merged into the term list, highest priority first
+        st.session_state.ontology_sources = [ontology_path()]
+    if 'uploaded_ontologies' not in st.session_state:
+        st.session_state.uploaded_ontologies = []
+    if 'namespace_filter' not in st.session_state:
+        st.session_state.namespace_filter = []
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex[:12]
+    # Timing spans recorded during this run are attributed to this session
+    timing.set_session(st.session_state.session_id)
+
+
+@st.cache_resource
+def get_mapping_store():
+    """The persistent mapping store, shared by all sessions."""
+    return MappingStore()
 
 
 # --- Helper Functions ---
+def load_table_mappings(database, table):
+    """Switches the session to a table and loads its saved mappings."""
+    st.session_state.mapping_scope = (database, table)
+    st.session_state.mappings = get_mapping_store().get_table_mappings(database, table)
+    st.session_state.selected_term_1 = None
+    st.session_state.auto_map_proposals = None
+
+def save_mappings(mappings):
+    """Adds {column: term} mappings to the session and writes them to the store."""
+    st.session_state.mappings.update(mappings)
+    if st.session_state.mapping_scope and mappings:
+        get_mapping_store().set_mappings(*st.session_state.mapping_scope, mappings)
+
 def handle_df1_click(term):
     """Callback function to handle selection from the first dataframe."""
     st.session_state.selected_term_1 = term
@@ -21,11 +59,33 @@ def handle_df1_click(term):
 def handle_df2_click(field):
     """Callback function to handle selection from the second dataframe and create a mapping."""
     if st.session_state.selected_term_1:
-        st.session_state.mappings[st.session_state.selected_term_1] = field
+        save_mappings({st.session_state.selected_term_1: field})
         # Reset selection after mapping
         st.session_state.selected_term_1 = None
 
+def accept_mappings(proposed):
+    """Callback to bulk-accept proposed {column: term} mappings for columns not mapped yet."""
+    save_mappings({c: t for c, t in proposed.items() if c not in st.session_state.mappings})
+    st.session_state.selected_term_1 = None
+
 def reset_mappings():
-    """Clears all existing mappings and selections."""
+    """Clears all existing mappings and selections, keeping a snapshot so they can be restored."""
+    scope = st.session_state.get("mapping_scope")
+    if scope and st.session_state.mappings:
+        store = get_mapping_store()
+        store.snapshot(*scope, label="Before reset")
+        store.clear_table(*scope)
     st.session_state.mappings = {}
-    st.session_state.selected_term_1 = None
\ No newline at end of file
+    st.session_state.selected_term_1 = None
+    st.session_state.auto_map_proposals = None
+
+def save_snapshot(label=None):
+    """Callback to save the current table's mappings as a new version."""
+    if st.session_state.get("mapping_scope"):
+        get_mapping_store().snapshot(*st.session_state.mapping_scope, label=label or None)
+
+def restore_snapshot(snapshot_id):
+    """Callback to replace the current table's mappings with a saved version."""
+    st.session_state.mappings = get_mapping_store().restore_snapshot(snapshot_id)
+    st.session_state.selected_term_1 = None
+    st.session_state.auto_map_proposals = None
@@ -1,91 +1,201 @@
+import os
+from itertools import islice
+
+import numpy as np
 import streamlit as st
 import pandas as pd
-from ui.state import handle_df1_click, handle_df2_click, reset_mappings
-from logic.shacl_generator import generate_shacl_file
+from ui.state import (handle_df1_click, handle_df2_click, reset_mappings, accept_mappings,
+                      get_mapping_store, save_snapshot, restore_snapshot)
+from logic.shacl_generator import IncrementalShaclDocument, constraints_from_catalog, ORDERED_DATATYPES
+from logic.shacl_validator import ColumnCheck, load_shapes, validate_chunks
+from database.profiling import PROFILE_SAMPLE_ROWS
+from logic.ontology_loader import load_search_index, load_term_matrix, load_term_table, load_class_hierarchy
+from logic.auto_mapper import propose_mappings, assign_one_to_one
+from logic.ontology_search import local_name
+from logic.r2rml import build_r2rml_mapping, parse_r2rml, plan_columns, materialize, export_path
+from ui.fragments import panel, rerun_panels, COLUMN_PICKER, TERM_PICKER, SHACL_PREVIEW, MAPPING_PANELS
 
-def render_mapping_ui():
-    # Get current db connection and selected table from session state
-    db = st.session_state.get("db")
-    selected_table = st.session_state.get("selected_db_table")
+# How many ranked suggestions the "Map to" dropdown shows for a search
+SEARCH_RESULTS = 25
 
-    # Load columns from selected table if connected and table chosen
-    if db and selected_table:
-        # Assuming your db object has a method get_table_columns(table_name) that returns a list
-        st.session_state.database_list = list(db.get_table_columns(selected_table))
-    else:
-        st.session_state.database_list = []
+# Terms listed when browsing without a search query
+BROWSE_RESULTS = 500
+
+# Column buttons rendered per page, so wide tables cost the same as narrow ones
+COLUMN_PAGE_SIZE = 25
 
-    # Prepare dataframes for UI display
+# Rows of the "Ontology Terms" table per page; only one page is decoded per rerun
+TERM_PAGE_SIZE = 100
+
+def render_mapping_ui():
+    selected_table = st.session_state.get("selected_db_table")
+    # Columns and ontology terms were loaded by the sidebar on this run
     db_list = st.session_state.get("database_list", [])
     ontology_list = st.session_state.get("ontology_list", [])
-    df1 = pd.DataFrame({'term': db_list})
-    df2 = pd.DataFrame({'field': ontology_list})
 
+    col1, col2 = st.columns(2, gap="large")
+
+    with col1:
+        render_column_picker(selected_table)
+
+    with col2:
+        render_term_picker()
+
+    db = st.session_state.get("db")
+    if db and selected_table and db_list:
+        render_column_profile(db, selected_table)
+
+    if db_list and ontology_list:
+        render_auto_mapping(db_list)
+
+    render_shacl_preview(selected_table)
+
+
+def _select_column(term):
+    handle_df1_click(term)
+    rerun_panels(COLUMN_PICKER, TERM_PICKER)
+
+
+def _map_selected_column(dropdown_key):
+    term = st.session_state.get(dropdown_key)
+    if term:
+        handle_df2_click(term)
+        rerun_panels(*MAPPING_PANELS)
+
+
+def _reset_mappings():
+    reset_mappings()
+    rerun_panels(*MAPPING_PANELS)
+
+
+def _restore_snapshot(snapshot_id):
+    restore_snapshot(snapshot_id)
+    rerun_panels(*MAPPING_PANELS)
+
+
+def namespace_mask():
+    """Boolean mask over the merged terms for the sidebar's namespace filter, or None when unfiltered."""
+    namespaces = st.session_state.get("namespace_filter")
+    if not namespaces:
+        return None
+    return load_term_table(st.session_state.ontology_sources).in_namespaces(namespaces)
+
+
+def render_subtree_filter(ontology_list):
+    """
+    "Only descendants of" picker over the classes that have subclasses, with
+    the chosen class's breadcrumb. Returns a mask over the terms, or None.
+    """
+    hierarchy = load_class_hierarchy(st.session_state.ontology_sources)
+    parents = hierarchy.classes_with_subclasses()
+    if not len(parents):
+        return None
+    index_of = {ontology_list[i]: i for i in parents.tolist()}
+    # The chosen class may be gone after the loaded ontologies changed
+    if st.session_state.get("subtree_root") not in index_of:
+        st.session_state.subtree_root = ''
+    root = st.selectbox(
+        "Only descendants of",
+        [''] + list(index_of),
+        format_func=lambda term: f"{local_name(term)} ({hierarchy.subtree_size(index_of[term]) - 1:,} subclass(es))"
+        if term else "All classes",
+        key="subtree_root"
+    )
+    if not root:
+        return None
+    i = index_of[root]
+    breadcrumb = [local_name(ontology_list[a]) for a in hierarchy.ancestors(i)] + [f"**{local_name(root)}**"]
+    st.caption(" › ".join(breadcrumb) + f" · {len(hierarchy.children(i)):,} direct subclass(es)")
+    return hierarchy.subtree_mask(i)
+
+
+@panel(TERM_PICKER)
+def render_term_picker():
+    """Status line, ontology term list and the ranked "Map to" dropdown for the selected column."""
+    selected_column = st.session_state.selected_term_1
     st.info(
         f"**Status:** " +
-        (f"Selected from Database: **{st.session_state.selected_term_1}**. Now select a match from Ontology."
-         if st.session_state.selected_term_1
+        (f"Selected from Database: **{selected_column}**. Now select a match from Ontology."
+         if selected_column
          else "Select a term from Database to begin mapping.")
     )
+    if selected_column:
+        render_profile_summary(selected_column)
+    st.header("Ontology Terms")
+    ontology_list = st.session_state.get("ontology_list", [])
+    if not ontology_list:
+        st.info("Please upload or load an ontology file.")
+        return
+    mask = namespace_mask()
+    subtree = render_subtree_filter(ontology_list)
+    if subtree is not None:
+        mask = subtree if mask is None else mask & subtree
+    visible = None if mask is None else np.flatnonzero(mask)
+    n_visible = len(ontology_list) if visible is None else len(visible)
+    start, stop = paginate(n_visible, TERM_PAGE_SIZE, "term_page")
+    page_terms = ontology_list[start:stop] if visible is None else [ontology_list[i] for i in visible[start:stop]]
+    st.dataframe(pd.DataFrame({'field': page_terms}), use_container_width=True, hide_index=True)
+    if mask is not None:
+        st.caption(f"{n_visible:,} of {len(ontology_list):,} terms match the namespace and class filters")
+    st.markdown("---")
+    if not selected_column:
+        st.info("Select a database column on the left to map to an ontology term.")
+        return
 
-    col1, col2 = st.columns(2, gap="large")
+    mapped_terms = set(st.session_state.mappings.values())
+    query = st.text_input(
+        "Search ontology terms",
+        value=selected_column,
+        placeholder="Type part of a name, label or definition",
+        key=f"ontology_search_{selected_column}"
+    )
+    if query:
+        hits = load_search_index(st.session_state.ontology_sources).search(
+            query, k=SEARCH_RESULTS, exclude=mapped_terms, term_mask=mask
+        )
+        unmapped_terms = [term for term, _ in hits]
+        if not unmapped_terms:
+            st.caption(f"No ontology terms match '{query}'.")
+    else:
+        visible_terms = ontology_list if visible is None else (ontology_list[i] for i in visible)
+        unmapped_terms = list(islice(
+            (field for field in visible_terms if field not in mapped_terms), BROWSE_RESULTS
+        ))
+        if len(unmapped_terms) == BROWSE_RESULTS:
+            st.caption(f"Showing the first {BROWSE_RESULTS} terms; search to narrow them down.")
+    dropdown_key = f"ontology_dropdown_{selected_column}"
+    st.selectbox(
+        f"Map to: (Ontology term for '{selected_column}')",
+        options=[''] + unmapped_terms,
+        index=0,
+        format_func=lambda term: f"{local_name(term)}  ({term})" if term else "",
+        key=dropdown_key,
+        on_change=_map_selected_column,
+        args=(dropdown_key,)
+    )
 
-    with col1:
-        st.header(f"Columns from: {selected_table or 'No Table Selected'}")
-        if not df1.empty:
-            st.dataframe(df1, use_container_width=True, hide_index=True)
-            st.markdown("---")
-            for _, row in df1.iterrows():
-                term = row['term']
-                is_mapped = term in st.session_state.mappings
-                btn_type = "primary" if st.session_state.selected_term_1 == term else "secondary"
-
-                st.button(
-                    f"Map: **{term}**",
-                    key=f"df1_{term}",
-                    on_click=handle_df1_click,
-                    args=(term,),
-                    disabled=is_mapped,
-                    use_container_width=True,
-                    type=btn_type
-                )
-        else:
-            st.info("Please select a database table above to load its columns.")
 
-    with col2:
-        st.header("Ontology Terms")
-        if not df2.empty:
-            st.dataframe(df2, use_container_width=True, hide_index=True)
-            st.markdown("---")
-            if st.session_state.selected_term_1:
-                unmapped_terms = [field for field in df2['field'] if field not in st.session_state.mappings.values()]
-                selected_ontology_term = st.selectbox(
-                    f"Map to: (Ontology term for '{st.session_state.selected_term_1}')",
-                    options=[''] + unmapped_terms,
-                    index=0,
-                    key=f"ontology_dropdown_{st.session_state.selected_term_1}"
-                )
-                if selected_ontology_term:
-                    handle_df2_click(selected_ontology_term)
-            else:
-                st.info("Select a database column on the left to map to an ontology term.")
-        else:
-            st.info("Please upload or load an ontology file.")
-
-    # --- Mappings + SHACL output
+@panel(SHACL_PREVIEW)
+def render_shacl_preview(selected_table):
+    """Resulting mappings, the generated SHACL with its download, and the per-table tools below it."""
+    db = st.session_state.get("db")
     st.header("Resulting Mappings", divider='rainbow')
 
     if st.session_state.mappings:
+        store = get_mapping_store()
         for source, dest in st.session_state.mappings.items():
             st.success(f"**{source}** `->` **{dest}`")
+            others = [f"{t}.{c}" for d, _, t, c in store.columns_for_term(dest)
+                      if (d, t, c) != (db.key if db else None, selected_table, source)]
+            if others:
+                st.caption(f"Also mapped from: {', '.join(others[:10])}" + (" ..." if len(others) > 10 else ""))
 
         st.subheader("SHACL Input (JSON representation):")
         st.json(st.session_state.mappings)
 
-        shacl_content = generate_shacl_file(
-            st.session_state.mappings,
-            db_table_name=selected_table
-        )
+        constraints = render_shape_constraints(db, selected_table, st.session_state.mappings) \
+            if db and selected_table else None
+        shacl_content = render_shacl(selected_table, st.session_state.mappings, constraints)
 
         st.subheader("Generated SHACL File Content (Turtle):")
         st.code(shacl_content, language='turtle')
@@ -98,7 +208,321 @@ def render_mapping_ui():
             use_container_width=True,
             type="primary"
         )
-        st.button("Reset Mappings", on_click=reset_mappings, use_container_width=True, type="secondary")
+        st.button("Reset Mappings", on_click=_reset_mappings, use_container_width=True, type="secondary")
+
+        if db and selected_table:
+            render_rdf_export(db, selected_table, st.session_state.get("database_list", []),
+                              st.session_state.mappings)
+            render_validation(db, selected_table, shacl_content)
     else:
         st.write("No mappings created yet.")
 
+    if st.session_state.get("mapping_scope"):
+        render_mapping_history()
+
+
+def paginate(n_items, page_size, key):
+    """
+    Page picker for n_items, shown only when they do not fit on one page.
+    Returns the (start, stop) item range of the chosen page.
+    """
+    n_pages = max((n_items - 1) // page_size + 1, 1)
+    # Filters may have shrunk the list since the page was picked
+    if st.session_state.get(key, 1) > n_pages:
+        st.session_state[key] = n_pages
+    page = st.number_input(f"Page (of {n_pages})", 1, n_pages, 1, key=key) if n_pages > 1 else 1
+    start = (page - 1) * page_size
+    return start, min(start + page_size, n_items)
+
+
+def filter_columns(columns, mapped, query="", status="All"):
+    """Columns (a Series) matching a name filter and a mapped/unmapped status, as a list."""
+    keep = pd.Series(True, index=columns.index)
+    if query:
+        keep &= columns.str.contains(query, case=False, regex=False)
+    if status != "All":
+        is_mapped = columns.isin(mapped)
+        keep &= is_mapped if status == "Mapped" else ~is_mapped
+    return columns[keep].tolist()
+
+
+@panel(COLUMN_PICKER)
+def render_column_picker(selected_table):
+    """
+    Filterable, paginated column buttons: only one page of buttons is
+    created per rerun, whatever the table's width.
+    """
+    st.header(f"Columns from: {selected_table or 'No Table Selected'}")
+    columns = pd.Series(st.session_state.get("database_list", []), dtype=object)
+    if columns.empty:
+        st.info("Please select a database table above to load its columns.")
+        return
+
+    mapped = st.session_state.mappings.keys()
+    filter_col, status_col = st.columns([3, 2])
+    query = filter_col.text_input("Filter columns", key=f"column_filter_{selected_table}",
+                                  placeholder="Part of a column name")
+    status = status_col.radio("Show", ["All", "Unmapped", "Mapped"], horizontal=True,
+                              key=f"column_status_{selected_table}")
+    matches = filter_columns(columns, mapped, query, status)
+
+    start, stop = paginate(len(matches), COLUMN_PAGE_SIZE, f"column_page_{selected_table}")
+    st.caption(f"{len(matches)} of {len(columns)} column(s) · {len(mapped)} mapped")
+    if not matches:
+        st.info("No columns match the filter.")
+
+    for term in matches[start:stop]:
+        btn_type = "primary" if st.session_state.selected_term_1 == term else "secondary"
+        st.button(
+            f"Map: **{term}**",
+            key=f"df1_{term}",
+            on_click=_select_column,
+            args=(term,),
+            disabled=term in mapped,
+            use_container_width=True,
+            type=btn_type
+        )
+
+
+def render_mapping_history():
+    """Saves and restores versions of the current table's mappings."""
+    with st.expander("Mapping history"):
+        label = st.text_input("Snapshot label", key="snapshot_label")
+        st.button("Save snapshot", on_click=save_snapshot, args=(label,), use_container_width=True)
+        snapshots = get_mapping_store().list_snapshots(*st.session_state.mapping_scope)
+        if not snapshots:
+            st.caption("No snapshots saved for this table yet.")
+            return
+        chosen = st.selectbox(
+            "Saved versions",
+            snapshots,
+            format_func=lambda s: f"#{s['id']} {s['label'] or ''} · {s['columns']} column(s) · "
+                                  f"{pd.Timestamp(s['created_at'], unit='s'):%Y-%m-%d %H:%M}",
+            key="snapshot_choice"
+        )
+        st.button("Restore snapshot", on_click=_restore_snapshot, args=(chosen["id"],), use_container_width=True)
+
+
+def render_shacl(selected_table, mappings, constraints=None):
+    """Returns the SHACL Turtle for the mappings, re-rendering only the shapes that changed since the last rerun."""
+    document = st.session_state.get("shacl_document")
+    if document is None or document.db_table_name != selected_table:
+        document = st.session_state.shacl_document = IncrementalShaclDocument(selected_table)
+    return document.render(mappings, constraints)
+
+
+def _range_bound(text):
+    """A value range typed into the editor as int, float or (for dates) the text itself; None when empty."""
+    text = str(text or "").strip()
+    if not text or text.lower() in ("nan", "none"):
+        return None
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    return text
+
+
+def render_shape_constraints(db, selected_table, mappings):
+    """
+    Optional constraints for the shapes: sh:datatype, sh:minCount and
+    sh:maxCount from the database catalog, plus value ranges edited per
+    column. Returns {column: constraints}, or None when switched off.
+    """
+    if not st.toggle("Add constraints from the database catalog", key="shacl_constraints",
+                     help="sh:datatype from the column type, sh:minCount 1 for NOT NULL columns, sh:maxCount 1"):
+        return None
+    constraints = constraints_from_catalog(db.get_column_info(selected_table), columns=mappings)
+    # Ranges only apply to numbers, dates and timestamps
+    ordered = [c for c in mappings if constraints.get(c, {}).get("datatype") in ORDERED_DATATYPES]
+    ranges = st.session_state.setdefault("shacl_ranges", {}).setdefault(selected_table, {})
+    with st.expander("Value ranges (sh:minInclusive / sh:maxInclusive)"):
+        if not ordered:
+            st.caption("Value ranges apply to numeric, date and timestamp columns; none of the mapped columns are.")
+            return constraints
+        editor = pd.DataFrame(
+            [{"column": c, "datatype": constraints[c]["datatype"].rsplit("#", 1)[-1],
+              "minInclusive": ranges.get(c, {}).get("minInclusive", ""),
+              "maxInclusive": ranges.get(c, {}).get("maxInclusive", "")} for c in ordered],
+            columns=["column", "datatype", "minInclusive", "maxInclusive"]
+        ).astype(str)
+        edited = st.data_editor(editor, key=f"shacl_range_editor_{selected_table}", disabled=["column", "datatype"],
+                                hide_index=True, use_container_width=True)
+    for row in edited.itertuples(index=False):
+        ranges[row.column] = {"minInclusive": row.minInclusive, "maxInclusive": row.maxInclusive}
+        column = constraints[row.column]
+        for name in ("minInclusive", "maxInclusive"):
+            bound = _range_bound(getattr(row, name))
+            if bound is None:
+                continue
+            try:
+                # The validator's own rules decide which bounds a column accepts
+                ColumnCheck(row.column, {"datatype": column["datatype"], name: bound})
+            except ValueError as e:
+                st.warning(f"Ignoring {e}.")
+                continue
+            column[name] = bound
+    return constraints
+
+
+def render_validation(db, selected_table, shacl_content):
+    """Checks the table's rows against the generated shapes, streaming the table in chunks."""
+    with st.expander("Validate table data against the shapes"):
+        shapes = load_shapes(shacl_content)
+        checked = [c for c, constraints in shapes.items() if set(constraints) - {"maxCount"}]
+        if not checked:
+            st.caption("The shapes have no constraints to check yet; add constraints from the catalog above.")
+            return
+        chunksize = st.number_input("Rows per chunk", 1_000, 1_000_000, 100_000, 10_000, key="validation_chunksize")
+        if st.button("Validate", use_container_width=True):
+            table_columns = set(db.get_table_columns(selected_table))
+            columns = [c for c in shapes if c in table_columns]
+            if not columns:
+                st.warning("None of the mapped columns exist in the table.")
+                return
+            with st.spinner(f"Validating {selected_table}..."):
+                try:
+                    result = validate_chunks(db.stream_table(selected_table, columns, chunksize=int(chunksize)), shapes)
+                except Exception as e:
+                    st.error(f"Failed to validate {selected_table}: {e}")
+                    return
+            st.session_state.validation_result = (selected_table, result)
+
+        stored = st.session_state.get("validation_result")
+        if not stored or stored[0] != selected_table:
+            return
+        result = stored[1]
+        report = result["report"]
+        failing = report[report["violations"] > 0]
+        summary = (f"Checked {result['rows']:,} rows against {len(report)} constraint(s) in {result['seconds']}s: "
+                   f"{int(failing['violations'].sum()):,} violation(s) in {len(failing)} constraint(s).")
+        (st.warning if len(failing) else st.success)(summary)
+        st.dataframe(report, use_container_width=True, hide_index=True)
+
+
+def render_column_profile(db, selected_table):
+    """Profiles the table's columns in the database and shows the statistics, cached per table."""
+    with st.expander("Column profile"):
+        sample_rows = st.number_input("Sample rows", 1_000, 10_000_000, PROFILE_SAMPLE_ROWS, 10_000,
+                                      key="profile_sample_rows",
+                                      help="TABLESAMPLE size on Postgres, LIMIT on SQLite and MySQL")
+        if st.button("Profile columns", use_container_width=True):
+            with st.spinner(f"Profiling {selected_table}..."):
+                db.profile_table(selected_table, sample_rows=int(sample_rows), force=True)
+        result = db.cached_profile(selected_table)
+        if result is None:
+            st.caption("Not profiled yet. Statistics are computed in the database over a sample of rows.")
+            return
+        profile = result["profile"]
+        sampled = (f"a {result['sample_percent']:g}% block sample" if result["sample_percent"]
+                   else f"up to {result['sample_rows']:,} rows")
+        st.caption(f"{len(profile)} column(s) over {sampled} · "
+                   f"{pd.Timestamp(result['profiled_at'], unit='s'):%Y-%m-%d %H:%M}")
+        st.dataframe(profile.drop(columns="error" if profile["error"].isna().all() else []),
+                     use_container_width=True, hide_index=True)
+
+
+def render_profile_summary(column):
+    """One-line profile of the selected column, if its table has been profiled."""
+    db, table = st.session_state.get("db"), st.session_state.get("selected_db_table")
+    result = db.cached_profile(table) if db and table else None
+    if result is None:
+        return
+    rows = result["profile"][result["profile"]["column_name"] == column]
+    if rows.empty or pd.isna(rows.iloc[0]["rows_sampled"]) or not rows.iloc[0]["rows_sampled"]:
+        return
+    p = rows.iloc[0]
+    st.caption(
+        f"`{column}`: {p['data_type']} · {p['null_ratio']:.0%} null · {int(p['distinct']):,} distinct"
+        + (f" · {p['min']} … {p['max']}" if pd.notna(p["min"]) else "")
+        + (f" · top: {p['top_values']}" if p["top_values"] else "")
+    )
+
+
+def render_auto_mapping(columns):
+    """Proposes ontology terms for every unmapped column at once and lets the user accept them in bulk."""
+    with st.expander("Auto-map all columns"):
+        min_score = st.slider("Minimum confidence", 0.0, 1.0, 0.5, 0.05, key="auto_map_min_score")
+        unmapped_columns = [c for c in columns if c not in st.session_state.mappings]
+        if st.button("Propose mappings", disabled=not unmapped_columns, use_container_width=True):
+            st.session_state.auto_map_proposals = propose_mappings(
+                unmapped_columns,
+                load_term_matrix(st.session_state.ontology_sources),
+                top_k=3,
+                exclude_terms=set(st.session_state.mappings.values()),
+                term_mask=namespace_mask()
+            )
+
+        proposals = st.session_state.get("auto_map_proposals")
+        if proposals is None:
+            return
+        proposals = proposals[
+            (proposals["score"] >= min_score) & ~proposals["column"].isin(st.session_state.mappings.keys())
+        ]
+        if proposals.empty:
+            st.info("No proposals above the confidence threshold.")
+            return
+        st.dataframe(proposals, use_container_width=True, hide_index=True)
+        best = assign_one_to_one(proposals)
+        st.button(
+            f"Accept best match for {len(best)} column(s)",
+            on_click=accept_mappings,
+            args=(best,),
+            use_container_width=True,
+            type="primary"
+        )
+
+
+def render_rdf_export(db, selected_table, columns, mappings):
+    """Builds an R2RML mapping from the current mappings and materializes the table as N-Triples."""
+    with st.expander("Export table as RDF (R2RML)"):
+        id_like = [c for c in columns if c.lower() in ("id", f"{selected_table.lower()}_id")]
+        key_columns = st.multiselect("Subject key column(s)", columns, default=id_like or columns[:1],
+                                     key="r2rml_key_columns")
+        if not key_columns:
+            st.info("Choose the column(s) that identify a row.")
+            return
+        mapping_graph = build_r2rml_mapping(mappings, selected_table, key_columns)
+        st.download_button(
+            label="Download R2RML Mapping (.ttl)",
+            data=mapping_graph.serialize(format="turtle"),
+            file_name=f"r2rml_{selected_table}.ttl",
+            mime="text/turtle",
+            use_container_width=True
+        )
+
+        compress = st.toggle("Compress (gzip)", value=True, key="r2rml_compress")
+        chunksize = st.number_input("Rows per chunk", 1_000, 1_000_000, 50_000, 10_000, key="r2rml_chunksize")
+        workers = st.number_input("Worker processes", 1, 32, 1, key="r2rml_workers")
+        if st.button("Materialize", use_container_width=True):
+            plan = parse_r2rml(mapping_graph)[0]
+            out_path = export_path(selected_table, st.session_state.get("session_id", "export"), compress)
+            with st.spinner(f"Materializing {selected_table}..."):
+                try:
+                    stats = materialize(
+                        db.stream_table(selected_table, plan_columns(plan), chunksize=int(chunksize)),
+                        plan, out_path, workers=int(workers)
+                    )
+                except Exception as e:
+                    st.error(f"Failed to materialize {selected_table}: {e}")
+                    return
+            st.session_state.r2rml_export = (selected_table, out_path, stats)
+
+        stored = st.session_state.get("r2rml_export")
+        if not stored or stored[0] != selected_table or not os.path.exists(stored[1]):
+            return
+        _, out_path, stats = stored
+        st.success(
+            f"Wrote {stats['triples']:,} triples from {stats['rows']:,} rows in "
+            f"{stats['seconds']}s ({stats['rows_per_sec']:,} rows/s, {stats['triples_per_sec']:,} triples/s)"
+        )
+        file_name = selected_table + (".nt.gz" if out_path.endswith(".gz") else ".nt")
+        with open(out_path, "rb") as fh:
+            st.download_button(
+                label=f"Download {file_name}",
+                data=fh,
+                file_name=file_name,
+                mime="application/gzip" if out_path.endswith(".gz") else "application/n-triples",
+                use_container_width=True
+            )